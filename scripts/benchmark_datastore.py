@@ -0,0 +1,68 @@
+"""Measures drink selector page loads per second against a SQLite datastore.
+
+Compares a store that opens a new connection for each call (pool size 0, the
+behaviour before connection pooling) with a pooled store.
+
+Usage: PYTHONPATH=src python scripts/benchmark_datastore.py [requests] [threads]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+
+INIT_SCRIPT = os.path.join(os.path.dirname(__file__), 'init-sqlite3.sql')
+
+
+def create_database(path: str) -> None:
+    with sqlite3.connect(path) as db:
+        with open(INIT_SCRIPT, 'r', encoding='utf8') as sql_file:
+            db.executescript(sql_file.read())
+        db.execute("INSERT INTO SelectorLayout(name) VALUES ('default')")
+        for i in range(25):
+            db.execute("INSERT INTO Drink(name, display_name, base_price) VALUES (?, ?, 100)",
+                       (f'drink_{i}', f'Drink {i}'))
+            button_id, = db.execute("INSERT INTO SelectorButton(layout_name, xpos, ypos) "
+                                    "VALUES ('default', ?, ?) RETURNING id",
+                                    (i % 5, i // 5)).fetchone()
+            db.execute("INSERT INTO OrderButton(button_id, drink_name) VALUES (?, ?)",
+                       (button_id, f'drink_{i}'))
+        db.execute("INSERT INTO Event(name) VALUES ('Benchmark')")
+    db.close()
+
+
+def selector_page_load(store: SqliteStore) -> None:
+    store.current_event()
+    store.all_drinks()
+    store.all_layouts()
+
+
+def requests_per_second(store: SqliteStore, requests: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for _ in executor.map(lambda _: selector_page_load(store), range(requests)):
+            pass
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.sqlite')
+        create_database(path)
+
+        for label, pool_size in [('unpooled', 0), ('pooled', threads)]:
+            store = SqliteStore(path, pool_size)
+            rate = requests_per_second(store, requests, threads)
+            store.close()
+            print(f'{label:>10}: {rate:10.1f} page loads/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Measures the hot datastore queries on a synthetic multi-year order history,
+before and after migrating the database to the latest schema version.
+
+The database starts out at schema version 2, i.e. without the lookup indexes
+of migration 0003, like a production database created before them.
+
+Usage: PYTHONPATH=src python scripts/benchmark_migrations.py [years] [orders per event]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+from kellerclub_drinks.datastores.migrations import load_migrations, migrate_sqlite
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+
+INIT_SCRIPT = os.path.join(os.path.dirname(__file__), 'init-sqlite3.sql')
+MIGRATIONS = os.path.join(os.path.dirname(__file__), 'migrations', 'sqlite')
+
+DRINKS = 25
+EVENTS_PER_WEEK = 2
+REPETITIONS = 20
+
+
+def create_database(path: str, years: int, orders_per_event: int) -> datetime:
+    """Creates a database at schema version 2 and returns its latest event."""
+
+    with open(INIT_SCRIPT, 'r', encoding='utf8') as sql_file:
+        init_script = sql_file.read()
+    original_schema = init_script[:init_script.index('-- running totals')]
+
+    rng = random.Random(0)
+    db = sqlite3.connect(path)
+    db.executescript(original_schema)
+    migrate_sqlite(db, load_migrations(MIGRATIONS)[:2], log=lambda _: None)
+    with db:
+        db.execute("INSERT INTO SelectorLayout(name) VALUES ('default'), ('other')")
+        start = int(datetime(2020, 1, 1).timestamp())
+        end = start + years * 365 * 24 * 3600
+        for i in range(DRINKS):
+            db.execute("INSERT INTO Drink(name, display_name, base_price) VALUES (?, ?, 100)",
+                       (f'drink_{i}', f'Drink {i}'))
+            # one price change a year
+            db.executemany("INSERT INTO Prices(drink, end_time, price) VALUES (?, ?, ?)",
+                           [(f'drink_{i}', start + year * 365 * 24 * 3600, 100 + 10 * year)
+                            for year in range(1, years)])
+            for layout in ('default', 'other'):
+                button_id, = db.execute("INSERT INTO SelectorButton(layout_name, xpos, ypos) "
+                                        "VALUES (?, ?, ?) RETURNING id",
+                                        (layout, i % 5, i // 5)).fetchone()
+                db.execute("INSERT INTO OrderButton(button_id, drink_name) VALUES (?, ?)",
+                           (button_id, f'drink_{i}'))
+
+        event_time = start
+        interval = 7 * 24 * 3600 // EVENTS_PER_WEEK
+        while event_time + interval < end:
+            db.execute("INSERT INTO Event(start_time, end_time, name) VALUES (?, ?, 'Event')",
+                       (event_time, event_time + 6 * 3600))
+            db.executemany("INSERT INTO PurchaseOrder(time, drink_name, event) VALUES (?, ?, ?)",
+                           [(event_time + rng.randrange(6 * 3600),
+                             f'drink_{rng.randrange(DRINKS)}', event_time)
+                            for _ in range(orders_per_event)])
+            event_time += interval
+        db.execute("UPDATE Event SET end_time = NULL WHERE start_time = ?",
+                   (event_time - interval,))
+    db.close()
+
+    return datetime.fromtimestamp(event_time - interval)
+
+
+def measure(store: SqliteStore, event_id: datetime) -> dict[str, float]:
+    queries: dict[str, Callable[[], object]] = {
+        'current_event': store.current_event,
+        'layout': lambda: store.layout('default'),
+        'event_totals': lambda: store.event_totals(event_id),
+        'sales_report': lambda: store.sales_report(event_id),
+        'orders': lambda: list(store.orders(event_id)),
+    }
+
+    timings = {}
+    for name, query in queries.items():
+        query()
+        start = time.perf_counter()
+        for _ in range(REPETITIONS):
+            query()
+        timings[name] = (time.perf_counter() - start) / REPETITIONS * 1000
+    return timings
+
+
+def main() -> None:
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    orders_per_event = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.sqlite')
+        event_id = create_database(path, years, orders_per_event)
+
+        store = SqliteStore(path, 1)
+        before = measure(store, event_id)
+        store.close()
+
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        migrate_sqlite(conn, load_migrations(MIGRATIONS))
+        print(f'migration took {(time.perf_counter() - start) * 1000:.1f} ms')
+        conn.close()
+
+        store = SqliteStore(path, 1)
+        after = measure(store, event_id)
+        store.close()
+
+    print(f'{"query":>15} {"before":>10} {"after":>10}')
+    for name, duration in before.items():
+        print(f'{name:>15} {duration:8.3f}ms {after[name]:8.3f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Measures how many requests per second the router dispatches.
+
+The request mix resembles an evening at the bar: mostly drink selector page
+loads and order submissions, some static files and the occasional report.
+Only routing is measured, the handlers are not run.
+
+Usage: PYTHONPATH=src python scripts/benchmark_router.py [rounds]
+"""
+
+import io
+import sys
+import time
+from typing import Any
+
+from kellerclub_drinks.routers.router import route
+
+EVENT = 1700000000
+
+REQUEST_MIX: list[tuple[int, dict[str, Any]]] = [
+    (30, {'REQUEST_METHOD': 'GET', 'PATH_INFO': f'/event/{EVENT}/selector',
+          'QUERY_STRING': 'layout=default&autosubmit=false',
+          'HTTP_COOKIE': f'event-{EVENT}-orders=tap_beer,cola,tap_beer'}),
+    (20, {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/orders/add',
+          'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+          'body': f'order=tap_beer&event={EVENT}'.encode(),
+          'HTTP_COOKIE': f'event-{EVENT}-orders=cola',
+          'HTTP_REFERER': f'/event/{EVENT}/selector'}),
+    (20, {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/api/orders/submit',
+          'CONTENT_TYPE': 'application/json',
+          'body': f'{{"orders": ["tap_beer", "cola"], "event": {EVENT}}}'.encode()}),
+    (10, {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/orders/submit',
+          'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+          'body': f'order=tap_beer&order=cola&event={EVENT}'.encode()}),
+    (10, {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/drink_selector/drink_selector.css'}),
+    (5, {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/'}),
+    (3, {'REQUEST_METHOD': 'GET', 'PATH_INFO': f'/api/event/{EVENT}/totals'}),
+    (2, {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/drinks'}),
+]
+
+
+def environ(template: dict[str, Any]) -> dict[str, Any]:
+    result = {key: value for key, value in template.items() if key != 'body'}
+    body = template.get('body', b'')
+    result['CONTENT_LENGTH'] = str(len(body))
+    result['wsgi.input'] = io.BytesIO(body)
+    return result
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests = [template for weight, template in REQUEST_MIX for _ in range(weight)]
+    environs = [environ(template) for template in requests * rounds]
+
+    # best of several runs, to reduce noise from other processes
+    elapsed = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for env in environs:
+            env['wsgi.input'].seek(0)
+            route(env)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    print(f'{len(environs)} requests routed in {elapsed:.2f}s '
+          f'({len(environs) / elapsed:.0f} requests/s, '
+          f'{elapsed / len(environs) * 1e6:.1f} µs/request)')
+
+
+if __name__ == '__main__':
+    main()
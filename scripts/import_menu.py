@@ -0,0 +1,72 @@
+"""Imports drinks, prices and selector layouts from a menu file in a single
+transaction, e.g. to set up a new menu.
+
+Run it from the directory the application runs in, so that relative database
+paths in the settings file resolve the same way.
+
+Usage: PYTHONPATH=. python ../scripts/import_menu.py <menu.json|menu.csv> [settings file]
+
+JSON menus look like this, all prices are in cents and price changes apply
+from the given time on:
+
+    {"drinks": [{"name": "tap_beer", "displayName": "Bier .4l", "basePrice": 250,
+                 "prices": [{"time": "2024-06-01T00:00:00", "price": 280}]}],
+     "layouts": [{"name": "default",
+                  "buttons": [{"xpos": 0, "ypos": 0, "drink": "tap_beer"},
+                              {"xpos": 4, "ypos": 4, "link": "cocktails",
+                               "displayName": "Cocktails"}]}]}
+
+CSV menus have the columns type, name, display_name, price, time, layout,
+xpos, ypos, drink and link, with one row per drink, price change, layout or
+button:
+
+    type,name,display_name,price,time,layout,xpos,ypos,drink,link
+    drink,tap_beer,Bier .4l,250,,,,,,
+    price,tap_beer,,280,2024-06-01T00:00:00,,,,,
+    layout,default,,,,,,,,
+    button,,,,,default,0,0,tap_beer,
+
+The same import is available at POST /api/menu/import with the content type
+application/json or text/csv.
+"""
+
+import json
+import sys
+
+from kellerclub_drinks.datastores import datastore_factory
+from kellerclub_drinks.model.menus import Menu
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    menu_file = sys.argv[1]
+    settings_file = sys.argv[2] if len(sys.argv) > 2 else 'settings.json'
+    with open(settings_file, 'r', encoding='utf8') as file:
+        data_store_settings = json.load(file)['datastore']
+    with open(menu_file, 'r', encoding='utf8') as file:
+        content = file.read()
+
+    menu = Menu.from_csv(content) if menu_file.endswith('.csv') else Menu.from_json(content)
+
+    store = datastore_factory.from_settings(data_store_settings)
+    try:
+        problems = menu.problems(store.all_drinks().keys(), store.all_layouts().keys())
+        if problems:
+            print('The menu cannot be imported:')
+            for problem in problems:
+                print(f'- {problem}')
+            sys.exit(1)
+
+        store.import_menu(menu)
+    finally:
+        store.close()
+
+    print(f'Imported {len(menu.drinks)} drinks, {len(menu.layouts)} layouts '
+          f'and {len(menu.buttons)} buttons.')
+
+
+if __name__ == '__main__':
+    main()
@@ -61,3 +61,131 @@ CREATE TABLE LinkButton (
     FOREIGN KEY (button_id) REFERENCES SelectorButton(id),
     FOREIGN KEY (linked_layout) REFERENCES SelectorLayout(name)
 );
+
+-- running totals per event and drink, maintained by triggers so that live
+-- sales figures can be read without aggregating all orders
+CREATE TABLE EventTotal (
+    event TIMESTAMP NOT NULL,
+    drink_name VARCHAR(100) NOT NULL,
+    count INTEGER UNSIGNED NOT NULL,
+    revenue INTEGER UNSIGNED NOT NULL,
+
+    PRIMARY KEY (event, drink_name),
+    FOREIGN KEY (event) REFERENCES Event(start_time),
+    FOREIGN KEY (drink_name) REFERENCES Drink(name)
+);
+
+CREATE TRIGGER PurchaseOrderCounted AFTER INSERT ON PurchaseOrder FOR EACH ROW
+    INSERT INTO EventTotal(event, drink_name, count, revenue)
+    VALUES (NEW.event, NEW.drink_name, 1,
+            coalesce((SELECT price FROM Prices
+                      WHERE drink = NEW.drink_name AND end_time <= NEW.time
+                      ORDER BY end_time DESC
+                      LIMIT 1),
+                     (SELECT base_price FROM Drink WHERE name = NEW.drink_name)))
+    ON DUPLICATE KEY UPDATE count = count + 1, revenue = revenue + VALUES(revenue);
+
+CREATE TRIGGER PurchaseOrderUncounted AFTER DELETE ON PurchaseOrder FOR EACH ROW
+    UPDATE EventTotal
+    SET count = count - 1,
+        revenue = revenue - coalesce((SELECT price FROM Prices
+                                      WHERE drink = OLD.drink_name AND end_time <= OLD.time
+                                      ORDER BY end_time DESC
+                                      LIMIT 1),
+                                     (SELECT base_price FROM Drink WHERE name = OLD.drink_name))
+    WHERE event = OLD.event AND drink_name = OLD.drink_name;
+
+-- counters that change whenever the data of a topic changes, so that caches
+-- can cheaply check if they are still up to date
+CREATE TABLE ChangeCounter (
+    topic VARCHAR(100) NOT NULL PRIMARY KEY,
+    counter BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT INTO ChangeCounter(topic) VALUES ('drinks'), ('layouts'), ('events');
+
+CREATE TRIGGER DrinkInserted AFTER INSERT ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+-- order buttons show the display names of drinks
+CREATE TRIGGER DrinkUpdated AFTER UPDATE ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+
+CREATE TRIGGER DrinkDeleted AFTER DELETE ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+
+CREATE TRIGGER PricesInserted AFTER INSERT ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER PricesUpdated AFTER UPDATE ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER PricesDeleted AFTER DELETE ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER SelectorLayoutInserted AFTER INSERT ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorLayoutUpdated AFTER UPDATE ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorLayoutDeleted AFTER DELETE ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonInserted AFTER INSERT ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonUpdated AFTER UPDATE ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonDeleted AFTER DELETE ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonInserted AFTER INSERT ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonUpdated AFTER UPDATE ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonDeleted AFTER DELETE ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonInserted AFTER INSERT ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonUpdated AFTER UPDATE ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonDeleted AFTER DELETE ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER EventInserted AFTER INSERT ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+
+CREATE TRIGGER EventUpdated AFTER UPDATE ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+
+CREATE TRIGGER EventDeleted AFTER DELETE ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+
+-- client-generated ids of submitted batches of orders, so that retried
+-- submissions are only stored once
+CREATE TABLE SubmittedBatch (
+    id CHAR(36) NOT NULL PRIMARY KEY
+);
+
+ALTER TABLE PurchaseOrder
+    ADD COLUMN batch CHAR(36),
+    ADD FOREIGN KEY (batch) REFERENCES SubmittedBatch(id);
+
+-- indexes for the lookups that scan whole tables once the order history grows,
+-- InnoDB already indexes the foreign key columns
+CREATE INDEX EventEndTime ON Event(end_time);
+CREATE INDEX PricesDrinkEndTime ON Prices(drink, end_time);
+
+-- this script creates the schema of the latest migration in scripts/migrations
+CREATE TABLE SchemaVersion (
+    version INTEGER NOT NULL
+);
+
+INSERT INTO SchemaVersion(version) VALUES (5);
@@ -54,3 +54,176 @@ CREATE TABLE LinkButton (
     linked_layout TEXT NOT NULL
         REFERENCES SelectorLayout(name)
 );
+
+-- running totals per event and drink, maintained by triggers so that live
+-- sales figures can be read without aggregating all orders
+CREATE TABLE EventTotal (
+    event NUMERIC NOT NULL
+        REFERENCES Event(start_time),
+    drink_name TEXT NOT NULL
+        REFERENCES Drink(name),
+    count INTEGER NOT NULL,
+    revenue INTEGER NOT NULL,
+
+    PRIMARY KEY (event, drink_name)
+);
+
+CREATE TRIGGER PurchaseOrderCounted AFTER INSERT ON PurchaseOrder
+BEGIN
+    INSERT INTO EventTotal(event, drink_name, count, revenue)
+    VALUES (NEW.event, NEW.drink_name, 1,
+            coalesce((SELECT price FROM Prices
+                      WHERE drink = NEW.drink_name AND end_time <= NEW.time
+                      ORDER BY end_time DESC
+                      LIMIT 1),
+                     (SELECT base_price FROM Drink WHERE name = NEW.drink_name)))
+    ON CONFLICT (event, drink_name) DO UPDATE
+    SET count = count + 1, revenue = revenue + excluded.revenue;
+END;
+
+CREATE TRIGGER PurchaseOrderUncounted AFTER DELETE ON PurchaseOrder
+BEGIN
+    UPDATE EventTotal
+    SET count = count - 1,
+        revenue = revenue - coalesce((SELECT price FROM Prices
+                                      WHERE drink = OLD.drink_name AND end_time <= OLD.time
+                                      ORDER BY end_time DESC
+                                      LIMIT 1),
+                                     (SELECT base_price FROM Drink WHERE name = OLD.drink_name))
+    WHERE event = OLD.event AND drink_name = OLD.drink_name;
+END;
+
+-- counters that change whenever the data of a topic changes, so that caches
+-- can cheaply check if they are still up to date
+CREATE TABLE ChangeCounter (
+    topic TEXT NOT NULL PRIMARY KEY,
+    counter INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO ChangeCounter(topic) VALUES ('drinks'), ('layouts'), ('events');
+
+CREATE TRIGGER DrinkInserted AFTER INSERT ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+-- order buttons show the display names of drinks
+CREATE TRIGGER DrinkUpdated AFTER UPDATE ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+END;
+
+CREATE TRIGGER DrinkDeleted AFTER DELETE ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+END;
+
+CREATE TRIGGER PricesInserted AFTER INSERT ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER PricesUpdated AFTER UPDATE ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER PricesDeleted AFTER DELETE ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER SelectorLayoutInserted AFTER INSERT ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorLayoutUpdated AFTER UPDATE ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorLayoutDeleted AFTER DELETE ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonInserted AFTER INSERT ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonUpdated AFTER UPDATE ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonDeleted AFTER DELETE ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonInserted AFTER INSERT ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonUpdated AFTER UPDATE ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonDeleted AFTER DELETE ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonInserted AFTER INSERT ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonUpdated AFTER UPDATE ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonDeleted AFTER DELETE ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER EventInserted AFTER INSERT ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
+
+CREATE TRIGGER EventUpdated AFTER UPDATE ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
+
+CREATE TRIGGER EventDeleted AFTER DELETE ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
+
+-- client-generated ids of submitted batches of orders, so that retried
+-- submissions are only stored once
+CREATE TABLE SubmittedBatch (
+    id TEXT NOT NULL PRIMARY KEY
+) WITHOUT ROWID;
+
+ALTER TABLE PurchaseOrder ADD COLUMN batch TEXT REFERENCES SubmittedBatch(id);
+
+-- indexes for the lookups that scan whole tables once the order history grows
+CREATE INDEX PurchaseOrderEvent ON PurchaseOrder(event);
+CREATE INDEX EventEndTime ON Event(end_time);
+CREATE INDEX SelectorButtonLayout ON SelectorButton(layout_name);
+CREATE INDEX OrderButtonButton ON OrderButton(button_id);
+CREATE INDEX LinkButtonButton ON LinkButton(button_id);
+CREATE INDEX PricesDrinkEndTime ON Prices(drink, end_time);
+CREATE INDEX PurchaseOrderBatch ON PurchaseOrder(batch) WHERE batch IS NOT NULL;
+
+-- this script creates the schema of the latest migration in scripts/migrations
+PRAGMA user_version = 5;
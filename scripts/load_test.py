@@ -0,0 +1,99 @@
+"""Compares the WSGI and the ASGI entry point under load while many clients
+keep idle connections open, like live dashboards waiting for updates do.
+
+Start both servers from the src directory with the same settings, e.g.
+    python ../scripts/local_server.py              (WSGI, port 8000)
+    uvicorn app_asgi:application --port 8001       (ASGI)
+then run
+
+Usage: python scripts/load_test.py [wsgi url] [asgi url] [idle connections] [requests] [concurrency]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+
+async def _request(host: str, port: int, path: str) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+                     f'Connection: close\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()  # the rest of the response until the server closes
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _idle_connection(host: str, port: int, stop: asyncio.Event) -> None:
+    # an incomplete request keeps the connection busy without ever finishing
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return
+    writer.write(f'GET / HTTP/1.1\r\nHost: {host}\r\n'.encode('latin-1'))
+    await writer.drain()
+    await stop.wait()
+    writer.close()
+    del reader
+
+
+async def _load(url: str, idle: int, requests: int, concurrency: int) -> None:
+    parsed = urlparse(url)
+    host, port, path = parsed.hostname or 'localhost', parsed.port or 80, parsed.path or '/'
+
+    stop = asyncio.Event()
+    idle_tasks = [asyncio.create_task(_idle_connection(host, port, stop)) for _ in range(idle)]
+    await asyncio.sleep(0.5)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(_request(host, port, path), 10)
+                if status >= 500:
+                    errors += 1
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*idle_tasks)
+
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f'{url}: {len(latencies) / duration:8.1f} requests/s, '
+              f'p50 {quantiles[49] * 1000:7.1f}ms, p99 {quantiles[98] * 1000:7.1f}ms, '
+              f'{errors} errors')
+    else:
+        print(f'{url}: no successful requests, {errors} errors')
+
+
+def main() -> None:
+    wsgi_url = sys.argv[1] if len(sys.argv) > 1 else 'http://localhost:8000/drinks'
+    asgi_url = sys.argv[2] if len(sys.argv) > 2 else 'http://localhost:8001/drinks'
+    idle = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    requests = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+    concurrency = int(sys.argv[5]) if len(sys.argv) > 5 else 20
+
+    for url in (wsgi_url, asgi_url):
+        asyncio.run(_load(url, idle, requests, concurrency))
+
+
+if __name__ == '__main__':
+    main()
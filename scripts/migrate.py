@@ -0,0 +1,31 @@
+"""Brings the schema of the configured database up to the latest version.
+
+Run it from the directory the application runs in, so that relative database
+paths in the settings file resolve the same way.
+
+Usage: PYTHONPATH=. python ../scripts/migrate.py [settings file]
+"""
+
+import json
+import os
+import sys
+
+from kellerclub_drinks.datastores.migrations import migrate
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), 'migrations')
+
+
+def main() -> None:
+    settings_file = sys.argv[1] if len(sys.argv) > 1 else 'settings.json'
+    with open(settings_file, 'r', encoding='utf8') as file:
+        data_store_settings = json.load(file)['datastore']
+
+    applied = migrate(data_store_settings, MIGRATIONS)
+    if applied:
+        print(f'Migrated to version {applied[-1]}.')
+    else:
+        print('Database is up to date.')
+
+
+if __name__ == '__main__':
+    main()
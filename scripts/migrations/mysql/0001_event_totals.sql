@@ -0,0 +1,45 @@
+-- running totals per event and drink, maintained by triggers so that live
+-- sales figures can be read without aggregating all orders
+CREATE TABLE EventTotal (
+    event TIMESTAMP NOT NULL,
+    drink_name VARCHAR(100) NOT NULL,
+    count INTEGER UNSIGNED NOT NULL,
+    revenue INTEGER UNSIGNED NOT NULL,
+
+    PRIMARY KEY (event, drink_name),
+    FOREIGN KEY (event) REFERENCES Event(start_time),
+    FOREIGN KEY (drink_name) REFERENCES Drink(name)
+);
+
+-- count the orders placed before the triggers existed
+INSERT INTO EventTotal(event, drink_name, count, revenue)
+SELECT event, drink_name, count(*),
+       sum(coalesce((SELECT price FROM Prices
+                              WHERE drink = PurchaseOrder.drink_name
+                                  AND end_time <= PurchaseOrder.time
+                              ORDER BY end_time DESC
+                              LIMIT 1),
+                             (SELECT base_price FROM Drink
+                              WHERE name = PurchaseOrder.drink_name)))
+FROM PurchaseOrder
+GROUP BY event, drink_name;
+
+CREATE TRIGGER PurchaseOrderCounted AFTER INSERT ON PurchaseOrder FOR EACH ROW
+    INSERT INTO EventTotal(event, drink_name, count, revenue)
+    VALUES (NEW.event, NEW.drink_name, 1,
+            coalesce((SELECT price FROM Prices
+                      WHERE drink = NEW.drink_name AND end_time <= NEW.time
+                      ORDER BY end_time DESC
+                      LIMIT 1),
+                     (SELECT base_price FROM Drink WHERE name = NEW.drink_name)))
+    ON DUPLICATE KEY UPDATE count = count + 1, revenue = revenue + VALUES(revenue);
+
+CREATE TRIGGER PurchaseOrderUncounted AFTER DELETE ON PurchaseOrder FOR EACH ROW
+    UPDATE EventTotal
+    SET count = count - 1,
+        revenue = revenue - coalesce((SELECT price FROM Prices
+                                      WHERE drink = OLD.drink_name AND end_time <= OLD.time
+                                      ORDER BY end_time DESC
+                                      LIMIT 1),
+                                     (SELECT base_price FROM Drink WHERE name = OLD.drink_name))
+    WHERE event = OLD.event AND drink_name = OLD.drink_name;
@@ -0,0 +1,63 @@
+-- counters that change whenever the data of a topic changes, so that caches
+-- can cheaply check if they are still up to date
+CREATE TABLE ChangeCounter (
+    topic VARCHAR(100) NOT NULL PRIMARY KEY,
+    counter BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT INTO ChangeCounter(topic) VALUES ('drinks'), ('layouts');
+
+CREATE TRIGGER DrinkInserted AFTER INSERT ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+-- order buttons show the display names of drinks
+CREATE TRIGGER DrinkUpdated AFTER UPDATE ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+
+CREATE TRIGGER DrinkDeleted AFTER DELETE ON Drink FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+
+CREATE TRIGGER PricesInserted AFTER INSERT ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER PricesUpdated AFTER UPDATE ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER PricesDeleted AFTER DELETE ON Prices FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+
+CREATE TRIGGER SelectorLayoutInserted AFTER INSERT ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorLayoutUpdated AFTER UPDATE ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorLayoutDeleted AFTER DELETE ON SelectorLayout FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonInserted AFTER INSERT ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonUpdated AFTER UPDATE ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER SelectorButtonDeleted AFTER DELETE ON SelectorButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonInserted AFTER INSERT ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonUpdated AFTER UPDATE ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER OrderButtonDeleted AFTER DELETE ON OrderButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonInserted AFTER INSERT ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonUpdated AFTER UPDATE ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+
+CREATE TRIGGER LinkButtonDeleted AFTER DELETE ON LinkButton FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
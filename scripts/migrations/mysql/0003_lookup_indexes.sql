@@ -0,0 +1,4 @@
+-- indexes for the lookups that scan whole tables once the order history grows,
+-- InnoDB already indexes the foreign key columns
+CREATE INDEX EventEndTime ON Event(end_time);
+CREATE INDEX PricesDrinkEndTime ON Prices(drink, end_time);
@@ -0,0 +1,12 @@
+-- lets caches of the current event notice events started or stopped by
+-- other processes
+INSERT INTO ChangeCounter(topic) VALUES ('events');
+
+CREATE TRIGGER EventInserted AFTER INSERT ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+
+CREATE TRIGGER EventUpdated AFTER UPDATE ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+
+CREATE TRIGGER EventDeleted AFTER DELETE ON Event FOR EACH ROW
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
@@ -0,0 +1,10 @@
+-- client-generated ids of submitted batches of orders, so that retried
+-- submissions are only stored once
+CREATE TABLE SubmittedBatch (
+    id CHAR(36) NOT NULL PRIMARY KEY
+);
+
+-- InnoDB indexes the foreign key column
+ALTER TABLE PurchaseOrder
+    ADD COLUMN batch CHAR(36),
+    ADD FOREIGN KEY (batch) REFERENCES SubmittedBatch(id);
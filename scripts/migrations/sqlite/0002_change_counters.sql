@@ -0,0 +1,99 @@
+-- counters that change whenever the data of a topic changes, so that caches
+-- can cheaply check if they are still up to date
+CREATE TABLE ChangeCounter (
+    topic TEXT NOT NULL PRIMARY KEY,
+    counter INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO ChangeCounter(topic) VALUES ('drinks'), ('layouts');
+
+CREATE TRIGGER DrinkInserted AFTER INSERT ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+-- order buttons show the display names of drinks
+CREATE TRIGGER DrinkUpdated AFTER UPDATE ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+END;
+
+CREATE TRIGGER DrinkDeleted AFTER DELETE ON Drink
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic IN ('drinks', 'layouts');
+END;
+
+CREATE TRIGGER PricesInserted AFTER INSERT ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER PricesUpdated AFTER UPDATE ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER PricesDeleted AFTER DELETE ON Prices
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'drinks';
+END;
+
+CREATE TRIGGER SelectorLayoutInserted AFTER INSERT ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorLayoutUpdated AFTER UPDATE ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorLayoutDeleted AFTER DELETE ON SelectorLayout
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonInserted AFTER INSERT ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonUpdated AFTER UPDATE ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER SelectorButtonDeleted AFTER DELETE ON SelectorButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonInserted AFTER INSERT ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonUpdated AFTER UPDATE ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER OrderButtonDeleted AFTER DELETE ON OrderButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonInserted AFTER INSERT ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonUpdated AFTER UPDATE ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
+
+CREATE TRIGGER LinkButtonDeleted AFTER DELETE ON LinkButton
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'layouts';
+END;
@@ -0,0 +1,7 @@
+-- indexes for the lookups that scan whole tables once the order history grows
+CREATE INDEX IF NOT EXISTS PurchaseOrderEvent ON PurchaseOrder(event);
+CREATE INDEX IF NOT EXISTS EventEndTime ON Event(end_time);
+CREATE INDEX IF NOT EXISTS SelectorButtonLayout ON SelectorButton(layout_name);
+CREATE INDEX IF NOT EXISTS OrderButtonButton ON OrderButton(button_id);
+CREATE INDEX IF NOT EXISTS LinkButtonButton ON LinkButton(button_id);
+CREATE INDEX IF NOT EXISTS PricesDrinkEndTime ON Prices(drink, end_time);
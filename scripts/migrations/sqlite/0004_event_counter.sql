@@ -0,0 +1,18 @@
+-- lets caches of the current event notice events started or stopped by
+-- other processes
+INSERT INTO ChangeCounter(topic) VALUES ('events');
+
+CREATE TRIGGER EventInserted AFTER INSERT ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
+
+CREATE TRIGGER EventUpdated AFTER UPDATE ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
+
+CREATE TRIGGER EventDeleted AFTER DELETE ON Event
+BEGIN
+    UPDATE ChangeCounter SET counter = counter + 1 WHERE topic = 'events';
+END;
@@ -0,0 +1,9 @@
+-- client-generated ids of submitted batches of orders, so that retried
+-- submissions are only stored once
+CREATE TABLE SubmittedBatch (
+    id TEXT NOT NULL PRIMARY KEY
+) WITHOUT ROWID;
+
+ALTER TABLE PurchaseOrder ADD COLUMN batch TEXT REFERENCES SubmittedBatch(id);
+
+CREATE INDEX PurchaseOrderBatch ON PurchaseOrder(batch) WHERE batch IS NOT NULL;
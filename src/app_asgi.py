@@ -0,0 +1,21 @@
+"""ASGI entry point, serving the same application as app.wsgi.
+
+Run it with any ASGI server from this directory, e.g.
+    uvicorn app_asgi:application
+"""
+
+from typing import Any
+
+from kellerclub_drinks.asgi import AsgiAdapter
+
+
+def _load_wsgi_globals() -> dict[str, Any]:
+    # app.wsgi is not importable as a module, it is loaded like mod_wsgi does
+    with open('app.wsgi', 'rb') as app_file:
+        app_globals: dict[str, Any] = {'__file__': 'app.wsgi'}
+        exec(app_file.read(), app_globals)  # pylint: disable=exec-used
+        return app_globals
+
+
+_wsgi = _load_wsgi_globals()
+application = AsgiAdapter(_wsgi['application'], _wsgi['settings'].asgi_workers)
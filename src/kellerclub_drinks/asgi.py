@@ -0,0 +1,184 @@
+"""Serves the WSGI application to ASGI servers.
+
+Routing, handlers and datastore calls stay synchronous and run on a bounded
+thread pool, while the event loop of the ASGI server only waits for them.
+Idle connections and slow clients therefore do not occupy a thread, only
+requests that are actually being handled do.
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterator, Optional
+from wsgiref.types import WSGIApplication, WSGIEnvironment
+
+Scope = dict[str, Any]
+Message = dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# returned by _next_chunk instead of raising StopIteration, which cannot
+# cross the boundary of a future
+_END = object()
+
+
+class AsgiAdapter:
+    """An ASGI application that runs a WSGI application on a thread pool.
+
+    Response bodies are sent chunk by chunk as the WSGI application produces
+    them. Bodies that can also be iterated asynchronously (i.e. implement
+    __aiter__) are consumed on the event loop instead, so that responses
+    waiting for events do not hold a thread.
+    """
+
+    def __init__(self, app: WSGIApplication, max_workers: int = 8):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='asgi')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        match scope['type']:
+            case 'http':
+                await self._http(scope, receive, send)
+            case 'lifespan':
+                await self._lifespan(receive, send)
+            case _:
+                raise ValueError(f"Unsupported ASGI scope type {scope['type']}!")
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = await _read_body(receive)
+        if body is None:
+            return  # the client went away before the request was complete
+
+        environ = _environ(scope, body)
+        # status and headers passed to the latest call of start_response
+        response: list[tuple[str, list[tuple[str, str]]]] = []
+
+        def start_response(status: str, headers: list[tuple[str, str]],
+                           exc_info: Optional[Any] = None) -> Callable[[bytes], object]:
+            if exc_info is not None and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [(status, headers)]
+            return _no_write
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self.app, environ, start_response)
+        try:
+            if isinstance(result, AsyncIterable):
+                await _send_start(response, send)
+                if not await _send_until_disconnect(result, receive, send):
+                    return
+            else:
+                chunks = iter(result)
+                chunk: object = b''
+                if not response:
+                    # PEP 3333 allows calling start_response as late as when
+                    # the first chunk is produced
+                    chunk = await loop.run_in_executor(self.executor, _next_chunk, chunks)
+                await _send_start(response, send)
+                while chunk is not _END:
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk,
+                                    'more_body': True})
+                    chunk = await loop.run_in_executor(self.executor, _next_chunk, chunks)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if (close := getattr(result, 'close', None)) is not None:
+                await loop.run_in_executor(self.executor, close)
+
+
+async def _send_until_disconnect(body: AsyncIterable[bytes], receive: Receive,
+                                 send: Send) -> bool:
+    # asynchronous bodies may wait for events indefinitely, so they are only
+    # sent as long as the client is connected
+    async def forward() -> None:
+        async for chunk in body:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    async def wait_for_disconnect() -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    forwarding = asyncio.ensure_future(forward())
+    disconnect = asyncio.ensure_future(wait_for_disconnect())
+    await asyncio.wait({forwarding, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    for task in (forwarding, disconnect):
+        task.cancel()
+    if forwarding.done() and not forwarding.cancelled():
+        forwarding.result()  # raises the errors of the body
+        return True
+    return False
+
+
+async def _send_start(response: list[tuple[str, list[tuple[str, str]]]], send: Send) -> None:
+    if not response:
+        raise RuntimeError('The WSGI application did not call start_response!')
+    status, headers = response[0]
+    await send({'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                            for name, value in headers]})
+
+
+def _no_write(_: bytes) -> None:
+    raise NotImplementedError('The write callable of start_response is not supported!')
+
+
+def _next_chunk(chunks: Iterator[bytes]) -> object:
+    return next(chunks, _END)
+
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    parts = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        parts.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(parts)
+
+
+def _environ(scope: Scope, body: bytes) -> WSGIEnvironment:
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    # WSGI passes the path as the raw bytes decoded as latin-1
+    raw_path = scope.get('raw_path') or scope['path'].encode('utf-8')
+    environ: WSGIEnvironment = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': raw_path.split(b'?', 1)[0].decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for raw_name, raw_value in scope['headers']:
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            # repeated headers are combined like a WSGI server would
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
@@ -0,0 +1,122 @@
+"""Content codings supported for HTTP responses.
+
+Brotli is only offered if the optional brotli package is installed, gzip is
+always available.
+"""
+
+import gzip
+import zlib
+from typing import Optional, Protocol
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:
+    brotli = None
+
+# content codings in order of preference
+ENCODINGS = (['br'] if brotli is not None else []) + ['gzip']
+
+# responses smaller than this are not worth the CPU time and framing overhead
+MIN_SIZE = 1024
+
+# brotli quality for responses compressed while they are served; the maximum
+# of 11 is many times slower for a few percent less, so it is only used for
+# static files, which are compressed once
+DYNAMIC_QUALITY = 5
+STATIC_QUALITY = 11
+
+_COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson',
+                       'application/javascript', 'image/svg+xml')
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Whether content of the given type benefits from compression.
+
+    Images and fonts like woff2 are already compressed.
+    """
+
+    return content_type is not None and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encoding: Optional[str], available: list[str]) -> Optional[str]:
+    """Selects the preferred content coding among the available ones that is
+    acceptable according to the Accept-Encoding header, if any.
+    """
+
+    if not accept_encoding or not available:
+        return None
+
+    weights: dict[str, float] = {}
+    for entry in accept_encoding.split(','):
+        coding, _, params = entry.strip().partition(';')
+        weight = 1.0
+        if (param := params.strip()).startswith('q='):
+            try:
+                weight = float(param[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    acceptable = [encoding for encoding in available
+                  if weights.get(encoding, wildcard) > 0]
+    if not acceptable:
+        return None
+    return max(acceptable, key=lambda encoding: weights.get(encoding, wildcard))
+
+
+def compress(content: bytes, encoding: str, quality: int = DYNAMIC_QUALITY) -> bytes:
+    """Compresses the whole content with the given content coding.
+
+    The quality only applies to brotli.
+    """
+
+    if encoding == 'br' and brotli is not None:
+        return bytes(brotli.compress(content, quality=quality))
+    if encoding == 'gzip':
+        return gzip.compress(content, mtime=0)
+    raise ValueError(f'Unsupported content coding {encoding}!')
+
+
+class StreamCompressor(Protocol):
+    """Compresses content piece by piece."""
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compresses a chunk and returns everything the client can decode
+        up to its end.
+        """
+
+    def finish(self) -> bytes:
+        """Returns the end of the compressed stream."""
+
+
+class _GzipStreamCompressor:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(wbits=31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStreamCompressor:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=DYNAMIC_QUALITY)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return bytes(self._compressor.process(chunk) + self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.finish())
+
+
+def stream_compressor(encoding: str) -> StreamCompressor:
+    """Creates a compressor for content that is produced while it is sent."""
+
+    if encoding == 'br' and brotli is not None:
+        return _BrotliStreamCompressor()
+    if encoding == 'gzip':
+        return _GzipStreamCompressor()
+    raise ValueError(f'Unsupported content coding {encoding}!')
@@ -0,0 +1,131 @@
+"""In-memory caching of rarely changing data for any datastore."""
+
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Generic, Optional, TypeVar, cast
+
+from .datastore import DataStore, Topic
+from .delegating_store import DelegatingStore
+from ..model.drinks import Drink
+from ..model.events import Event
+from ..model.layouts import Layout
+from ..model.menus import Menu
+
+T = TypeVar('T')
+
+
+class CachedValue(Generic[T]):
+    """A value loaded from a datastore that is kept until it is invalidated.
+
+    If revalidate is set, the revision of the value's topic is compared against
+    the revision the value was loaded at on each access, so that changes made
+    by other processes are picked up as well.
+    """
+
+    def __init__(self, store: DataStore, topic: Topic, load: Callable[[], T],
+                 revalidate: bool):
+        self.load = load
+        # reads the current revision of the value's topic, if revalidating
+        self._current_revision: Optional[Callable[[], int]] = \
+            (lambda: store.revision(topic)) if revalidate else None
+        self._lock = Lock()
+        self._value: Optional[T] = None
+        self._loaded = False
+        self._revision: Optional[int] = None
+        self._generation = 0
+
+    def get(self) -> T:
+        """Returns the cached value, loading it first if it is outdated."""
+
+        revision = self._current_revision() if self._current_revision is not None else None
+        with self._lock:
+            if not self._loaded or revision != self._revision:
+                # read the revision first, a concurrent change then at worst
+                # causes another reload
+                self._value = self.load()
+                self._loaded = True
+                self._revision = revision
+                self._generation += 1
+            return cast(T, self._value)
+
+    @property
+    def generation(self) -> int:
+        """Counts how often the value has been loaded, loading it first if it
+        is missing, but without revalidating it."""
+
+        if not self._loaded:
+            self.get()
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Discards the cached value."""
+
+        with self._lock:
+            self._value = None
+            self._loaded = False
+
+
+class CachingStore(DelegatingStore):
+    """Keeps the drink catalog, the layouts and the current event of another
+    datastore in memory.
+
+    The cache is invalidated when a drink is added or an event is started or
+    stopped through this store. With revalidate set, changes by other
+    processes are detected with the cheap revision counters of the wrapped
+    store. Layouts are usually only changed directly in the database, so they
+    are only reloaded on revalidation.
+
+    The revisions of this store count the reloads of the cached data, so they
+    only change once the changed data has been read through this store.
+    """
+
+    def __init__(self, store: DataStore, revalidate: bool = False):
+        super().__init__(store)
+        self._drinks = CachedValue(store, 'drinks', store.all_drinks, revalidate)
+        self._layouts = CachedValue(store, 'layouts', store.all_layouts, revalidate)
+        self._current_event = CachedValue(store, 'events', store.current_event, revalidate)
+        self._values: dict[Topic, CachedValue[Any]] = {
+            'drinks': self._drinks, 'layouts': self._layouts, 'events': self._current_event}
+
+    def all_drinks(self) -> dict[str, Drink]:
+        return dict(self._drinks.get())
+
+    def add_drink(self, drink: Drink) -> None:
+        try:
+            self.store.add_drink(drink)
+        finally:
+            self._drinks.invalidate()
+
+    def import_menu(self, menu: Menu) -> None:
+        try:
+            self.store.import_menu(menu)
+        finally:
+            self._drinks.invalidate()
+            self._layouts.invalidate()
+
+    def start_event(self, start_time: Optional[datetime] = None,
+                    name: Optional[str] = None) -> None:
+        try:
+            self.store.start_event(start_time, name)
+        finally:
+            self._current_event.invalidate()
+
+    def stop_current_event(self, end_time: Optional[datetime] = None) -> bool:
+        try:
+            return self.store.stop_current_event(end_time)
+        finally:
+            self._current_event.invalidate()
+
+    def current_event(self) -> Optional[Event]:
+        return self._current_event.get()
+
+    def all_layouts(self) -> dict[str, Layout]:
+        return dict(self._layouts.get())
+
+    def layout(self, name: str) -> Optional[Layout]:
+        return self._layouts.get().get(name)
+
+    def revision(self, topic: Topic) -> int:
+        # the cached values are checked against the wrapped store when they
+        # are read, so counting their reloads needs no database round trip
+        return self._values[topic].generation
@@ -4,11 +4,86 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Collection, Generator, Literal, Optional
 
 from ..model.drinks import Drink
 from ..model.events import Event
 from ..model.layouts import Layout
+from ..model.menus import Menu
+from ..model.orders import Order
+from ..model.reports import DrinkSales, SalesReport
+
+Topic = Literal['drinks', 'layouts', 'events']
+
+OrderBatch = tuple[
+    datetime,  # event_id
+    list[str],  # drinks
+    Optional[str]]  # batch_id
+
+
+ButtonRows = tuple[
+    list[tuple[int, str, int, int, Optional[str]]],  # id, layout, xpos, ypos, display_name
+    list[tuple[int, str]],  # button_id, drink_name
+    list[tuple[int, str]]]  # button_id, linked_layout
+
+
+def button_rows(menu: Menu, first_id: int) -> ButtonRows:
+    """Numbers the buttons of a menu starting at first_id and splits them
+    into rows for SelectorButton, OrderButton and LinkButton.
+    """
+
+    selector_rows, order_rows, link_rows = [], [], []
+    for button_id, button in enumerate(menu.buttons, start=first_id):
+        selector_rows.append((button_id, button.layout, button.xpos, button.ypos,
+                              button.display_name))
+        if button.drink_name is not None:
+            order_rows.append((button_id, button.drink_name))
+        if button.linked_layout is not None:
+            link_rows.append((button_id, button.linked_layout))
+    return selector_rows, order_rows, link_rows
+
+
+def fresh_batches(batches: list[OrderBatch], claimed: Collection[str]) -> list[bool]:
+    """Tells for each batch whether its orders still need to be inserted.
+
+    That is the case for batches without a batch id and for the first batch
+    with a batch id that has just been claimed. All other batches repeat one
+    whose orders have already been stored.
+    """
+
+    result = []
+    seen = set()
+    for _, _, batch_id in batches:
+        if batch_id is None:
+            result.append(True)
+        else:
+            result.append(batch_id in claimed and batch_id not in seen)
+            seen.add(batch_id)
+    return result
+
+
+def split_ids(ids: list[int], batches: list[OrderBatch], fresh: list[bool],
+              stored: dict[str, list[int]]) -> list[list[int]]:
+    """Splits the ids of orders inserted for the fresh batches by batch, and
+    uses the ids stored before for the batches that were repeated.
+
+    The ids must be in the order in which the orders were inserted.
+    """
+
+    result = []
+    start = 0
+    for (_, drinks, batch_id), is_fresh in zip(batches, fresh):
+        if is_fresh:
+            result.append(ids[start:start + len(drinks)])
+            start += len(drinks)
+        else:
+            result.append(stored.get(batch_id or '', []))
+    return result
+
+
+class ConcurrentWriteError(Exception):
+    """Raised if a write failed because a concurrent transaction wrote the
+    same data, e.g. submitted the same batch, so that it can be retried."""
 
 
 class DataStore(ABC):
@@ -21,6 +96,24 @@ class DataStore(ABC):
         a meaningful error message.
         """
 
+    def is_transient(self, e: Exception) -> bool:
+        """Tells if the exception is caused by concurrent transactions, e.g. a
+        lock held by another one, so that repeating the call can succeed.
+        """
+
+        return isinstance(e, ConcurrentWriteError)
+
+    def close(self) -> None:
+        """Releases all resources held by the datastore."""
+
+    def explain(self, statement: str) -> list[str]:  # pylint: disable=unused-argument
+        """Describes how the database would execute the given statement.
+
+        Returns an empty list if the datastore cannot explain statements.
+        """
+
+        return []
+
     @abstractmethod
     def all_drinks(self) -> dict[str, Drink]:
         """
@@ -35,6 +128,14 @@ class DataStore(ABC):
         can process.
         """
 
+    @abstractmethod
+    def import_menu(self, menu: Menu) -> None:
+        """Adds the drinks, prices and layouts of a menu in a single
+        transaction, so that either all or none of them are added.
+
+        The menu should have been checked with Menu.problems before.
+        """
+
     @abstractmethod
     def start_event(self, start_time: Optional[datetime] = None,
                     name: Optional[str] = None) -> None:
@@ -60,12 +161,77 @@ class DataStore(ABC):
         """Returns the current event, if there is one, and None otherwise."""
 
     @abstractmethod
-    def submit_order(self, event_id: datetime, drinks: list[str]) -> list[int]:
+    def event(self, start_time: datetime) -> Optional[Event]:
+        """Returns the event started at the given time, if it exists, and None
+        otherwise."""
+
+    @abstractmethod
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
         """Adds orders with the current timestamp to the list of orders for the
         given event.
 
-        Returns integers identifying the inserted orders."""
+        If the client identifies the orders with a batch id, e.g. a UUID, they
+        are only added the first time that batch id is submitted, so clients
+        can safely retry submissions.
+
+        Returns integers identifying the inserted orders, or the ones inserted
+        before for a repeated batch id."""
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        """Adds several batches of orders, possibly for different events.
+
+        Stores that support it write all batches in a single transaction.
+
+        Returns the integers identifying the inserted orders for each batch."""
+
+        return [self.submit_order(event_id, drinks, batch_id)
+                for event_id, drinks, batch_id in batches]
+
+    @abstractmethod
+    def orders(self, event_id: datetime, after: int = 0) -> Generator[Order, None, None]:
+        """Yields the orders of the given event in the order they were
+        submitted, only those with an identifier greater than after if given.
+
+        Rows are fetched from the database while iterating, so the generator
+        must be exhausted or closed to release the database connection.
+        """
 
     @abstractmethod
     def all_layouts(self) -> dict[str, Layout]:
         """Returns all persisted layouts, identified by their names."""
+
+    @abstractmethod
+    def layout(self, name: str) -> Optional[Layout]:
+        """Returns the layout with the given name, if it exists, and None
+        otherwise.
+
+        Only loads the buttons of the requested layout.
+        """
+
+    @abstractmethod
+    def sales_report(self, event_id: datetime) -> SalesReport:
+        """Returns the number of drinks sold at the given event and their
+        revenue, grouped by drink and by hour.
+
+        Each order is charged with the price of the drink at the time of the
+        order. The aggregation is done by the database.
+        """
+
+    @abstractmethod
+    def event_totals(self, event_id: datetime) -> list[DrinkSales]:
+        """Returns the number of sold units and the revenue per drink for the
+        given event.
+
+        The totals are maintained while orders are submitted, so the cost of
+        this method only depends on the number of drinks.
+        """
+
+    @abstractmethod
+    def revision(self, topic: Topic) -> int:
+        """Returns a counter that changes whenever data of the given topic
+        changes.
+
+        Reading the counter is much cheaper than reading the data itself, so
+        caches can use it to check if they are up-to-date.
+        """
@@ -1,7 +1,11 @@
 from pathlib import Path
 from typing import Any
 
+from .caching_store import CachingStore
 from .mysql_store import MysqlStore
+from .profiling_store import ProfilingStore, record_statement
+from .sqlite_profile import SqliteProfile
+from .write_behind_store import WriteBehindStore
 from ..datastores.datastore import DataStore
 from ..datastores.sqlite_store import SqliteStore
 
@@ -9,12 +13,34 @@ from ..datastores.sqlite_store import SqliteStore
 def from_settings(settings: dict[str, Any]) -> DataStore:
     """Creates a datastore based on the settings file."""
 
+    profiling_settings = settings.get('profiling')
+    store = _base_store(settings, profiling_settings is not None)
+
+    if profiling_settings is not None:
+        # directly around the base store, so that cache hits are not counted
+        slow_threshold = profiling_settings.get('slowQueryMs', 50) / 1000
+        store = ProfilingStore(store, slow_threshold, profiling_settings.get('dumpPath'))
+
+    if (write_behind_settings := settings.get('writeBehind')) is not None:
+        max_batch = write_behind_settings.get('maxBatch', 100)
+        max_delay = write_behind_settings.get('maxDelay', 10) / 1000
+        store = WriteBehindStore(store, max_batch, max_delay)
+
+    if (cache_settings := settings.get('cache')) is not None:
+        store = CachingStore(store, cache_settings.get('revalidate', False))
+
+    return store
+
+
+def _base_store(settings: dict[str, Any], trace: bool) -> DataStore:
     if settings['type'] == 'sqlite':
         try:
             path = Path(settings['path'])
         except KeyError as e:
             raise ValueError('SQLite database path not specified!') from e
-        return SqliteStore(path)
+        pool_size = settings.get('poolSize', 5)
+        profile = SqliteProfile.from_settings(settings.get('performance', {}))
+        return SqliteStore(path, pool_size, profile, record_statement if trace else None)
 
     elif settings['type'] == 'mysql':
         host = settings['host']
@@ -0,0 +1,103 @@
+"""Base class for datastores that add behaviour to another datastore."""
+
+from datetime import datetime
+from typing import Any, Callable, Collection, Generator, Optional
+
+from .datastore import DataStore, OrderBatch, Topic
+from ..model.drinks import Drink
+from ..model.events import Event
+from ..model.layouts import Layout
+from ..model.menus import Menu
+from ..model.orders import Order
+from ..model.reports import DrinkSales, SalesReport
+
+
+class DelegatingStore(DataStore):
+    """Forwards all calls to the wrapped datastore.
+
+    Subclasses override the methods whose behaviour they change.
+    """
+
+    def __init__(self, store: DataStore):
+        self.store = store
+
+    @classmethod
+    def wrap_calls(cls, call: Callable[..., Any], exclude: Collection[str] = ()) -> None:
+        """Makes the methods of this class that access data call
+        call(store, name, *args, **kwargs) instead of forwarding directly, so
+        that every such call can be measured in one place.
+
+        For generators, e.g. orders, call only covers creating the generator,
+        not iterating it.
+        """
+
+        for name in DataStore.__abstractmethods__ - set(exclude) | {'submit_orders'}:
+            setattr(cls, name, _wrapped(name, call))
+
+    def handle_exception(self, e: Exception) -> Optional[str]:
+        return self.store.handle_exception(e)
+
+    def is_transient(self, e: Exception) -> bool:
+        return self.store.is_transient(e)
+
+    def close(self) -> None:
+        self.store.close()
+
+    def explain(self, statement: str) -> list[str]:
+        return self.store.explain(statement)
+
+    def all_drinks(self) -> dict[str, Drink]:
+        return self.store.all_drinks()
+
+    def add_drink(self, drink: Drink) -> None:
+        self.store.add_drink(drink)
+
+    def import_menu(self, menu: Menu) -> None:
+        self.store.import_menu(menu)
+
+    def start_event(self, start_time: Optional[datetime] = None,
+                    name: Optional[str] = None) -> None:
+        self.store.start_event(start_time, name)
+
+    def stop_current_event(self, end_time: Optional[datetime] = None) -> bool:
+        return self.store.stop_current_event(end_time)
+
+    def current_event(self) -> Optional[Event]:
+        return self.store.current_event()
+
+    def event(self, start_time: datetime) -> Optional[Event]:
+        return self.store.event(start_time)
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        return self.store.submit_order(event_id, drinks, batch_id)
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        return self.store.submit_orders(batches)
+
+    def orders(self, event_id: datetime, after: int = 0) -> Generator[Order, None, None]:
+        return self.store.orders(event_id, after)
+
+    def all_layouts(self) -> dict[str, Layout]:
+        return self.store.all_layouts()
+
+    def layout(self, name: str) -> Optional[Layout]:
+        return self.store.layout(name)
+
+    def sales_report(self, event_id: datetime) -> SalesReport:
+        return self.store.sales_report(event_id)
+
+    def event_totals(self, event_id: datetime) -> list[DrinkSales]:
+        return self.store.event_totals(event_id)
+
+    def revision(self, topic: Topic) -> int:
+        return self.store.revision(topic)
+
+
+def _wrapped(name: str, call: Callable[..., Any]) -> Callable[..., Any]:
+    def method(self: DelegatingStore, *args: Any, **kwargs: Any) -> Any:
+        return call(self, name, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = getattr(DataStore, name).__doc__
+    return method
@@ -0,0 +1,20 @@
+"""Attributes the time spent in a datastore to the datastore phase of the
+current request.
+"""
+
+from typing import Any
+
+from .delegating_store import DelegatingStore
+from ..metrics import phase
+
+
+class MeteredStore(DelegatingStore):
+    """Times every call to the wrapped datastore, see wrap_calls."""
+
+
+def _metered_call(store: MeteredStore, name: str, *args: Any, **kwargs: Any) -> Any:
+    with phase('datastore'):
+        return getattr(store.store, name)(*args, **kwargs)
+
+
+MeteredStore.wrap_calls(_metered_call)
@@ -0,0 +1,165 @@
+"""Brings the schema of an existing database up to date in place.
+
+Migrations are SQL scripts named NNNN_description.sql in one directory per
+database type (see scripts/migrations). The number is the schema version the
+script upgrades to, and each database records the version it is at: SQLite in
+PRAGMA user_version, MySQL in the SchemaVersion table. The init scripts
+create databases that are already at the latest version.
+"""
+
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, cast
+
+import mysql.connector
+from mysql.connector.abstracts import MySQLConnectionAbstract
+from mysql.connector.pooling import PooledMySQLConnection
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A script that upgrades the schema to the given version."""
+
+    version: int
+    name: str
+    sql: str
+
+
+_MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+# MySQL statements are terminated by a semicolon at the end of a line, the
+# init script and migrations do not use compound statements
+_STATEMENT_END = re.compile(r';[ \t]*$', re.MULTILINE)
+
+
+def load_migrations(directory: Path | str) -> list[Migration]:
+    """Reads the migrations in the given directory, ordered by version."""
+
+    migrations: dict[int, Migration] = {}
+    for filename in sorted(os.listdir(directory)):
+        if (match := _MIGRATION_FILE.match(filename)) is None:
+            continue
+
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f'Duplicate migration version {version}!')
+        with open(os.path.join(directory, filename), 'r', encoding='utf8') as sql_file:
+            migrations[version] = Migration(version, match.group(2), sql_file.read())
+
+    expected = list(range(1, len(migrations) + 1))
+    if sorted(migrations) != expected:
+        raise ValueError(f'Migration versions {sorted(migrations)} are not consecutive!')
+
+    return [migrations[version] for version in expected]
+
+
+def split_statements(sql: str) -> list[str]:
+    """Splits a script into its statements, dropping comment-only parts."""
+
+    statements = []
+    for part in _STATEMENT_END.split(sql):
+        lines = [line for line in part.splitlines()
+                 if line.strip() and not line.strip().startswith('--')]
+        if lines:
+            statements.append('\n'.join(lines))
+    return statements
+
+
+def migrate_sqlite(conn: sqlite3.Connection, migrations: list[Migration],
+                   log: Callable[[str], None] = print) -> list[int]:
+    """Applies the pending migrations to a SQLite database.
+
+    Each migration runs in its own transaction together with the update of
+    the schema version, so a failing migration leaves the database at the
+    previous version. Returns the versions that were applied.
+    """
+
+    current, = conn.execute('PRAGMA user_version').fetchone()
+    applied = []
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+
+        log(f'Applying migration {migration.version} ({migration.name})...')
+        try:
+            conn.executescript(f'BEGIN;\n{migration.sql}\n'
+                               f'PRAGMA user_version = {migration.version};\n'
+                               f'COMMIT;')
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(migration.version)
+
+    return applied
+
+
+def migrate_mysql(conn: PooledMySQLConnection | MySQLConnectionAbstract,
+                  migrations: list[Migration],
+                  log: Callable[[str], None] = print) -> list[int]:
+    """Applies the pending migrations to a MySQL database.
+
+    MySQL commits implicitly after schema changes, so a failing migration
+    may be left partially applied. The schema version is only raised once
+    all statements of a migration have succeeded. Returns the versions that
+    were applied.
+    """
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute('CREATE TABLE IF NOT EXISTS SchemaVersion (version INTEGER NOT NULL)')
+        cursor.execute('SELECT coalesce(max(version), 0) FROM SchemaVersion')
+        current, = cast(tuple[int], cursor.fetchone())
+
+        applied = []
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+
+            log(f'Applying migration {migration.version} ({migration.name})...')
+            for statement in split_statements(migration.sql):
+                cursor.execute(statement)
+            cursor.execute('DELETE FROM SchemaVersion')
+            cursor.execute('INSERT INTO SchemaVersion(version) VALUES (%s)',
+                           (migration.version,))
+            conn.commit()
+            applied.append(migration.version)
+    finally:
+        cursor.close()
+
+    return applied
+
+
+def migrate(settings: dict[str, Any], directory: Path | str,
+            log: Callable[[str], None] = print) -> list[int]:
+    """Applies the pending migrations to the database in the datastore
+    settings, taking them from the subdirectory for the database type.
+    """
+
+    migrations_of_type = os.path.join(directory, settings['type'])
+
+    if settings['type'] == 'sqlite':
+        try:
+            path = Path(settings['path'])
+        except KeyError as e:
+            raise ValueError('SQLite database path not specified!') from e
+        conn = sqlite3.connect(path, uri=True)
+        try:
+            return migrate_sqlite(conn, load_migrations(migrations_of_type), log)
+        finally:
+            conn.close()
+
+    elif settings['type'] == 'mysql':
+        mysql_conn = mysql.connector.connect(host=settings['host'],
+                                             user=settings['user'],
+                                             password=settings['password'],
+                                             database=settings['db'])
+        try:
+            return migrate_mysql(mysql_conn, load_migrations(migrations_of_type), log)
+        finally:
+            mysql_conn.close()
+
+    raise ValueError('Unrecognized data store type!')
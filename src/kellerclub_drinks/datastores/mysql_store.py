@@ -1,16 +1,21 @@
 import traceback
+from collections import defaultdict
 from datetime import datetime
-from typing import Optional
+from typing import Generator, Optional, cast
 
-from mysql.connector import Error
+from mysql.connector import Error, IntegrityError, errorcode
 from mysql.connector.cursor import MySQLCursor
 from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
 
 from .layout_factory import from_button_rows
-from ..datastores.datastore import DataStore
+from ..datastores.datastore import (ConcurrentWriteError, DataStore, OrderBatch, Topic,
+                                    button_rows, fresh_batches, split_ids)
 from ..model.drinks import Drink, PriceHistory
 from ..model.events import Event
 from ..model.layouts import Layout
+from ..model.menus import Menu
+from ..model.orders import Order
+from ..model.reports import DrinkSales, HourlySales, SalesReport
 
 
 class MysqlStore(DataStore):
@@ -30,15 +35,29 @@ class MysqlStore(DataStore):
 
         return None
 
+    def is_transient(self, e: Exception) -> bool:
+        return super().is_transient(e) or (isinstance(e, Error) and e.errno in (
+            errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT))
+
     def all_drinks(self) -> dict[str, Drink]:
         conn = self.pool.get_connection()
         try:
             cursor: MySQLCursor = conn.cursor()
             cursor.execute("SELECT name, display_name, base_price FROM Drink")
-            return {row[0]: Drink(row[0], row[1], {'default': PriceHistory(row[2], {})}) for row in cursor}
+            drink_rows = list(cursor)
+            cursor.execute("SELECT drink, end_time, price FROM Prices")
+            price_rows = list(cursor)
         finally:
             conn.close()
 
+        price_changes: dict[str, dict[datetime, int]] = defaultdict(dict)
+        for drink, end_time, price in price_rows:
+            price_changes[drink][end_time] = price
+
+        return {name: Drink(name, display_name,
+                            {'default': PriceHistory(base_price, price_changes[name])})
+                for name, display_name, base_price in drink_rows}
+
     def add_drink(self, drink: Drink) -> None:
         conn = self.pool.get_connection()
         try:
@@ -49,6 +68,38 @@ class MysqlStore(DataStore):
         finally:
             conn.close()
 
+    def import_menu(self, menu: Menu) -> None:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.executemany("INSERT INTO Drink(name, display_name, base_price) "
+                               "VALUES (%s, %s, %s)",
+                               [(drink.name, drink.display_name, drink.prices['default'].base_price)
+                                for drink in menu.drinks])
+            cursor.executemany("INSERT INTO Prices(drink, end_time, price) VALUES (%s, %s, %s)",
+                               [(drink.name, time, price)
+                                for drink in menu.drinks
+                                for time, price in drink.prices['default'].price_changes.items()])
+            cursor.executemany("INSERT INTO SelectorLayout(name) VALUES (%s)",
+                               [(name,) for name in menu.layouts])
+
+            # locks the buttons, so that the ids are not taken meanwhile
+            cursor.execute("SELECT coalesce(max(id), 0) + 1 FROM SelectorButton FOR UPDATE")
+            first_id, = cast(tuple[int], cursor.fetchone())
+            selector_rows, order_rows, link_rows = button_rows(menu, first_id)
+            cursor.executemany("INSERT INTO SelectorButton(id, layout_name, xpos, ypos, "
+                               "display_name) VALUES (%s, %s, %s, %s, %s)", selector_rows)
+            cursor.executemany("INSERT INTO OrderButton(button_id, drink_name) VALUES (%s, %s)",
+                               order_rows)
+            cursor.executemany("INSERT INTO LinkButton(button_id, linked_layout) VALUES (%s, %s)",
+                               link_rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def start_event(self, start_time: Optional[datetime] = None,
                     name: Optional[str] = None) -> None:
         conn = self.pool.get_connection()
@@ -68,15 +119,10 @@ class MysqlStore(DataStore):
         conn = self.pool.get_connection()
         try:
             cursor: MySQLCursor = conn.cursor()
-            current_event = self._current_event(conn)
-            if current_event:
-                event_id, _ = current_event
-                cursor.execute("UPDATE Event SET end_time = %s WHERE start_time = %s",
-                               (end_time or datetime.now(), event_id))
-                conn.commit()
-                return True
-            else:
-                return False
+            cursor.execute("UPDATE Event SET end_time = %s WHERE end_time IS NULL",
+                           (end_time or datetime.now(),))
+            conn.commit()
+            return cursor.rowcount > 0
         finally:
             conn.close()
 
@@ -101,25 +147,128 @@ class MysqlStore(DataStore):
 SELECT start_time, name FROM Event WHERE end_time IS NULL LIMIT 1
 """
 
-    def submit_order(self, event_id: datetime, drinks: list[str]) -> list[int]:
+    def event(self, start_time: datetime) -> Optional[Event]:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute("SELECT name, end_time FROM Event WHERE start_time = %s",
+                           (start_time,))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        name, end_time = cast(tuple[Optional[str], Optional[datetime]], row)
+        return Event(name, start_time, end_time)
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        return self.submit_orders([(event_id, drinks, batch_id)])[0]
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        if not batches or not all(drinks for _, drinks, _ in batches):
+            raise ValueError("Must submit at least one drink!")
         conn = self.pool.get_connection()
         try:
             cursor: MySQLCursor = conn.cursor()
-            sql_template_begin = "INSERT INTO PurchaseOrder(drink_name, event) VALUES "
-            values = ", ".join('(%s, %s)' for _ in drinks)
-            sql_template_end = " RETURNING id"
-            sql_template = sql_template_begin + values + sql_template_end
-            params: list[str | datetime] = []
+            batch_ids = [batch_id for _, _, batch_id in batches if batch_id is not None]
+            claimed = self._claim_batches(cursor, batch_ids)
+            fresh = fresh_batches(batches, claimed)
+
+            ids = self._insert_orders(cursor, [batch for batch, is_fresh in zip(batches, fresh)
+                                               if is_fresh])
+
+            repeated = {batch_id for (_, _, batch_id), is_fresh in zip(batches, fresh)
+                        if not is_fresh and batch_id is not None}
+            stored = self._batch_orders(cursor, repeated)
+            conn.commit()
+            return split_ids(ids, batches, fresh, stored)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert_orders(cursor: MySQLCursor, batches: list[OrderBatch]) -> list[int]:
+        """Inserts the orders of all batches, returning their ids in the order
+        of the batches."""
+
+        if not batches:
+            return []
+        sql_template_begin = "INSERT INTO PurchaseOrder(drink_name, event, batch) VALUES "
+        values = ", ".join('(%s, %s, %s)' for _, drinks, _ in batches for _ in drinks)
+        sql_template_end = " RETURNING id"
+        sql_template = sql_template_begin + values + sql_template_end
+        params: list[str | datetime | None] = []
+        for event_id, drinks, batch_id in batches:
             for drink in drinks:
                 params.append(drink)
                 params.append(event_id)
-            cursor.execute(sql_template, tuple(params))
-            ids = [row[0] for row in cursor.fetchall()]
-            conn.commit()
-            return ids
+                params.append(batch_id)
+        cursor.execute(sql_template, tuple(params))
+        # ids are assigned in the order of the VALUES, the rows of RETURNING
+        # need not be
+        return sorted(cast(int, row[0]) for row in cursor.fetchall())
+
+    @staticmethod
+    def _claim_batches(cursor: MySQLCursor, batch_ids: list[str]) -> set[str]:
+        """Inserts the batch ids, returning those that were not stored yet."""
+
+        claimed = set(batch_ids) - MysqlStore._stored_batches(cursor, batch_ids)
+        try:
+            cursor.executemany("INSERT INTO SubmittedBatch(id) VALUES (%s)",
+                               [(batch_id,) for batch_id in claimed])
+        except IntegrityError as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                # a concurrent request stored the batch after it was looked up,
+                # submitting again returns the orders stored by it
+                raise ConcurrentWriteError("Batch submitted concurrently!") from e
+            raise
+        return claimed
+
+    @staticmethod
+    def _stored_batches(cursor: MySQLCursor, batch_ids: list[str]) -> set[str]:
+        """Returns the batch ids that have already been stored, locking them
+        until the end of the transaction."""
+
+        if not batch_ids:
+            return set()
+        cursor.execute("SELECT id FROM SubmittedBatch WHERE id IN ("
+                       + ", ".join('%s' for _ in batch_ids) + ") FOR UPDATE",
+                       tuple(batch_ids))
+        return {cast(str, row[0]) for row in cursor.fetchall()}
+
+    @staticmethod
+    def _batch_orders(cursor: MySQLCursor, batch_ids: set[str]) -> dict[str, list[int]]:
+        result: dict[str, list[int]] = defaultdict(list)
+        if batch_ids:
+            cursor.execute("SELECT batch, id FROM PurchaseOrder WHERE batch IN ("
+                           + ", ".join('%s' for _ in batch_ids) + ") ORDER BY id",
+                           tuple(batch_ids))
+            for batch_id, order_id in cursor.fetchall():
+                result[cast(str, batch_id)].append(cast(int, order_id))
+        return result
+
+    def orders(self, event_id: datetime, after: int = 0) -> Generator[Order, None, None]:
+        conn = self.pool.get_connection()
+        try:
+            # unbuffered, so rows are only transferred while iterating
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute(self._orders_template, (event_id, after))
+            for order_id, time, drink_name in cursor:
+                yield Order(order_id, time, drink_name)
         finally:
+            # discard remaining rows if the generator is closed early
+            conn.consume_results()
             conn.close()
 
+    _orders_template = """
+SELECT id, time, drink_name FROM PurchaseOrder
+WHERE event = %s AND id > %s
+ORDER BY id
+"""
+
     def all_layouts(self) -> dict[str, Layout]:
         conn = self.pool.get_connection()
         try:
@@ -147,3 +296,97 @@ SELECT layout_name, xpos, ypos, display_name, linked_layout
 FROM LinkButton
 JOIN SelectorButton ON LinkButton.button_id = SelectorButton.id
 """
+
+    def layout(self, name: str) -> Optional[Layout]:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute(self._get_layout_order_buttons_template, (name,))
+            order_rows = list(cursor)
+            cursor.execute(self._get_layout_link_buttons_template, (name,))
+            link_rows = list(cursor)
+            return from_button_rows(order_rows, link_rows).get(name)
+        finally:
+            conn.close()
+
+    _get_layout_order_buttons_template = _get_all_order_buttons_template + """\
+WHERE layout_name = %s
+"""
+
+    _get_layout_link_buttons_template = _get_all_link_buttons_template + """\
+WHERE layout_name = %s
+"""
+
+    def sales_report(self, event_id: datetime) -> SalesReport:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute(self._sales_by_drink_template, (event_id,))
+            drink_rows = list(cursor)
+            cursor.execute(self._sales_by_hour_template, (event_id,))
+            hour_rows = list(cursor)
+            return SalesReport([DrinkSales(name, display_name, count, int(revenue))
+                                for name, display_name, count, revenue in drink_rows],
+                               [HourlySales(hour, count, int(revenue))
+                                for hour, count, revenue in hour_rows])
+        finally:
+            conn.close()
+
+    # a price applies from the end_time of its Prices row until the next one,
+    # the base price applies before the first change
+    _priced_orders_template = """
+WITH PricedOrder AS (
+    SELECT
+        PurchaseOrder.drink_name,
+        Drink.display_name,
+        PurchaseOrder.time,
+        coalesce((SELECT price FROM Prices
+                  WHERE Prices.drink = PurchaseOrder.drink_name
+                    AND Prices.end_time <= PurchaseOrder.time
+                  ORDER BY Prices.end_time DESC
+                  LIMIT 1),
+                 Drink.base_price) AS price
+    FROM PurchaseOrder
+    JOIN Drink ON PurchaseOrder.drink_name = Drink.name
+    WHERE PurchaseOrder.event = %s
+)"""
+
+    _sales_by_drink_template = _priced_orders_template + """
+SELECT drink_name, display_name, count(*), sum(price)
+FROM PricedOrder
+GROUP BY drink_name, display_name
+ORDER BY count(*) DESC, drink_name
+"""
+
+    _sales_by_hour_template = _priced_orders_template + """
+SELECT TIMESTAMP(DATE(time), MAKETIME(HOUR(time), 0, 0)) AS hour, count(*), sum(price)
+FROM PricedOrder
+GROUP BY hour
+ORDER BY hour
+"""
+
+    def event_totals(self, event_id: datetime) -> list[DrinkSales]:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute(self._event_totals_template, (event_id,))
+            return [DrinkSales(*row) for row in cursor]
+        finally:
+            conn.close()
+
+    _event_totals_template = """
+SELECT drink_name, display_name, count, revenue
+FROM EventTotal
+JOIN Drink ON EventTotal.drink_name = Drink.name
+WHERE event = %s AND count > 0
+ORDER BY count DESC, drink_name
+"""
+
+    def revision(self, topic: Topic) -> int:
+        conn = self.pool.get_connection()
+        try:
+            cursor: MySQLCursor = conn.cursor()
+            cursor.execute("SELECT counter FROM ChangeCounter WHERE topic = %s", (topic,))
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,153 @@
+"""Records how often and how long each datastore method runs.
+
+Calls slower than a threshold are logged along with the SQL statements they
+executed and the query plans of those statements. Statements are only known
+for datastores created with record_statement as their trace callback, which
+currently means SqliteStore.
+"""
+
+import json
+from collections import deque
+from threading import Lock, local
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from .datastore import DataStore
+from .delegating_store import DelegatingStore
+
+# number of recent durations per method that percentiles are computed from
+SAMPLE_SIZE = 1000
+
+# number of slow calls kept for the JSON dump
+SLOW_CALL_LOG_SIZE = 100
+
+# statements worth explaining, in contrast to e.g. BEGIN or PRAGMA
+_QUERIES = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+_current = local()
+
+
+def record_statement(statement: str) -> None:
+    """Trace callback that collects the statements of the profiled call
+    running on the current thread.
+    """
+
+    statements: Optional[list[str]] = getattr(_current, 'statements', None)
+    if statements is not None:
+        statements.append(statement)
+
+
+class _MethodStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.durations: deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def to_json(self) -> dict[str, Any]:
+        durations = sorted(self.durations)
+        return {'calls': self.calls,
+                'errors': self.errors,
+                'rows': self.rows,
+                'p50Ms': _percentile(durations, 0.5) * 1000,
+                'p95Ms': _percentile(durations, 0.95) * 1000,
+                'p99Ms': _percentile(durations, 0.99) * 1000,
+                'maxMs': (durations[-1] if durations else 0.0) * 1000}
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class ProfilingStore(DelegatingStore):
+    """Profiles every call to the wrapped datastore.
+
+    Rows are counted for methods returning collections, see wrap_calls for
+    the calls that are profiled.
+
+    If dump_path is set, the statistics are written there as JSON when the
+    datastore is closed.
+    """
+
+    def __init__(self, store: DataStore, slow_threshold: float = 0.05,
+                 dump_path: Optional[str] = None,
+                 log: Callable[[str], None] = print):
+        super().__init__(store)
+        self.slow_threshold = slow_threshold
+        self.dump_path = dump_path
+        self.log = log
+        self._lock = Lock()
+        self._stats: dict[str, _MethodStats] = {}
+        self._slow_calls: deque[dict[str, Any]] = deque(maxlen=SLOW_CALL_LOG_SIZE)
+
+    def close(self) -> None:
+        try:
+            if self.dump_path is not None:
+                self.dump(self.dump_path)
+        finally:
+            super().close()
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the statistics per method and the recent slow calls."""
+
+        with self._lock:
+            return {'methods': {name: stats.to_json()
+                                for name, stats in sorted(self._stats.items())},
+                    'slowCalls': list(self._slow_calls)}
+
+    def dump(self, path: str) -> None:
+        """Writes the statistics to a JSON file."""
+
+        with open(path, 'w', encoding='utf8') as file:
+            json.dump(self.stats(), file, indent=2)
+
+    def _call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        outer_statements = getattr(_current, 'statements', None)
+        statements: list[str] = []
+        _current.statements = statements
+        failed = True
+        start = perf_counter()
+        try:
+            result = getattr(self.store, name)(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            duration = perf_counter() - start
+            _current.statements = outer_statements
+            rows = len(result) if not failed and hasattr(result, '__len__') else 0
+            self._record(name, duration, rows, failed)
+            if duration >= self.slow_threshold:
+                self._log_slow_call(name, duration, statements)
+
+    def _record(self, name: str, duration: float, rows: int, failed: bool) -> None:
+        with self._lock:
+            if (stats := self._stats.get(name)) is None:
+                stats = self._stats[name] = _MethodStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.rows += rows
+            stats.durations.append(duration)
+
+    def _log_slow_call(self, name: str, duration: float, statements: list[str]) -> None:
+        statements = [' '.join(statement.split()) for statement in statements]
+        explained = [{'statement': statement,
+                      'plan': (self.store.explain(statement)
+                               if statement.lstrip().upper().startswith(_QUERIES) else [])}
+                     for statement in statements]
+
+        lines = [f'Slow datastore call {name}: {duration * 1000:.1f} ms']
+        for entry in explained:
+            lines.append(f'  {entry["statement"]}')
+            lines.extend(f'    {step}' for step in entry['plan'])
+        self.log('\n'.join(lines))
+
+        with self._lock:
+            self._slow_calls.append({'method': name,
+                                     'durationMs': duration * 1000,
+                                     'statements': explained})
+
+
+ProfilingStore.wrap_calls(ProfilingStore._call,  # pylint: disable=protected-access
+                          exclude={'handle_exception'})
@@ -0,0 +1,53 @@
+"""Publishing of submitted orders to live order screens."""
+
+from collections import defaultdict
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
+
+from .datastore import DataStore, OrderBatch
+from .delegating_store import DelegatingStore
+from ..live_orders import OrderBus
+
+
+class PublishingStore(DelegatingStore):
+    """Publishes the orders submitted through this store to an order bus
+    once they have been written.
+    """
+
+    def __init__(self, store: DataStore, bus: OrderBus):
+        super().__init__(store)
+        self.bus = bus
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        ids = self.store.submit_order(event_id, drinks, batch_id)
+        self._publish(event_id, ids)
+        return ids
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        ids = self.store.submit_orders(batches)
+        event_ids: dict[datetime, list[int]] = defaultdict(list)
+        for (event_id, _, _), batch_ids in zip(batches, ids):
+            event_ids[event_id].extend(batch_ids)
+        for event_id, order_ids in event_ids.items():
+            self._publish(event_id, order_ids)
+        return ids
+
+    def _publish(self, event_id: datetime, ids: list[int]) -> None:
+        bus_event_id = int(event_id.timestamp())
+        if not ids or bus_event_id not in self.bus.events():
+            return
+
+        # the stores set the time of submitted orders themselves, so the
+        # orders are read back to publish the same time as reports and exports
+        wanted = set(ids)
+        last = max(ids)
+        published = []
+        with closing(self.store.orders(event_id, min(ids) - 1)) as orders:
+            for order in orders:
+                if order.id > last:
+                    break
+                if order.id in wanted:
+                    published.append(order)
+        self.bus.publish(bus_event_id, published)
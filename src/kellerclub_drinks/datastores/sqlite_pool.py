@@ -0,0 +1,74 @@
+"""A thread-safe pool of preconfigured SQLite connections."""
+
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, Full, LifoQueue
+from sqlite3 import Connection, connect
+from typing import Callable, Iterator
+
+ConnectionSetup = Callable[[Connection], None]
+
+
+class SqlitePool:
+    """Hands out SQLite connections that are configured exactly once.
+
+    At most size idle connections are kept. If more connections are requested
+    concurrently, additional connections are opened and closed again when they
+    are returned. A pool of size zero opens a new connection for each request.
+    """
+
+    def __init__(self, path: Path | str, size: int, setup: ConnectionSetup):
+        if size < 0:
+            raise ValueError('Pool size must not be negative!')
+
+        self.path = path
+        self.setup = setup
+        self.size = size
+        self._idle: LifoQueue[Connection] = LifoQueue(maxsize=size)
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrows a connection from the pool.
+
+        The surrounding transaction is committed if the block succeeds and
+        rolled back otherwise, just like when using the connection itself as a
+        context manager.
+        """
+
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = self._connect()
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+    def _connect(self) -> Connection:
+        conn = connect(self.path, uri=True, check_same_thread=False)
+        self.setup(conn)
+        return conn
+
+    def _release(self, conn: Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+
+        if not self.size:
+            conn.close()
+            return
+
+        try:
+            self._idle.put_nowait(conn)
+        except Full:
+            conn.close()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from sqlite3 import Connection
+from typing import Any, Optional
+
+JOURNAL_MODES = {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'}
+SYNCHRONOUS_MODES = {'off', 'normal', 'full', 'extra'}
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """Performance-related pragmas applied to every new SQLite connection.
+
+    Settings that are None are left at the SQLite default.
+    """
+
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None
+    busy_timeout: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.journal_mode is not None and self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f'Unknown journal mode {self.journal_mode}!')
+        if self.synchronous is not None and self.synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f'Unknown synchronous mode {self.synchronous}!')
+        for value in (self.mmap_size, self.cache_size, self.busy_timeout):
+            if value is not None and not isinstance(value, int):
+                raise ValueError(f'Pragma value {value} is not an integer!')
+
+    @staticmethod
+    def from_settings(settings: dict[str, Any]) -> SqliteProfile:
+        """Creates a profile from the performance block of the datastore settings."""
+
+        journal_mode = settings.get('journalMode')
+        synchronous = settings.get('synchronous')
+        return SqliteProfile(journal_mode.lower() if journal_mode else None,
+                             synchronous.lower() if synchronous else None,
+                             settings.get('mmapSize'),
+                             settings.get('cacheSize'),
+                             settings.get('busyTimeout'))
+
+    def apply(self, conn: Connection) -> None:
+        """Sets the configured pragmas on the given connection."""
+
+        # set first, so that changing the journal mode can wait for locks
+        if self.busy_timeout is not None:
+            conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout};")
+        if self.journal_mode is not None:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode};")
+        if self.synchronous is not None:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous};")
+        if self.cache_size is not None:
+            conn.execute(f"PRAGMA cache_size = {self.cache_size};")
+        if self.mmap_size is not None:
+            conn.execute(f"PRAGMA mmap_size = {self.mmap_size};")
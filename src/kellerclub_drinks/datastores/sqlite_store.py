@@ -1,21 +1,56 @@
 import traceback
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from sqlite3 import Error, connect, Connection
-from typing import Optional
+from sqlite3 import SQLITE_BUSY, SQLITE_LOCKED, Error, Connection, OperationalError
+from typing import Callable, Generator, Optional
 
-from .datastore import DataStore
+from .datastore import DataStore, OrderBatch, Topic, button_rows, fresh_batches, split_ids
 from .layout_factory import from_button_rows
+from .sqlite_pool import SqlitePool
+from .sqlite_profile import SqliteProfile
 from ..model.drinks import Drink, PriceHistory
 from ..model.events import Event
 from ..model.layouts import Layout
+from ..model.menus import Menu
+from ..model.orders import Order
+from ..model.reports import DrinkSales, HourlySales, SalesReport
 
 
 class SqliteStore(DataStore):
     """A datastore using sqlite."""
 
-    def __init__(self, path: Path | str):
+    def __init__(self, path: Path | str, pool_size: int = 5,
+                 profile: SqliteProfile = SqliteProfile(),
+                 trace: Optional[Callable[[str], None]] = None):
         self.path = path
+        self.profile = profile
+        self.trace = trace
+        self.pool = SqlitePool(path, pool_size, self._setup_connection)
+
+    def _setup_connection(self, conn: Connection) -> None:
+        conn.execute("PRAGMA foreign_keys = ON;")
+        self.profile.apply(conn)
+        if self.trace is not None:
+            conn.set_trace_callback(self.trace)
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def explain(self, statement: str) -> list[str]:
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute(f'EXPLAIN QUERY PLAN {statement}').fetchall()
+        except Error as e:
+            return [f'cannot explain: {e}']
+
+        # rows are (id, parent id, unused, detail), indent details by depth
+        depths = {0: -1}
+        plan = []
+        for node_id, parent_id, _, detail in rows:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            plan.append('  ' * depths[node_id] + detail)
+        return plan
 
     def handle_exception(self, e: Exception) -> Optional[str]:
         if isinstance(e, Error):
@@ -25,25 +60,62 @@ class SqliteStore(DataStore):
 
         return None
 
+    def is_transient(self, e: Exception) -> bool:
+        # the extended result codes keep the primary one in the lowest byte
+        return super().is_transient(e) or (isinstance(e, OperationalError)
+                                           and e.sqlite_errorcode & 0xff
+                                           in (SQLITE_BUSY, SQLITE_LOCKED))
+
     def all_drinks(self) -> dict[str, Drink]:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-            sql_template = "SELECT name, display_name, base_price FROM Drink"
-            return {row[0]: Drink(row[0], row[1], {'default': PriceHistory(row[2], {})})
-                    for row in conn.execute(sql_template).fetchall()}
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            drink_rows = conn.execute("SELECT name, display_name, base_price FROM Drink").fetchall()
+            price_rows = conn.execute("SELECT drink, end_time, price FROM Prices").fetchall()
+            conn.commit()
+
+        price_changes: dict[str, dict[datetime, int]] = defaultdict(dict)
+        for drink, end_time, price in price_rows:
+            price_changes[drink][datetime.fromtimestamp(end_time)] = price
+
+        return {name: Drink(name, display_name,
+                            {'default': PriceHistory(base_price, price_changes[name])})
+                for name, display_name, base_price in drink_rows}
 
     def add_drink(self, drink: Drink) -> None:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
+        with self.pool.connection() as conn:
             sql_template = "INSERT INTO Drink(name, display_name, base_price) VALUES (?, ?, 1)"
             conn.execute(sql_template, (drink.name, drink.display_name))
 
+    def import_menu(self, menu: Menu) -> None:
+        with self.pool.connection() as conn:
+            # the write lock keeps the button ids from being taken meanwhile
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO Drink(name, display_name, base_price) VALUES (?, ?, ?)",
+                             [(drink.name, drink.display_name, drink.prices['default'].base_price)
+                              for drink in menu.drinks])
+            conn.executemany("INSERT INTO Prices(drink, end_time, price) VALUES (?, ?, ?)",
+                             [(drink.name, int(time.timestamp()), price)
+                              for drink in menu.drinks
+                              for time, price in drink.prices['default'].price_changes.items()])
+            conn.executemany("INSERT INTO SelectorLayout(name) VALUES (?)",
+                             [(name,) for name in menu.layouts])
+
+            first_id, = conn.execute("SELECT coalesce(max(id), 0) + 1 "
+                                     "FROM SelectorButton").fetchone()
+            selector_rows, order_rows, link_rows = button_rows(menu, first_id)
+            conn.executemany("INSERT INTO SelectorButton(id, layout_name, xpos, ypos, "
+                             "display_name) VALUES (?, ?, ?, ?, ?)", selector_rows)
+            conn.executemany("INSERT INTO OrderButton(button_id, drink_name) VALUES (?, ?)",
+                             order_rows)
+            conn.executemany("INSERT INTO LinkButton(button_id, linked_layout) VALUES (?, ?)",
+                             link_rows)
+
     def start_event(self, start_time: Optional[datetime] = None,
                     name: Optional[str] = None) -> None:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-
-            conn.execute("BEGIN")
+        with self.pool.connection() as conn:
+            # take the write lock right away, a deferred transaction could not
+            # wait for it after reading
+            conn.execute("BEGIN IMMEDIATE")
 
             if self._current_event(conn):
                 raise ValueError("At least one event is still running!")
@@ -58,20 +130,14 @@ class SqliteStore(DataStore):
             conn.commit()
 
     def stop_current_event(self, end_time: Optional[datetime] = None) -> bool:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-            current_event = self._current_event(conn)
-            if current_event:
-                event_id, _ = current_event
-                conn.execute("UPDATE Event SET end_time = ? WHERE start_time = ?",
-                             (end_time or int(datetime.now().timestamp()), event_id))
-                return True
-            else:
-                return False
+        end = end_time or datetime.now()
+        with self.pool.connection() as conn:
+            cursor = conn.execute("UPDATE Event SET end_time = ? WHERE end_time IS NULL",
+                                  (int(end.timestamp()),))
+            return cursor.rowcount > 0
 
     def current_event(self) -> Optional[Event]:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
+        with self.pool.connection() as conn:
             result = self._current_event(conn)
             if result:
                 return Event(result[1], datetime.fromtimestamp(result[0]), None)
@@ -87,31 +153,97 @@ class SqliteStore(DataStore):
 SELECT start_time, name FROM Event WHERE end_time IS NULL LIMIT 1
 """
 
-    def submit_order(self, event_id: datetime, drinks: list[str]) -> list[int]:
-        if not drinks:
+    def event(self, start_time: datetime) -> Optional[Event]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT name, end_time FROM Event WHERE start_time = ?",
+                               (int(start_time.timestamp()),)).fetchone()
+        if row is None:
+            return None
+        name, end_time = row
+        return Event(name, start_time,
+                     None if end_time is None else datetime.fromtimestamp(end_time))
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        return self.submit_orders([(event_id, drinks, batch_id)])[0]
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        if not batches or not all(drinks for _, drinks, _ in batches):
             raise ValueError("Must submit at least one drink!")
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-            template_begin = "INSERT INTO PurchaseOrder(drink_name, event) VALUES "
-            template_params = ",".join("(?, ?)" for _ in drinks)
-            template_end = " RETURNING ROWID"
-            template = template_begin + template_params + template_end
-            params: list[str | int] = []
+        with self.pool.connection() as conn:
+            batch_ids = [batch_id for _, _, batch_id in batches if batch_id is not None]
+            claimed = self._claim_batches(conn, batch_ids)
+            fresh = fresh_batches(batches, claimed)
+
+            ids = self._insert_orders(conn, [batch for batch, is_fresh in zip(batches, fresh)
+                                              if is_fresh])
+
+            repeated = {batch_id for (_, _, batch_id), is_fresh in zip(batches, fresh)
+                        if not is_fresh and batch_id is not None}
+            return split_ids(ids, batches, fresh, self._batch_orders(conn, repeated))
+
+    @staticmethod
+    def _insert_orders(conn: Connection, batches: list[OrderBatch]) -> list[int]:
+        """Inserts the orders of all batches, returning their ids in the order
+        of the batches."""
+
+        if not batches:
+            return []
+        template_begin = "INSERT INTO PurchaseOrder(drink_name, event, batch) VALUES "
+        template_params = ",".join("(?, ?, ?)" for _, drinks, _ in batches for _ in drinks)
+        template_end = " RETURNING ROWID"
+        template = template_begin + template_params + template_end
+        params: list[str | int | None] = []
+        for event_id, drinks, batch_id in batches:
             for drink in drinks:
                 params.append(drink)
                 params.append(int(event_id.timestamp()))
-            return [row[0] for row in conn.execute(template, tuple(params)).fetchall()]
+                params.append(batch_id)
+        # RETURNING does not guarantee the order of the rows, but ROWIDs are
+        # assigned in the order of the VALUES
+        return sorted(row[0] for row in conn.execute(template, tuple(params)).fetchall())
 
-    def all_layouts(self) -> dict[str, Layout]:
-        with connect(self.path, uri=True) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
+    @staticmethod
+    def _claim_batches(conn: Connection, batch_ids: list[str]) -> set[str]:
+        """Inserts the batch ids, returning those that were not stored yet."""
+
+        if not batch_ids:
+            return set()
+        template = ("INSERT INTO SubmittedBatch(id) VALUES "
+                    + ",".join("(?)" for _ in batch_ids)
+                    + " ON CONFLICT DO NOTHING RETURNING id")
+        return {row[0] for row in conn.execute(template, tuple(batch_ids)).fetchall()}
+
+    @staticmethod
+    def _batch_orders(conn: Connection, batch_ids: set[str]) -> dict[str, list[int]]:
+        result: dict[str, list[int]] = defaultdict(list)
+        if batch_ids:
+            template = ("SELECT batch, ROWID FROM PurchaseOrder WHERE batch IN ("
+                        + ",".join("?" for _ in batch_ids) + ") ORDER BY ROWID")
+            for batch_id, order_id in conn.execute(template, tuple(batch_ids)):
+                result[batch_id].append(order_id)
+        return result
 
+    def orders(self, event_id: datetime, after: int = 0) -> Generator[Order, None, None]:
+        with self.pool.connection() as conn:
+            cursor = conn.execute(self._orders_template, (int(event_id.timestamp()), after))
+            for order_id, time, drink_name in cursor:
+                yield Order(order_id, datetime.fromtimestamp(time), drink_name)
+
+    _orders_template = """
+SELECT ROWID, time, drink_name FROM PurchaseOrder
+WHERE event = ? AND ROWID > ?
+ORDER BY ROWID
+"""
+
+    def all_layouts(self) -> dict[str, Layout]:
+        with self.pool.connection() as conn:
             conn.execute("BEGIN")
-            order_button_rows = conn.execute(self._get_all_order_buttons_template)
-            link_button_rows = conn.execute(self._get_all_link_buttons_template)
+            order_button_rows = conn.execute(self._get_all_order_buttons_template).fetchall()
+            link_button_rows = conn.execute(self._get_all_link_buttons_template).fetchall()
             conn.commit()
 
-        return from_button_rows(list(order_button_rows), list(link_button_rows))
+        return from_button_rows(order_button_rows, link_button_rows)
 
     _get_all_order_buttons_template = """
 SELECT
@@ -128,3 +260,87 @@ SELECT layout_name, xpos, ypos, display_name, linked_layout
 FROM LinkButton
 JOIN SelectorButton ON LinkButton.button_id = SelectorButton.id
 """
+
+    def layout(self, name: str) -> Optional[Layout]:
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            order_button_rows = conn.execute(self._get_layout_order_buttons_template,
+                                             (name,)).fetchall()
+            link_button_rows = conn.execute(self._get_layout_link_buttons_template,
+                                            (name,)).fetchall()
+            conn.commit()
+
+        return from_button_rows(order_button_rows, link_button_rows).get(name)
+
+    _get_layout_order_buttons_template = _get_all_order_buttons_template + """\
+WHERE layout_name = ?
+"""
+
+    _get_layout_link_buttons_template = _get_all_link_buttons_template + """\
+WHERE layout_name = ?
+"""
+
+    def sales_report(self, event_id: datetime) -> SalesReport:
+        params = (int(event_id.timestamp()),)
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            drink_rows = conn.execute(self._sales_by_drink_template, params).fetchall()
+            hour_rows = conn.execute(self._sales_by_hour_template, params).fetchall()
+            conn.commit()
+
+        return SalesReport([DrinkSales(*row) for row in drink_rows],
+                           [HourlySales(datetime.fromtimestamp(hour), count, revenue)
+                            for hour, count, revenue in hour_rows])
+
+    # a price applies from the end_time of its Prices row until the next one,
+    # the base price applies before the first change
+    _priced_orders_template = """
+WITH PricedOrder AS (
+    SELECT
+        PurchaseOrder.drink_name,
+        Drink.display_name,
+        PurchaseOrder.time,
+        coalesce((SELECT price FROM Prices
+                  WHERE Prices.drink = PurchaseOrder.drink_name
+                    AND Prices.end_time <= PurchaseOrder.time
+                  ORDER BY Prices.end_time DESC
+                  LIMIT 1),
+                 Drink.base_price) AS price
+    FROM PurchaseOrder
+    JOIN Drink ON PurchaseOrder.drink_name = Drink.name
+    WHERE PurchaseOrder.event = ?
+)"""
+
+    _sales_by_drink_template = _priced_orders_template + """
+SELECT drink_name, display_name, count(*), sum(price)
+FROM PricedOrder
+GROUP BY drink_name, display_name
+ORDER BY count(*) DESC, drink_name
+"""
+
+    _sales_by_hour_template = _priced_orders_template + """
+SELECT CAST(time / 3600 AS INTEGER) * 3600 AS hour, count(*), sum(price)
+FROM PricedOrder
+GROUP BY hour
+ORDER BY hour
+"""
+
+    def event_totals(self, event_id: datetime) -> list[DrinkSales]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(self._event_totals_template,
+                                (int(event_id.timestamp()),)).fetchall()
+            return [DrinkSales(*row) for row in rows]
+
+    _event_totals_template = """
+SELECT drink_name, display_name, count, revenue
+FROM EventTotal
+JOIN Drink ON EventTotal.drink_name = Drink.name
+WHERE event = ? AND count > 0
+ORDER BY count DESC, drink_name
+"""
+
+    def revision(self, topic: Topic) -> int:
+        with self.pool.connection() as conn:
+            template = "SELECT counter FROM ChangeCounter WHERE topic = ?"
+            counter: int = conn.execute(template, (topic,)).fetchone()[0]
+            return counter
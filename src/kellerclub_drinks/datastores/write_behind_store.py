@@ -0,0 +1,101 @@
+"""Coalesces order submissions of concurrent requests into few transactions."""
+
+from concurrent.futures import Future
+from datetime import datetime
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Optional
+
+from .datastore import DataStore
+from .delegating_store import DelegatingStore
+
+
+class _PendingOrder:
+    def __init__(self, event_id: datetime, drinks: list[str], batch_id: Optional[str]):
+        self.event_id = event_id
+        self.drinks = drinks
+        self.batch_id = batch_id
+        self.result: Future[list[int]] = Future()
+
+
+class WriteBehindStore(DelegatingStore):
+    """Queues submitted orders and writes them in batches.
+
+    A background thread collects orders until either max_batch drinks are
+    queued or max_delay seconds have passed since the first one arrived, and
+    writes them in a single transaction. submit_order only returns once the
+    transaction containing its orders has been committed.
+    """
+
+    def __init__(self, store: DataStore, max_batch: int = 100, max_delay: float = 0.01):
+        super().__init__(store)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Queue[Optional[_PendingOrder]] = Queue()
+        self._lock = Lock()
+        self._closed = False
+        self._writer = Thread(target=self._write, name='order-writer', daemon=True)
+        self._writer.start()
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        if not drinks:
+            raise ValueError("Must submit at least one drink!")
+
+        pending = _PendingOrder(event_id, drinks, batch_id)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Datastore has already been closed!")
+            self._queue.put(pending)
+
+        return pending.result.result()
+
+    def close(self) -> None:
+        """Writes all queued orders before closing the wrapped datastore."""
+
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+
+        self._writer.join()
+        super().close()
+
+    def _write(self) -> None:
+        while (first := self._queue.get()) is not None:
+            batch = [first]
+            size = len(first.drinks)
+            deadline = monotonic() + self.max_delay
+            closing = False
+
+            while size < self.max_batch and (timeout := deadline - monotonic()) > 0:
+                try:
+                    pending = self._queue.get(timeout=timeout)
+                except Empty:
+                    break
+                if pending is None:
+                    closing = True
+                    break
+                batch.append(pending)
+                size += len(pending.drinks)
+
+            self._flush(batch)
+            if closing:
+                return
+
+    def _flush(self, batch: list[_PendingOrder]) -> None:
+        try:
+            ids = self.store.submit_orders([(p.event_id, p.drinks, p.batch_id) for p in batch])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if len(batch) == 1:
+                batch[0].result.set_exception(e)
+            else:
+                # the transaction has been rolled back, so retry the orders one
+                # by one to only fail the offending ones
+                for pending in batch:
+                    self._flush([pending])
+            return
+
+        for pending, order_ids in zip(batch, ids):
+            pending.result.set_result(order_ids)
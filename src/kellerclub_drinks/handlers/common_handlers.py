@@ -1,18 +1,20 @@
 """Contains commonly used request handlers."""
 
-from pathlib import Path
-
 from .errors.error import ResistantHandler, ErrorHandler
 from ..resources import Resources
-from ..response_creators import RedirectCreator, StaticCreator, ResponseCreator
+from ..response_creators import NotModifiedCreator, RedirectCreator, StaticCreator, \
+    ResponseCreator
+from ..routers.preconditions import Preconditions
 
 
 class StaticHandler(ResistantHandler):
     """A handler that serves static files."""
 
-    def __init__(self, request_path: str, content_type: str):
+    def __init__(self, request_path: str, content_type: str,
+                 preconditions: Preconditions = Preconditions()):
         self.request_path = request_path
         self.content_type = content_type
+        self.preconditions = preconditions
 
     @property
     def canonical_url(self) -> str:
@@ -20,12 +22,15 @@ class StaticHandler(ResistantHandler):
 
     def _handle(self, res: Resources) -> ResponseCreator:
         try:
-            file_path = Path(self.request_path.removeprefix('/'))
-            with open(f'kellerclub_drinks/handlers/{file_path}', 'rb') as file:
-                content = file.read()
-            return StaticCreator(content, self.content_type)
+            file = res.static_files.get(self.request_path)
         except OSError:
-            return ErrorHandler(404, f'Static file "{file_path}" not found!').handle(res)
+            return ErrorHandler(404, f'Static file "{self.request_path}" not found!').handle(res)
+
+        if file.matches(self.preconditions.if_none_match,
+                        self.preconditions.if_modified_since):
+            return NotModifiedCreator(file.etag, file.http_last_modified, list(file.variants))
+        return StaticCreator(file.content, self.content_type,
+                             file.etag, file.http_last_modified, file.variants)
 
 
 class RedirectHandler(ResistantHandler):
@@ -1,15 +1,31 @@
 from ..errors.error import ResistantHandler
+from ...model.drinks import Drink
 from ...resources import Resources
 from ...response_creators import HtmlCreator, ResponseCreator, AjaxCreator
+from ...routers.preconditions import Preconditions
 from ...routers.request_source import RequestSource
 from ...templates import render_template
 
 
+def drink_map(drinks: dict[str, Drink]) -> dict[str, tuple[str, int]]:
+    """Display name and current price of each drink, as used by the scripts
+    of the drink selector.
+    """
+
+    return {key: (value.display_name, value.price('default'))
+            for key, value in drinks.items()}
+
+
 class DrinkList(ResistantHandler):
-    """Returns the drinks currently available in the application."""
+    """Returns the drinks currently available in the application.
+
+    The JSON variant is validated by an ETag derived from its content, so
+    clients can cache it and only download it again after a change.
+    """
 
-    def __init__(self, source: RequestSource):
+    def __init__(self, source: RequestSource, preconditions: Preconditions = Preconditions()):
         self.source = source
+        self.preconditions = preconditions
 
     @property
     def canonical_url(self) -> str:
@@ -25,8 +41,7 @@ class DrinkList(ResistantHandler):
                                           drinks=drink_list)
                 return HtmlCreator(content.encode())
             case RequestSource.AJAX:
-                content = {key: (value.display_name, value.price('default'))
-                           for key, value in drink_list.items()}
-                return AjaxCreator(content, 200)
+                creator = AjaxCreator(drink_map(drink_list), 200, validate=True)
+                return creator.not_modified(self.preconditions.if_none_match) or creator
             case _:
                 raise ValueError("Unsupported RequestSource!")
@@ -2,12 +2,11 @@ import {InvisibleOrderList} from "./order_list.js";
 import {data, gridButtons} from "./drink_selector.js";
 
 const orders = new InvisibleOrderList(data.eventId);
-void orders.submit();
+orders.sync(true);
 
 for (const button of gridButtons) {
     button.addEventListener('click', e => {
         e.preventDefault();
         orders.add(button.value);
-        void orders.submit();
     });
 }
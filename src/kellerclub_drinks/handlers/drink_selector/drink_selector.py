@@ -1,48 +1,67 @@
 from datetime import datetime
+from typing import Optional
 
+from markupsafe import Markup
+
+from ..drink_list.drink_list import drink_map
 from ..orders.client_order_store import ClientOrderStore
 from ..errors.error import ErrorHandler, ResistantHandler
 from ...datastores.datastore import DataStore
+from ...model.layouts import Layout
 from ...resources import Resources
 from ...response_creators import HtmlCreator, ResponseCreator
 from ...templates import render_template
 
 SELECTOR_TEMPLATE = 'drink_selector/drink_selector.jinja2'
+GRID_TEMPLATE = 'drink_selector/selector_grid.jinja2'
 
 
 class DrinkSelector(ResistantHandler):
     """Provides an HTML interface to add lots of orders quickly."""
 
     def __init__(self, event_start: datetime, layout_name: str, autosubmit: bool,
-                 stored_orders: list[str]):
+                 stored_orders: list[str], stored_batch: Optional[str] = None):
         self.event_start = event_start
         self.event_id = int(event_start.timestamp())
         self.layout_name = layout_name
         self.autosubmit = autosubmit
         self.stored_orders = stored_orders
+        self.stored_batch = stored_batch
 
     @property
     def canonical_url(self) -> str:
         return f'/event/{self.event_id}/selector'
 
     def _handle(self, res: Resources) -> ResponseCreator:
-        all_drinks = res.datastore.all_drinks()
-        layouts = res.datastore.all_layouts()
-
         if self.autosubmit:
             self._store_dangling_orders(res.datastore)
 
-        if self.layout_name not in layouts:
+        # the grid only changes with the drinks and layouts, so it is rendered
+        # once per revision and shared by all clients. The revisions are read
+        # before the data, so a concurrent change at worst renders it again.
+        # Caching stores count their reloads, which needs no database query.
+        key = (self.event_id, self.layout_name, self.autosubmit,
+               res.datastore.revision('drinks'), res.datastore.revision('layouts'))
+
+        # checked first, so that unknown layouts do not take up cache entries
+        layout = res.datastore.layout(self.layout_name)
+        if layout is None:
             handler = ErrorHandler(404, f'Layout "{self.layout_name}" not found!')
             return handler.handle(res)
+        grid = res.selector_grids.get(key, lambda: self._render_grid(res, layout))
+
+        # inlined, so the scripts need not fetch the drinks separately
+        all_drinks = res.datastore.all_drinks()
+        stored_drinks = [all_drinks[name]
+                         for name in self.stored_orders if name in all_drinks]
 
-        stored_drinks = [all_drinks[name] for name in self.stored_orders if name in all_drinks]
         content = render_template(res.jinjaenv, SELECTOR_TEMPLATE,
                                   self.canonical_url,
                                   event_id=self.event_id,
-                                  layout=layouts[self.layout_name],
+                                  grid=grid,
                                   autosubmit=self.autosubmit,
-                                  stored_drinks=stored_drinks)
+                                  stored_drinks=stored_drinks,
+                                  drinks=drink_map(all_drinks))
 
         creator = HtmlCreator(content.encode())
         if self.autosubmit:
@@ -50,6 +69,13 @@ class DrinkSelector(ResistantHandler):
             creator.add_header_modifier(modifier)
         return creator
 
+    def _render_grid(self, res: Resources, layout: Layout) -> Markup:
+        return Markup(render_template(res.jinjaenv, GRID_TEMPLATE,
+                                      self.canonical_url,
+                                      event_id=self.event_id,
+                                      layout=layout,
+                                      autosubmit=self.autosubmit))
+
     def _store_dangling_orders(self, datastore: DataStore):
         if self.stored_orders:
-            datastore.submit_order(self.event_start, self.stored_orders)
+            datastore.submit_order(self.event_start, self.stored_orders, self.stored_batch)
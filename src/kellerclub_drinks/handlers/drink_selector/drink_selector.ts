@@ -24,9 +24,11 @@ export const data = {
         .withName('event')
         .value()
         .value),
-    drinks: fetch('/api/drinks')
-        .then(response => response.json())
-        .then(json => new Map(Object.entries(json as {[s: string]: [string, number]})))
+    // inlined by the server, so no additional request is needed
+    drinks: Promise.resolve(new Map(Object.entries(JSON.parse(Query()
+        .childWithId('drink-data')
+        .value()
+        .textContent ?? '{}') as {[s: string]: [string, number]})))
 }
 
 submit.classList.add('hidden');
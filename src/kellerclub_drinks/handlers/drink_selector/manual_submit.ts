@@ -30,6 +30,8 @@ resetButton.classList.add('hidden');
 void initComplete.then(() => {
     const initialItems = orderListItems(orderListQuery);
     initDeleteButtons(initialItems);
+    // retries submissions that failed before
+    orders.sync(false);
 });
 
 for (const button of gridButtons) {
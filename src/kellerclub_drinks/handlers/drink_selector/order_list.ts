@@ -2,20 +2,74 @@ import {Query} from "../view.js";
 
 type Drink = [string, number];
 
-function submit(eventId: number, orders: string[]) {
+interface Batch {
+    id: string;
+    orders: string[];
+}
+
+// delay between the first queued order and its submission, so that the
+// orders of a rush are sent together
+const FLUSH_DELAY = 2000;
+// longest delay between attempts while submissions fail
+const MAX_BACKOFF = 60000;
+// batches per request, so that a long queue is not sent in one huge request
+const MAX_BATCHES = 50;
+
+function submit(eventId: number, batches: Batch[]) {
     return fetch('/api/orders/submit', {
         method: 'POST',
-        body: JSON.stringify({'orders': orders, 'event': eventId})
+        body: JSON.stringify({
+            'batches': batches.map(batch => ({
+                'orders': batch.orders, 'event': eventId, 'batch': batch.id
+            }))
+        })
     });
 }
 
+/**
+ * Random UUID, crypto.randomUUID is only available in secure contexts.
+ */
+function randomUuid() {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    bytes[6] = (bytes[6] & 0x0f) | 0x40;
+    bytes[8] = (bytes[8] & 0x3f) | 0x80;
+    const hex = Array.from(bytes, byte => byte.toString(16).padStart(2, '0')).join('');
+    return [hex.slice(0, 8), hex.slice(8, 12), hex.slice(12, 16),
+            hex.slice(16, 20), hex.slice(20)].join('-');
+}
+
 export class InvisibleOrderList {
     readonly #eventId: number;
     readonly #key: string;
+    readonly #queueKey: string;
+    #submission: Promise<void> = Promise.resolve();
+    #syncing = false;
+    #autosubmit = false;
+    #timer: number | undefined;
+    #backoff = FLUSH_DELAY;
 
     constructor(eventId: number) {
         this.#eventId = eventId;
         this.#key = `event-${String(eventId)}-orders`;
+        this.#queueKey = `event-${String(eventId)}-batches`;
+    }
+
+    /**
+     * Submits queued orders in the background from now on: when the browser
+     * is back online and, with growing delays, after failed submissions.
+     * With autosubmit, orders are also queued and submitted shortly after
+     * they have been added.
+     */
+    sync(autosubmit: boolean) {
+        this.#syncing = true;
+        this.#autosubmit = autosubmit;
+        window.addEventListener('online', () => {
+            window.clearTimeout(this.#timer);
+            this.#timer = undefined;
+            this.#backoff = FLUSH_DELAY;
+            this.#schedule(0);
+        });
+        this.#schedule(0);
     }
 
     /**
@@ -25,6 +79,7 @@ export class InvisibleOrderList {
         const orders = this.storage;
         orders.push(order);
         this.storage = orders;
+        if (this.#autosubmit) this.#schedule(FLUSH_DELAY);
     }
 
     /**
@@ -43,14 +98,109 @@ export class InvisibleOrderList {
 
     /**
      * Submits all orders in local storage.
+     *
+     * The orders are moved into a batch with a random id, which stays queued
+     * in local storage until the server confirms it. Submitting a batch again
+     * after a lost response does not count its orders twice, so failed
+     * submissions are simply repeated later. Batches the server rejects as
+     * invalid are dropped without delaying the others. All queued batches are
+     * sent together, and submissions are sent one after another.
      */
-    async submit() {
+    submit() {
+        this.#enqueue();
+        return this.#flush();
+    }
+
+    #enqueue() {
         if (this.storage.length) {
-            await submit(this.#eventId, this.storage);
+            this.queue = [...this.queue, {id: randomUuid(), orders: this.storage}];
             this.storage = [];
         }
     }
 
+    #flush() {
+        const result = this.#submission.then(() => this.#submitQueue());
+        this.#submission = result.then(() => {
+            this.#backoff = FLUSH_DELAY;
+        }, () => {
+            this.#backoff = Math.min(2 * this.#backoff, MAX_BACKOFF);
+            if (this.#syncing) this.#schedule(this.#backoff);
+        });
+        return result;
+    }
+
+    async #submitQueue() {
+        let batches: Batch[];
+        while ((batches = this.queue.slice(0, MAX_BATCHES)).length) {
+            const response = await submit(this.#eventId, batches);
+            if (response.status == 422) {
+                // the server checks all batches before storing any of them and
+                // names the ones it cannot store, which are dropped
+                const indices = (await response.json() as {rejected: number[]}).rejected;
+                if (!indices.length) throw Error('Server rejected orders without naming them!');
+                const dropped = new Set(indices.map(index => batches[index].id));
+                this.queue = this.queue.filter(batch => !dropped.has(batch.id));
+                this.rejected(batches.filter(batch => dropped.has(batch.id))
+                    .flatMap(batch => batch.orders));
+                continue;
+            }
+            if (!response.ok) {
+                // e.g. a busy database, the queue is sent again after a delay
+                throw Error(`Submitting orders failed with status ${String(response.status)}!`);
+            }
+
+            const sent = new Set(batches.map(batch => batch.id));
+            this.queue = this.queue.filter(batch => !sent.has(batch.id));
+            this.confirmed(batches.flatMap(batch => batch.orders));
+        }
+    }
+
+    #schedule(delay: number) {
+        if (this.#timer !== undefined) return;
+
+        this.#timer = window.setTimeout(() => {
+            this.#timer = undefined;
+            // the online event triggers the next attempt
+            if (!navigator.onLine) return;
+
+            if (this.#autosubmit) this.#enqueue();
+            void this.#flush().catch(() => undefined);
+        }, delay);
+    }
+
+    /**
+     * Called with the orders the server has just stored.
+     */
+    protected confirmed(orders: string[]) {
+        void orders;
+    }
+
+    /**
+     * Called with the orders the server has refused to store, e.g. because
+     * their drink has been removed meanwhile. They are not submitted again.
+     */
+    protected rejected(orders: string[]) {
+        console.error(`Orders ${orders.join(', ')} rejected by the server!`);
+    }
+
+    /**
+     * Orders that have not been confirmed by the server yet.
+     */
+    protected get orders() {
+        return [...this.queue.flatMap(batch => batch.orders), ...this.storage];
+    }
+
+    protected get queue(): Batch[] {
+        const value = window.localStorage.getItem(this.#queueKey);
+        if (!value) return [];
+        else return JSON.parse(value) as Batch[];
+    }
+
+    protected set queue(value: Batch[]) {
+        if (!value.length) window.localStorage.removeItem(this.#queueKey);
+        else window.localStorage.setItem(this.#queueKey, JSON.stringify(value));
+    }
+
     protected get storage() {
         const value = window.localStorage.getItem(this.#key);
         if (!value) return [];
@@ -81,7 +231,7 @@ export class OrderList extends InvisibleOrderList {
     async init() {
         await this.#drinks;
         this.#hideAll();
-        for (const order of this.storage) {
+        for (const order of this.orders) {
             void this.#show(order);
         }
         void this.#updateSum();
@@ -107,14 +257,25 @@ export class OrderList extends InvisibleOrderList {
     }
 
     /**
-     * Submits orders in local storage and clears the container.
+     * Removes orders stored by the server from the target container.
      */
-    async submit() {
-        if (this.storage.length) {
-            await super.submit();
-            this.#hideAll();
-            void this.#updateSum();
+    protected confirmed(orders: string[]) {
+        this.#removeShown(orders);
+    }
+
+    /**
+     * Removes orders the server has refused from the target container.
+     */
+    protected rejected(orders: string[]) {
+        super.rejected(orders);
+        this.#removeShown(orders);
+    }
+
+    #removeShown(orders: string[]) {
+        for (const name of orders) {
+            this.#container.querySelector(`[data-order-name="${name}"]`)?.remove();
         }
+        void this.#updateSum();
     }
 
     async #show(name: string) {
@@ -157,7 +318,7 @@ export class OrderList extends InvisibleOrderList {
 
     async #updateSum() {
         const drinks = await this.#drinks;
-        const price = this.storage
+        const price = this.orders
             .map(order => drinks.get(order)?.[1] ?? 0)
             .reduce((x, y) => x + y, 0);
         this.#sum.textContent = this.#euro(price);
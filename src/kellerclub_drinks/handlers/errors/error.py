@@ -17,6 +17,10 @@ class ResistantHandler(Handler):
             print(f'Template Error: {e}')
             return ErrorHandler(400, 'Template Error').handle(res)
         except Exception as e:
+            if res.datastore.is_transient(e):
+                print(f'Transient Database Error: {e}')
+                return ErrorHandler(503, 'The database is busy, try again!').handle(res)
+
             # see if datastore can do something about it
             if result := res.datastore.handle_exception(e):
                 return ErrorHandler(400, f'Database Error: {result}').handle(res)
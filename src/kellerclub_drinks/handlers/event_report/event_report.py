@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any
+
+from ..errors.error import ResistantHandler
+from ...model.reports import DrinkSales
+from ...resources import Resources
+from ...response_creators import HtmlCreator, ResponseCreator, AjaxCreator
+from ...routers.request_source import RequestSource
+from ...templates import render_template
+
+
+class EventReport(ResistantHandler):
+    """Shows how many of each drink were sold at an event and their revenue."""
+
+    def __init__(self, event_start: datetime, source: RequestSource):
+        self.event_start = event_start
+        self.event_id = int(event_start.timestamp())
+        self.source = source
+
+    @property
+    def canonical_url(self) -> str:
+        return f'/event/{self.event_id}/report'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        report = res.datastore.sales_report(self.event_start)
+        match self.source:
+            case RequestSource.NAV:
+                content = render_template(res.jinjaenv,
+                                          'event_report/event_report.jinja2',
+                                          self.canonical_url,
+                                          event_start=self.event_start,
+                                          event_id=self.event_id,
+                                          report=report)
+                return HtmlCreator(content.encode())
+            case RequestSource.AJAX:
+                json = {
+                    'count': report.count,
+                    'revenue': report.revenue,
+                    'drinks': [drink_sales_json(drink) for drink in report.drinks],
+                    'hours': [{'hour': int(hour.hour.timestamp()),
+                               'count': hour.count,
+                               'revenue': hour.revenue}
+                              for hour in report.hours]
+                }
+                return AjaxCreator(json, 200)
+            case _:
+                raise ValueError("Unsupported RequestSource!")
+
+
+def drink_sales_json(drink: DrinkSales) -> dict[str, Any]:
+    """Converts the sales of a drink to their JSON representation."""
+
+    return {'name': drink.drink_name,
+            'displayName': drink.display_name,
+            'count': drink.count,
+            'revenue': drink.revenue}
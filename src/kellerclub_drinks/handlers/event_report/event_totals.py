@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from .event_report import drink_sales_json
+from ..errors.error import ResistantHandler
+from ...resources import Resources
+from ...response_creators import AjaxCreator, ResponseCreator
+
+
+class EventTotals(ResistantHandler):
+    """Returns the running sales totals of an event for live dashboards."""
+
+    def __init__(self, event_start: datetime):
+        self.event_start = event_start
+        self.event_id = int(event_start.timestamp())
+
+    @property
+    def canonical_url(self) -> str:
+        return f'/api/event/{self.event_id}/totals'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        totals = res.datastore.event_totals(self.event_start)
+        json = {
+            'count': sum(drink.count for drink in totals),
+            'revenue': sum(drink.revenue for drink in totals),
+            'drinks': [drink_sales_json(drink) for drink in totals]
+        }
+        return AjaxCreator(json, 200)
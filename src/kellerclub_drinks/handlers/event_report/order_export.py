@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from contextlib import closing
+from datetime import datetime
+from typing import Generator, Iterator
+
+from ..errors.error import ResistantHandler
+from ...model.orders import Order
+from ...resources import Resources
+from ...response_creators import ContentDispositionModifier, ResponseCreator, StreamingCreator
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson'
+}
+
+# rows per chunk handed to the WSGI server
+CHUNK_ROWS = 500
+
+
+class OrderExport(ResistantHandler):
+    """Streams all orders of an event as CSV or JSON lines.
+
+    Orders are read from the database while the response is sent, so the
+    memory needed does not depend on the number of orders.
+    """
+
+    def __init__(self, event_start: datetime, export_format: str):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format {export_format}!')
+
+        self.event_start = event_start
+        self.event_id = int(event_start.timestamp())
+        self.export_format = export_format
+
+    @property
+    def canonical_url(self) -> str:
+        return f'/event/{self.event_id}/orders.{self.export_format}'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        orders = res.datastore.orders(self.event_start)
+        match self.export_format:
+            case 'csv':
+                chunks = _csv_chunks(orders)
+            case 'jsonl':
+                chunks = _jsonl_chunks(orders)
+            case _:
+                raise ValueError("Unsupported export format!")
+
+        creator = StreamingCreator(chunks, EXPORT_FORMATS[self.export_format])
+        filename = f'event-{self.event_id}-orders.{self.export_format}'
+        creator.add_header_modifier(ContentDispositionModifier(filename))
+        return creator
+
+
+def _csv_chunks(orders: Generator[Order, None, None]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['id', 'time', 'drink'])
+
+    with closing(orders):
+        for i, order in enumerate(orders, 1):
+            writer.writerow([order.id, order.time.isoformat(), order.drink_name])
+            if i % CHUNK_ROWS == 0:
+                yield _take(buffer)
+
+    yield _take(buffer)
+
+
+def _jsonl_chunks(orders: Generator[Order, None, None]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+
+    with closing(orders):
+        for i, order in enumerate(orders, 1):
+            buffer.write(json.dumps({'id': order.id,
+                                     'time': order.time.isoformat(),
+                                     'drink': order.drink_name}))
+            buffer.write('\n')
+            if i % CHUNK_ROWS == 0:
+                yield _take(buffer)
+
+    yield _take(buffer)
+
+
+def _take(buffer: io.StringIO) -> bytes:
+    content = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return content
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from ..errors.error import ResistantHandler
+from ...resources import Resources
+from ...response_creators import EventStreamCreator, ResponseCreator
+
+
+class OrderStream(ResistantHandler):
+    """Pushes the orders of an event to live order screens as they are
+    submitted.
+
+    The connection stays open until the client goes away. Served through
+    WSGI, it occupies a worker thread for that time, served through ASGI it
+    does not.
+    """
+
+    def __init__(self, event_start: datetime):
+        self.event_start = event_start
+        self.event_id = int(event_start.timestamp())
+
+    @property
+    def canonical_url(self) -> str:
+        return f'/api/event/{self.event_id}/stream'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        return EventStreamCreator(res.order_bus.subscribe(self.event_id))
@@ -0,0 +1,29 @@
+from ..handlers.errors.error import ResistantHandler
+from ..model.menus import Menu
+from ..resources import Resources
+from ..response_creators import AjaxCreator, ResponseCreator
+
+
+class ImportMenu(ResistantHandler):
+    """Adds the drinks and layouts of a menu to the data store at once.
+
+    Responds with the list of problems if the menu cannot be imported.
+    """
+
+    def __init__(self, menu: Menu):
+        self.menu = menu
+
+    @property
+    def canonical_url(self) -> str:
+        return '/api/menu/import'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        problems = self.menu.problems(res.datastore.all_drinks().keys(),
+                                      res.datastore.all_layouts().keys())
+        if problems:
+            return AjaxCreator({'problems': problems}, 400)
+
+        res.datastore.import_menu(self.menu)
+        return AjaxCreator({'drinks': len(self.menu.drinks),
+                            'layouts': len(self.menu.layouts),
+                            'buttons': len(self.menu.buttons)}, 200)
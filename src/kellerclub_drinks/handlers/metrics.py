@@ -0,0 +1,18 @@
+from .errors.error import ErrorHandler, ResistantHandler
+from ..resources import Resources
+from ..response_creators import ResponseCreator, SuccessCreator
+
+
+class MetricsHandler(ResistantHandler):
+    """Exports request metrics for Prometheus, if they are enabled."""
+
+    @property
+    def canonical_url(self) -> str:
+        return '/metrics'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        if res.metrics is None:
+            return ErrorHandler(404, 'Metrics are disabled!').handle(res)
+
+        return SuccessCreator(res.metrics.render().encode(),
+                              'text/plain; version=0.0.4; charset=utf-8', False)
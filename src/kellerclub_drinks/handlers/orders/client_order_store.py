@@ -1,3 +1,4 @@
+import uuid
 from http.cookies import SimpleCookie
 from wsgiref.handlers import format_date_time
 
@@ -6,6 +7,15 @@ from kellerclub_drinks.settings import Settings
 
 
 class ClientOrderStore:
+    """Keeps the orders of a client that have not been submitted yet in a
+    cookie.
+
+    The cookie holds the comma-separated drink names followed by a batch id
+    after a '|', which changes whenever an order is added. Submitting the same
+    orders again, e.g. after the response got lost, thereby repeats the batch
+    and does not add the orders twice.
+    """
+
     def __init__(self, event_id: int):
         self.key = f'event-{event_id}-orders'
 
@@ -18,7 +28,7 @@ class ClientOrderStore:
     def add_order(self, order_list: list[str], drink_name: str,
                   header: HttpHeader, _: Settings) -> None:
         cookie = _cookie(self.key)
-        cookie[self.key] = ','.join(order_list + [drink_name])
+        cookie[self.key] = ','.join(order_list + [drink_name]) + f'|{uuid.uuid4()}'
         _add_header(header, cookie)
 
 
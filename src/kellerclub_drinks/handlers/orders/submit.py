@@ -1,28 +1,40 @@
 from datetime import datetime
+from typing import Optional
 
 from .client_order_store import ClientOrderStore
-from ..errors.error import ResistantHandler
+from ..errors.error import ErrorHandler, ResistantHandler
+from ...datastores.datastore import OrderBatch
 from ...resources import Resources
 from ...response_creators import AjaxCreator, RedirectCreator, ResponseCreator
 from ...routers.request_source import RequestSource
 
 
 class Submit(ResistantHandler):
-    """Persists a time-stamped drink order in the datastore."""
+    """Persists a time-stamped drink order in the datastore.
+
+    Orders submitted again with the same batch id are not added twice, the
+    ids assigned the first time are returned instead. Orders of unknown drinks
+    or events are rejected with status 422 before anything is written.
+    """
 
     def __init__(self, drink_names: list[str], event_id: datetime,
-                 source: RequestSource, redirect_url: str):
+                 source: RequestSource, redirect_url: str,
+                 batch_id: Optional[str] = None):
         self.drink_names = drink_names
         self.event_id = event_id
         self.source = source
         self.redirect_url = redirect_url
+        self.batch_id = batch_id
 
     @property
     def canonical_url(self) -> str:
         return '/orders/submit'
 
     def _handle(self, res: Resources) -> ResponseCreator:
-        res.datastore.submit_order(self.event_id, self.drink_names)
+        if problem := _problem(res, self.event_id, self.drink_names):
+            return ErrorHandler(422, problem).handle(res)
+
+        ids = res.datastore.submit_order(self.event_id, self.drink_names, self.batch_id)
 
         match self.source:
             case RequestSource.FORM:
@@ -31,6 +43,44 @@ class Submit(ResistantHandler):
                 creator.add_header_modifier(modifier)
                 return creator
             case RequestSource.AJAX:
-                return AjaxCreator(None, 200)
+                return AjaxCreator({'orders': ids}, 200)
             case _:
                 raise ValueError("Unsupported RequestSource!")
+
+
+class SubmitBatches(ResistantHandler):
+    """Persists several batches of orders at once, e.g. the ones a client
+    queued while it was offline, in a single transaction.
+
+    Responds with the ids of the orders of each batch. If a batch orders
+    unknown drinks or belongs to an unknown event, nothing is written and the
+    indices of all such batches are sent with status 422 instead.
+    """
+
+    def __init__(self, batches: list[OrderBatch]):
+        self.batches = batches
+
+    @property
+    def canonical_url(self) -> str:
+        return '/api/orders/submit'
+
+    def _handle(self, res: Resources) -> ResponseCreator:
+        rejected = [index for index, (event_id, drinks, _) in enumerate(self.batches)
+                    if _problem(res, event_id, drinks)]
+        if rejected:
+            return AjaxCreator({'rejected': rejected}, 422)
+
+        ids = res.datastore.submit_orders(self.batches)
+        return AjaxCreator({'orders': ids}, 200)
+
+
+def _problem(res: Resources, event_id: datetime, drink_names: list[str]) -> Optional[str]:
+    # checked up front, so that a bad batch is told apart from a failed write
+    if unknown := sorted(set(drink_names) - res.datastore.all_drinks().keys()):
+        return f"Unknown drinks {', '.join(unknown)}!"
+
+    current = res.datastore.current_event()
+    if (current is None or current.start_time != event_id) \
+            and res.datastore.event(event_id) is None:
+        return f"Unknown event {int(event_id.timestamp())}!"
+    return None
@@ -0,0 +1,199 @@
+"""Distribution of newly submitted orders to live order screens.
+
+Orders submitted in this process are published to the OrderBus right away.
+If several processes serve the application, an OrderPoller additionally reads
+the orders of events that have subscribers from the datastore, once per
+process and interval no matter how many screens are subscribed.
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from datetime import datetime
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Iterable, Optional
+
+from .datastores.datastore import DataStore
+from .model.orders import Order
+
+# identifiers of orders published per event that are remembered to drop
+# orders that are published both locally and by the poller
+_SEEN_ORDERS = 4096
+
+
+class Subscription:
+    """The orders published for one event since they were last taken.
+
+    If more than maxsize orders are waiting, the oldest ones are dropped and
+    the subscription is marked as overflowed, so that a slow subscriber
+    cannot make the bus hold an unbounded number of orders.
+    """
+
+    def __init__(self, bus: 'OrderBus', event_id: int, maxsize: int):
+        self.bus = bus
+        self.event_id = event_id
+        self.maxsize = maxsize
+        self._condition = Condition()
+        self._orders: deque[Order] = deque()
+        self._overflowed = False
+        self._wakeup: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = None
+
+    def put(self, orders: Iterable[Order]) -> None:
+        """Adds orders and wakes up the subscriber."""
+
+        with self._condition:
+            for order in orders:
+                if len(self._orders) >= self.maxsize:
+                    self._orders.popleft()
+                    self._overflowed = True
+                self._orders.append(order)
+            self._condition.notify_all()
+            wakeup = self._wakeup
+
+        if wakeup is not None:
+            loop, event = wakeup
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # the event loop of the subscriber is already closed
+
+    def take(self, timeout: float) -> tuple[list[Order], bool]:
+        """Waits up to timeout seconds for orders, then returns the waiting
+        orders and whether some were dropped since the last call.
+        """
+
+        with self._condition:
+            if not self._orders and not self._overflowed:
+                self._condition.wait(timeout)
+            return self._drain()
+
+    async def take_async(self, timeout: float) -> tuple[list[Order], bool]:
+        """Like take, but waits on the running event loop instead of
+        blocking a thread.
+        """
+
+        with self._condition:
+            if self._wakeup is None:
+                self._wakeup = (asyncio.get_running_loop(), asyncio.Event())
+            _, event = self._wakeup
+            if self._orders or self._overflowed:
+                return self._drain()
+            event.clear()
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        with self._condition:
+            return self._drain()
+
+    def close(self) -> None:
+        """Stops receiving orders."""
+
+        self.bus.unsubscribe(self)
+
+    def _drain(self) -> tuple[list[Order], bool]:
+        orders = list(self._orders)
+        overflowed = self._overflowed
+        self._orders.clear()
+        self._overflowed = False
+        return orders, overflowed
+
+
+class OrderBus:
+    """Broadcasts the orders of each event to its subscriptions."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        # used as ordered sets, the oldest identifiers are forgotten first
+        self._seen: dict[int, dict[int, None]] = defaultdict(dict)
+
+    def subscribe(self, event_id: int) -> Subscription:
+        subscription = Subscription(self, event_id, self.maxsize)
+        with self._lock:
+            self._subscriptions[event_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.event_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.event_id, None)
+                self._seen.pop(subscription.event_id, None)
+
+    def events(self) -> list[int]:
+        """Returns the events that currently have subscribers."""
+
+        with self._lock:
+            return list(self._subscriptions)
+
+    def publish(self, event_id: int, orders: Iterable[Order]) -> None:
+        """Passes the orders to all subscriptions of the event, skipping
+        orders that have already been published.
+        """
+
+        with self._lock:
+            if event_id not in self._subscriptions:
+                return
+            seen = self._seen[event_id]
+            new_orders = [order for order in orders if order.id not in seen]
+            for order in new_orders:
+                seen[order.id] = None
+            while len(seen) > _SEEN_ORDERS:
+                del seen[next(iter(seen))]
+            subscriptions = list(self._subscriptions[event_id])
+
+        if new_orders:
+            for subscription in subscriptions:
+                subscription.put(new_orders)
+
+
+class OrderPoller:
+    """Publishes orders submitted by other processes, by reading the orders
+    of subscribed events from the datastore every interval seconds.
+    """
+
+    def __init__(self, bus: OrderBus, store: DataStore, interval: float,
+                 log: Callable[[str], None] = print):
+        self.bus = bus
+        self.store = store
+        self.interval = interval
+        self.log = log
+        # the identifier of the last order read per event
+        self._positions: dict[int, int] = {}
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, name='order-poller', daemon=True)
+        self._thread.start()
+
+    def poll(self) -> None:
+        """Reads and publishes new orders of all subscribed events once."""
+
+        events = self.bus.events()
+        for event_id in list(self._positions):
+            if event_id not in events:
+                del self._positions[event_id]
+
+        for event_id in events:
+            after = self._positions.get(event_id)
+            orders = list(self.store.orders(datetime.fromtimestamp(event_id), after or 0))
+            if orders:
+                self._positions[event_id] = orders[-1].id
+            elif after is None:
+                self._positions[event_id] = 0
+            # orders submitted before the first poll are not new to anyone
+            if after is not None:
+                self.bus.publish(event_id, orders)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.log(f'Polling orders failed: {e}')
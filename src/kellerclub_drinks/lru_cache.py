@@ -0,0 +1,52 @@
+"""A small thread-safe cache that evicts the least recently used entries."""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LruCache(Generic[K, V]):
+    """Keeps at most maxsize values, dropping the least recently used one
+    when full.
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('Cache must hold at least one entry!')
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K, load: Callable[[], V]) -> V:
+        """Returns the value for key, creating it with load if it is missing.
+
+        load is called without holding the lock, so concurrent misses for the
+        same key may load the value more than once.
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = load()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Removes all entries."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,138 @@
+"""Request timing and counters, exported in the Prometheus text format.
+
+While a request is being timed, the code it runs can attribute time to a
+phase with `with phase('datastore'): ...`. Outside of timed requests, e.g.
+with metrics disabled, phase() only costs a thread-local lookup.
+"""
+
+from bisect import bisect_left
+from threading import Lock, local
+from time import perf_counter
+from types import TracebackType
+from typing import Optional
+
+# upper bounds of the histogram buckets in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PHASES = ('routing', 'handler', 'datastore', 'template', 'serve')
+
+
+class RequestTimer:
+    """Sums up the time one request spends in each phase."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase_name: str, seconds: float) -> None:
+        self.phases[phase_name] = self.phases.get(phase_name, 0.0) + seconds
+
+
+class _Phase:
+    def __init__(self, timer: RequestTimer, name: str):
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, exc_type: Optional[type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        self.timer.add(self.name, perf_counter() - self.start)
+
+
+class _NoPhase:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, exc_type: Optional[type[BaseException]],
+                 exc_val: Optional[BaseException],
+                 exc_tb: Optional[TracebackType]) -> None:
+        pass
+
+
+_NO_PHASE = _NoPhase()
+_current = local()
+
+
+def phase(name: str) -> _Phase | _NoPhase:
+    """Attributes the time spent in the with block to the given phase of the
+    request currently timed on this thread, if any.
+    """
+
+    timer: Optional[RequestTimer] = getattr(_current, 'timer', None)
+    if timer is None:
+        return _NO_PHASE
+    return _Phase(timer, name)
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+
+class Metrics:
+    """Latency histograms per handler and phase and request counts per
+    handler and status code.
+
+    Handlers are identified by their class name, which keeps the number of
+    time series small in contrast to URLs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._histograms: dict[tuple[str, str], _Histogram] = {}
+        self._requests: dict[tuple[str, int], int] = {}
+
+    def start_request(self) -> RequestTimer:
+        """Starts timing a request on the current thread."""
+
+        timer = RequestTimer()
+        _current.timer = timer
+        return timer
+
+    def finish_request(self, timer: RequestTimer, handler: str, status: int) -> None:
+        """Stops timing the current request and records its measurements."""
+
+        _current.timer = None
+        with self._lock:
+            for phase_name, seconds in timer.phases.items():
+                key = (handler, phase_name)
+                if (histogram := self._histograms.get(key)) is None:
+                    histogram = self._histograms[key] = _Histogram()
+                histogram.observe(seconds)
+            self._requests[handler, status] = self._requests.get((handler, status), 0) + 1
+
+    def render(self) -> str:
+        """Returns all measurements in the Prometheus text exposition format."""
+
+        lines = ['# HELP kellerclub_request_phase_seconds Time spent per request in each phase. '
+                 'The handler phase includes the datastore and template phases.',
+                 '# TYPE kellerclub_request_phase_seconds histogram']
+        with self._lock:
+            for (handler, phase_name), histogram in sorted(self._histograms.items()):
+                labels = f'handler="{handler}",phase="{phase_name}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'kellerclub_request_phase_seconds_bucket'
+                                 f'{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += histogram.counts[-1]
+                lines.append(f'kellerclub_request_phase_seconds_bucket'
+                             f'{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f'kellerclub_request_phase_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'kellerclub_request_phase_seconds_count{{{labels}}} {cumulative}')
+
+            lines.append('# HELP kellerclub_requests_total Requests by handler and status code.')
+            lines.append('# TYPE kellerclub_requests_total counter')
+            for (handler, status), count in sorted(self._requests.items()):
+                lines.append(f'kellerclub_requests_total'
+                             f'{{handler="{handler}",status="{status}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
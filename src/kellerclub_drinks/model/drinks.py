@@ -5,6 +5,8 @@ from dataclasses import dataclass
 
 from .prices import PriceHistory
 
+_VALID_NAME = re.compile('^[a-zA-Z0-9_]+$')
+
 
 @dataclass(frozen=True)
 class Drink:
@@ -25,4 +27,4 @@ class Drink:
     def valid_name(name: str) -> bool:
         """True if name is a valid internal name, false otherwise."""
 
-        return bool(re.match('^[a-zA-Z0-9_]+$', name))
+        return bool(_VALID_NAME.match(name))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Collection, Optional
+
+from .drinks import Drink
+from .prices import PriceHistory
+
+# size of the grid of a layout, see Layout
+GRID_SIZE = 5
+
+CSV_COLUMNS = ['type', 'name', 'display_name', 'price', 'time',
+               'layout', 'xpos', 'ypos', 'drink', 'link']
+
+
+@dataclass(frozen=True)
+class MenuButton:
+    """A button of an imported layout, either ordering a drink or linking to
+    another layout.
+    """
+
+    layout: str
+    xpos: int
+    ypos: int
+    display_name: Optional[str]
+    drink_name: Optional[str] = None
+    linked_layout: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Menu:
+    """Drinks with their prices and layouts that are imported together."""
+
+    drinks: list[Drink]
+    layouts: list[str]
+    buttons: list[MenuButton]
+
+    def problems(self, existing_drinks: Collection[str],
+                 existing_layouts: Collection[str]) -> list[str]:
+        """Checks the menu against itself and the data that already exists,
+        returning a description of every problem found.
+        """
+
+        drink_names = Counter(drink.name for drink in self.drinks)
+        layout_names = Counter(self.layouts)
+        return (self._drink_problems(drink_names, existing_drinks)
+                + self._layout_problems(layout_names, existing_layouts)
+                + self._button_problems(drink_names.keys() | set(existing_drinks),
+                                        layout_names.keys(),
+                                        layout_names.keys() | set(existing_layouts)))
+
+    def _drink_problems(self, drink_names: Counter[str],
+                        existing_drinks: Collection[str]) -> list[str]:
+        result = []
+        for name, count in drink_names.items():
+            if count > 1:
+                result.append(f'Drink {name} is defined {count} times!')
+            if name in existing_drinks:
+                result.append(f'Drink {name} already exists!')
+        for drink in self.drinks:
+            history = drink.prices['default']
+            if any(price < 0 for price in [history.base_price, *history.price_changes.values()]):
+                result.append(f'Drink {drink.name} has a negative price!')
+        return result
+
+    @staticmethod
+    def _layout_problems(layout_names: Counter[str],
+                         existing_layouts: Collection[str]) -> list[str]:
+        result = []
+        for name, count in layout_names.items():
+            if count > 1:
+                result.append(f'Layout {name} is defined {count} times!')
+            if name in existing_layouts:
+                result.append(f'Layout {name} already exists!')
+            if not Drink.valid_name(name):
+                result.append(f'Invalid layout name {name}!')
+        return result
+
+    def _button_problems(self, known_drinks: Collection[str], imported_layouts: Collection[str],
+                         known_layouts: Collection[str]) -> list[str]:
+        result = []
+        cells = Counter((button.layout, button.xpos, button.ypos) for button in self.buttons)
+        for (layout, xpos, ypos), count in cells.items():
+            if count > 1:
+                result.append(f'Layout {layout} has {count} buttons at {xpos}/{ypos}!')
+
+        for button in self.buttons:
+            where = f'Button at {button.xpos}/{button.ypos} of layout {button.layout}'
+            if button.layout not in imported_layouts:
+                result.append(f'{where} belongs to a layout that is not imported!')
+            if not (0 <= button.xpos < GRID_SIZE and 0 <= button.ypos < GRID_SIZE):
+                result.append(f'{where} is outside of the {GRID_SIZE}x{GRID_SIZE} grid!')
+            if (button.drink_name is None) == (button.linked_layout is None):
+                result.append(f'{where} needs either a drink or a linked layout!')
+            if button.drink_name is not None and button.drink_name not in known_drinks:
+                result.append(f'{where} orders unknown drink {button.drink_name}!')
+            if button.linked_layout is not None and button.linked_layout not in known_layouts:
+                result.append(f'{where} links to unknown layout {button.linked_layout}!')
+            if button.linked_layout is not None and button.display_name is None:
+                result.append(f'{where} links to a layout, but has no display name!')
+        return result
+
+    @staticmethod
+    def from_json(text: str) -> Menu:
+        """Reads a menu in the JSON format described in scripts/import_menu.py.
+
+        Raises a ValueError if the structure does not match.
+        """
+
+        try:
+            menu_json = json.loads(text)
+            drinks = [_drink(_str(entry['name']), _str(entry['displayName']),
+                             entry['basePrice'],
+                             {_time(change['time']): _int(change['price'])
+                              for change in entry.get('prices', [])})
+                      for entry in menu_json.get('drinks', [])]
+            layouts = [_str(entry['name']) for entry in menu_json.get('layouts', [])]
+            buttons = [MenuButton(_str(layout['name']), _int(entry['xpos']), _int(entry['ypos']),
+                                  _optional_str(entry.get('displayName')),
+                                  _optional_str(entry.get('drink')),
+                                  _optional_str(entry.get('link')))
+                       for layout in menu_json.get('layouts', [])
+                       for entry in layout.get('buttons', [])]
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f'Malformed menu: {e!r}!') from e
+
+        return Menu(drinks, layouts, buttons)
+
+    @staticmethod
+    def from_csv(text: str) -> Menu:
+        """Reads a menu in the CSV format described in scripts/import_menu.py.
+
+        Raises a ValueError if the structure does not match.
+        """
+
+        reader = csv.DictReader(io.StringIO(text))
+        if reader.fieldnames is None or set(reader.fieldnames) != set(CSV_COLUMNS):
+            raise ValueError(f'Menu CSV needs the columns {", ".join(CSV_COLUMNS)}!')
+
+        base_prices: dict[str, tuple[str, int]] = {}
+        price_changes: dict[str, dict[datetime, int]] = {}
+        layouts = []
+        buttons = []
+        for line, row in enumerate(reader, start=2):
+            match row['type']:
+                case 'drink':
+                    base_prices[row['name']] = (row['display_name'], _int(row['price']))
+                    price_changes.setdefault(row['name'], {})
+                case 'price':
+                    changes = price_changes.setdefault(row['name'], {})
+                    changes[_time(row['time'])] = _int(row['price'])
+                case 'layout':
+                    layouts.append(row['name'])
+                case 'button':
+                    buttons.append(MenuButton(row['layout'], _int(row['xpos']), _int(row['ypos']),
+                                              row['display_name'] or None,
+                                              row['drink'] or None, row['link'] or None))
+                case _:
+                    raise ValueError(f"Unknown row type {row['type']} in line {line}!")
+
+        if unknown := price_changes.keys() - base_prices.keys():
+            raise ValueError(f'Prices for drinks that are not defined: {sorted(unknown)}!')
+
+        drinks = [_drink(name, display_name, base_price, price_changes[name])
+                  for name, (display_name, base_price) in base_prices.items()]
+        return Menu(drinks, layouts, buttons)
+
+
+def _drink(name: str, display_name: str, base_price: Any,
+           price_changes: dict[datetime, int]) -> Drink:
+    return Drink(name, display_name, {'default': PriceHistory(_int(base_price), price_changes)})
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f'{value!r} is not a whole number!')
+    return int(value)
+
+
+def _str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f'{value!r} is not a text!')
+    return value
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None else _str(value)
+
+
+def _time(value: Any) -> datetime:
+    if not isinstance(value, str):
+        raise ValueError(f'{value!r} is not a point in time!')
+    return datetime.fromisoformat(value)
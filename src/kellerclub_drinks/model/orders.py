@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class Order:
+    """A single drink ordered at an event."""
+
+    id: int
+    time: datetime
+    drink_name: str
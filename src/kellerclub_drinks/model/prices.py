@@ -1,24 +1,36 @@
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
 
 
 @dataclass(frozen=True)
 class PriceHistory:
-    """History of prices for one drink."""
+    """History of prices for one drink.
+
+    Each price change applies from its point in time until the next change.
+    Before the first change, the base price applies.
+    """
 
     base_price: int
     price_changes: dict[datetime, int]
 
+    # price changes sorted by time, as parallel lists for binary search
+    _times: list[datetime] = field(init=False, repr=False, compare=False)
+    _prices: list[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        changes = sorted(self.price_changes.items())
+        object.__setattr__(self, '_times', [time for time, _ in changes])
+        object.__setattr__(self, '_prices', [price for _, price in changes])
+
     def price_at(self, time: datetime) -> int:
         """Price at a specific point in time."""
 
-        for changepoint, price in self.price_changes.items():
-            if time >= changepoint:
-                return price
-        return self.base_price
+        index = bisect_right(self._times, time)
+        return self._prices[index - 1] if index else self.base_price
 
     @property
     def current(self) -> int:
         """Current price."""
 
-        return next(iter(reversed(self.price_changes.values())), self.base_price)
+        return self._prices[-1] if self._prices else self.base_price
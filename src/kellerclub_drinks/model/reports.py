@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class DrinkSales:
+    """Number of sold units of one drink and the revenue they earned."""
+
+    drink_name: str
+    display_name: str
+    count: int
+    revenue: int
+
+
+@dataclass(frozen=True)
+class HourlySales:
+    """Number of drinks sold within one hour and the revenue they earned."""
+
+    hour: datetime
+    count: int
+    revenue: int
+
+
+@dataclass(frozen=True)
+class SalesReport:
+    """Sales of an event, grouped by drink and by hour."""
+
+    drinks: list[DrinkSales]
+    hours: list[HourlySales]
+
+    @property
+    def count(self) -> int:
+        """Total number of drinks sold."""
+
+        return sum(drink.count for drink in self.drinks)
+
+    @property
+    def revenue(self) -> int:
+        """Total revenue."""
+
+        return sum(drink.revenue for drink in self.drinks)
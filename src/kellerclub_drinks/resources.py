@@ -1,17 +1,57 @@
 """Provides global resources to the application."""
 
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from pathlib import Path
+from typing import Hashable, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+from markupsafe import Markup
 
 from .datastores import datastore_factory
 from .datastores.datastore import DataStore
+from .datastores.metered_store import MeteredStore
+from .datastores.publishing_store import PublishingStore
+from .live_orders import OrderBus, OrderPoller
+from .lru_cache import LruCache
+from .metrics import Metrics
 from .settings import Settings
+from .static_files import StaticFileCache
+from .templates import precompile_templates
 
 
 class Resources:
     def __init__(self, settings: Settings):
         self.datastore: DataStore = datastore_factory.from_settings(settings.data_store_settings)
+        self.metrics: Optional[Metrics] = None
+        if settings.metrics:
+            self.metrics = Metrics()
+            self.datastore = MeteredStore(self.datastore)
+        # newly submitted orders for live order screens
+        self.order_bus = OrderBus()
+        self.order_poller: Optional[OrderPoller] = None
+        if settings.order_poll_interval is not None:
+            self.order_poller = OrderPoller(self.order_bus, self.datastore,
+                                            settings.order_poll_interval)
+        self.datastore = PublishingStore(self.datastore, self.order_bus)
         self.jinjaenv = Environment(loader=FileSystemLoader("kellerclub_drinks/handlers"),
                                     autoescape=True,
                                     trim_blocks=True,
-                                    undefined=StrictUndefined)
+                                    undefined=StrictUndefined,
+                                    # compiled templates survive restarts and
+                                    # are shared between worker processes
+                                    bytecode_cache=FileSystemBytecodeCache(settings.template_cache),
+                                    auto_reload=settings.development)
+        self.static_files = StaticFileCache(Path('kellerclub_drinks/handlers'),
+                                            reload=settings.development)
+        # rendered drink selector grids, see DrinkSelector
+        self.selector_grids: LruCache[Hashable, Markup] = LruCache(64)
         self.jinjaenv.filters['euro'] = lambda value: f'{value // 100},{value % 100} €'
+        if not settings.development:
+            precompile_templates(self.jinjaenv)
+            self.static_files.preload()
+
+    def close(self) -> None:
+        """Releases the resources, e.g. the connections of the datastore."""
+
+        if self.order_poller is not None:
+            self.order_poller.close()
+        self.datastore.close()
@@ -2,11 +2,15 @@
 Interface and implementations of response creators.
 """
 
+import hashlib
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable, Generator, Iterable, Iterator, Optional
 from wsgiref.types import StartResponse
 
+from kellerclub_drinks import compression
+from kellerclub_drinks.live_orders import Subscription
+from kellerclub_drinks.model.orders import Order
 from kellerclub_drinks.settings import Settings
 
 
@@ -19,8 +23,12 @@ HeaderModifier = Callable[[HttpHeader, Settings], None]
 _STATUS_MESSAGES = {
     200: 'OK',
     303: 'See Other',
+    304: 'Not Modified',
     400: 'Bad Request',
-    404: 'Not Found'
+    404: 'Not Found',
+    422: 'Unprocessable Content',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
 }
 
 
@@ -32,10 +40,12 @@ class ResponseCreator(ABC):
     """Sends a response back to the WSGI server."""
 
     @abstractmethod
-    def serve(self, settings: Settings, start_response: StartResponse) -> list[bytes]:
+    def serve(self, settings: Settings, start_response: StartResponse,
+              accept_encoding: Optional[str] = None) -> Iterable[bytes]:
         """
         Sets appropriate headers when calling start_response and returns the
-        response body.
+        response body, compressed with one of the content codings listed in
+        accept_encoding if worthwhile.
         """
 
 
@@ -45,7 +55,7 @@ class ComposableCreator(ResponseCreator, ABC):
 
     @property
     @abstractmethod
-    def content(self) -> list[bytes]:
+    def content(self) -> Iterable[bytes]:
         """Content of the HTTP response."""
 
     @property
@@ -53,14 +63,38 @@ class ComposableCreator(ResponseCreator, ABC):
     def status_code(self) -> int:
         """Status code of the HTTP response."""
 
-    def serve(self, settings: Settings, start_response: StartResponse) -> list[bytes]:
+    def serve(self, settings: Settings, start_response: StartResponse,
+              accept_encoding: Optional[str] = None) -> Iterable[bytes]:
         headers: dict[str, str] = {}
         for mod in self._header_modifiers:
             mod(headers, settings)
 
+        content = self._encode(headers, settings, accept_encoding)
+
         start_response(_get_status_string(self.status_code), list(headers.items()))
 
-        return self.content
+        return content
+
+    def _encode(self, headers: HttpHeader, settings: Settings,
+                accept_encoding: Optional[str]) -> Iterable[bytes]:
+        """Compresses the content if the client accepts it and updates the
+        headers accordingly.
+        """
+
+        if not compression.is_compressible(headers.get('Content-type')):
+            return self.content
+
+        content = b''.join(self.content)
+        if len(content) < compression.MIN_SIZE:
+            return [content]
+
+        VaryModifier()(headers, settings)
+        if (encoding := compression.negotiate(accept_encoding, compression.ENCODINGS)) is None:
+            return [content]
+
+        compressed = compression.compress(content, encoding)
+        ContentEncodingModifier(encoding, len(compressed))(headers, settings)
+        return [compressed]
 
     def add_header_modifier(self, modifier: HeaderModifier) -> None:
         self._header_modifiers.append(modifier)
@@ -86,6 +120,14 @@ class CacheControlModifier:
         header['Cache-Control'] = f'max-age={settings.cache_age}'
 
 
+class ContentTypeModifier:
+    def __init__(self, content_type: str) -> None:
+        self.content_type = content_type
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Content-type'] = self.content_type
+
+
 class ContentHeaderModifier:
     def __init__(self, content: bytes, content_type: str) -> None:
         self.content = content
@@ -96,6 +138,92 @@ class ContentHeaderModifier:
         header['Content-Length'] = str(len(self.content))
 
 
+class NoBufferingModifier:
+    """Keeps caches and reverse proxies from holding back a response that
+    is sent piece by piece.
+    """
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Cache-Control'] = 'no-cache'
+        header['X-Accel-Buffering'] = 'no'
+
+
+class RevalidateModifier:
+    """Lets clients cache the response, but only use it after checking with
+    the server that it is still up-to-date.
+    """
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Cache-Control'] = 'no-cache'
+
+
+class ValidatorModifier:
+    def __init__(self, etag: str, last_modified: Optional[str] = None) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['ETag'] = self.etag
+        if self.last_modified is not None:
+            header['Last-Modified'] = self.last_modified
+
+
+class VaryModifier:
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Vary'] = 'Accept-Encoding'
+
+
+class ContentEncodingModifier:
+    """Marks the content as compressed.
+
+    The content coding is appended to the ETag, as a strong validator must
+    differ between representations.
+    """
+
+    def __init__(self, encoding: str, content_length: Optional[int]) -> None:
+        self.encoding = encoding
+        self.content_length = content_length
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Content-Encoding'] = self.encoding
+        if self.content_length is not None:
+            header['Content-Length'] = str(self.content_length)
+        else:
+            header.pop('Content-Length', None)
+        if (etag := header.get('ETag')) is not None:
+            header['ETag'] = encoded_etag(etag, self.encoding)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the representation of a resource with the given content coding."""
+
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def content_etag(content: bytes) -> str:
+    """Strong ETag derived from the content of a resource."""
+
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str, encodings: Iterable[str]) -> bool:
+    """Whether an If-None-Match header lists the ETag of the resource or of
+    one of its representations with the given content codings.
+    """
+
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    own_tags = {etag} | {encoded_etag(etag, encoding) for encoding in encodings}
+    return '*' in tags or not tags.isdisjoint(own_tags)
+
+
+class ContentDispositionModifier:
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+
+    def __call__(self, header: HttpHeader, settings: Settings) -> None:
+        header['Content-Disposition'] = f'attachment; filename="{self.filename}"'
+
+
 class RedirectCreator(ComposableCreator):
     """Serves an HTTP response containing a generic redirect."""
 
@@ -130,7 +258,8 @@ class ErrorCreator(ComposableCreator):
 
     @property
     def status_code(self) -> int:
-        return self._status_code if 400 <= self._status_code < 500 else 400
+        return self._status_code \
+            if self._status_code >= 400 and self._status_code in _STATUS_MESSAGES else 400
 
 
 class SuccessCreator(ComposableCreator):
@@ -153,10 +282,61 @@ class SuccessCreator(ComposableCreator):
 
 
 class StaticCreator(SuccessCreator):
-    """Serves static content as cachable content."""
+    """Serves static content as cachable content.
 
-    def __init__(self, content: bytes, content_type: str):
+    Compressed variants of the content are served as they are instead of
+    compressing the content on every request.
+    """
+
+    def __init__(self, content: bytes, content_type: str, etag: str, last_modified: str,
+                 variants: Optional[dict[str, bytes]] = None):
         super().__init__(content, content_type, True)
+        self.variants = variants or {}
+        self.add_header_modifier(ValidatorModifier(etag, last_modified))
+
+    def _encode(self, headers: HttpHeader, settings: Settings,
+                accept_encoding: Optional[str]) -> Iterable[bytes]:
+        if not self.variants:
+            return self.content
+
+        VaryModifier()(headers, settings)
+        if (encoding := compression.negotiate(accept_encoding, list(self.variants))) is None:
+            return self.content
+
+        compressed = self.variants[encoding]
+        ContentEncodingModifier(encoding, len(compressed))(headers, settings)
+        return [compressed]
+
+
+class NotModifiedCreator(ComposableCreator):
+    """Tells the client that its cached copy of a resource is still valid.
+
+    The ETag refers to the variant the client would have received. Resources
+    that must be revalidated on every use keep that Cache-Control directive.
+    """
+
+    def __init__(self, etag: str, last_modified: Optional[str],
+                 encodings: Optional[list[str]] = None, revalidate: bool = False):
+        super().__init__()
+        self.encodings = encodings or []
+        self.add_header_modifier(ValidatorModifier(etag, last_modified))
+        self.add_header_modifier(RevalidateModifier() if revalidate else CacheControlModifier())
+
+    @property
+    def content(self) -> list[bytes]:
+        return []
+
+    def _encode(self, headers: HttpHeader, settings: Settings,
+                accept_encoding: Optional[str]) -> Iterable[bytes]:
+        if self.encodings:
+            VaryModifier()(headers, settings)
+            if (encoding := compression.negotiate(accept_encoding, self.encodings)) is not None:
+                headers['ETag'] = encoded_etag(headers['ETag'], encoding)
+        return []
+
+    @property
+    def status_code(self) -> int:
+        return 304
 
 
 class HtmlCreator(SuccessCreator):
@@ -166,13 +346,35 @@ class HtmlCreator(SuccessCreator):
 
 
 class AjaxCreator(ComposableCreator):
-    """Serves an ajax response."""
+    """Serves an ajax response.
 
-    def __init__(self, content: Any, status_code: int):
+    With validate, the response carries an ETag derived from its content and
+    clients revalidate their cached copy on every use, see not_modified.
+    """
+
+    def __init__(self, content: Any, status_code: int, validate: bool = False):
         super().__init__()
-        self._content = json.dumps(content).encode()
+        self._content = json.dumps(content, separators=(',', ':')).encode()
         self._status_code = status_code
         self.add_header_modifier(ContentHeaderModifier(self._content, 'application/json'))
+        self.etag = content_etag(self._content) if validate else None
+        if self.etag is not None:
+            self.add_header_modifier(ValidatorModifier(self.etag))
+            self.add_header_modifier(RevalidateModifier())
+
+    def not_modified(self, if_none_match: Optional[str]) -> Optional[NotModifiedCreator]:
+        """Response for a client whose If-None-Match header shows that it
+        already has this content, or None if it does not.
+        """
+
+        if self.etag is None or if_none_match is None:
+            return None
+
+        # only content of that size is compressed when served
+        encodings = compression.ENCODINGS if len(self._content) >= compression.MIN_SIZE else []
+        if not etag_matches(if_none_match, self.etag, encodings):
+            return None
+        return NotModifiedCreator(self.etag, None, encodings, revalidate=True)
 
     @property
     def content(self) -> list[bytes]:
@@ -181,3 +383,143 @@ class AjaxCreator(ComposableCreator):
     @property
     def status_code(self) -> int:
         return self._status_code
+
+
+class StreamingCreator(ComposableCreator):
+    """Serves content that is produced while it is sent.
+
+    Chunks may be bytes or, e.g. for the output of Template.generate(),
+    strings, which are encoded as UTF-8. Small chunks are collected until at
+    least chunk_size bytes are available, so that the WSGI server does not
+    have to write every table row separately.
+
+    As the length of the content is unknown in advance, no Content-Length
+    header is sent and the WSGI server falls back to chunked transfer
+    encoding or closing the connection.
+    """
+
+    def __init__(self, chunks: Iterable[bytes | str], content_type: str,
+                 chunk_size: int = 8192) -> None:
+        super().__init__()
+        self._chunks = chunks
+        self.chunk_size = chunk_size
+        self.add_header_modifier(ContentTypeModifier(content_type))
+
+    @property
+    def content(self) -> Iterator[bytes]:
+        return self._coalesce()
+
+    def _encode(self, headers: HttpHeader, settings: Settings,
+                accept_encoding: Optional[str]) -> Iterable[bytes]:
+        if not compression.is_compressible(headers.get('Content-type')):
+            return self.content
+
+        VaryModifier()(headers, settings)
+        if (encoding := compression.negotiate(accept_encoding, compression.ENCODINGS)) is None:
+            return self.content
+
+        ContentEncodingModifier(encoding, None)(headers, settings)
+        return self._compress(compression.stream_compressor(encoding))
+
+    @property
+    def status_code(self) -> int:
+        return 200
+
+    def _coalesce(self) -> Generator[bytes, None, None]:
+        buffer: list[bytes] = []
+        size = 0
+        try:
+            for chunk in self._chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                buffer.append(chunk)
+                size += len(chunk)
+                if size >= self.chunk_size:
+                    yield b''.join(buffer)
+                    buffer.clear()
+                    size = 0
+            if size:
+                yield b''.join(buffer)
+        finally:
+            # release e.g. database cursors if the client disconnects early
+            if close := getattr(self._chunks, 'close', None):
+                close()
+
+    def _compress(self, compressor: compression.StreamCompressor) -> Iterator[bytes]:
+        # each chunk is flushed so that the client can render it right away
+        chunks = self._coalesce()
+        try:
+            for chunk in chunks:
+                yield compressor.compress(chunk)
+            yield compressor.finish()
+        finally:
+            chunks.close()
+
+
+class EventStreamCreator(ComposableCreator):
+    """Serves the orders of a subscription as server-sent events until the
+    client disconnects.
+
+    Each order is sent as an "order" event with its identifier as event id.
+    If orders had to be dropped because the client did not keep up, an
+    "overflow" event is sent, so that the client can reload the totals. A
+    comment is sent every heartbeat seconds without orders, so that proxies
+    do not close the connection.
+    """
+
+    def __init__(self, subscription: Subscription, heartbeat: float = 15) -> None:
+        super().__init__()
+        self.subscription = subscription
+        self.heartbeat = heartbeat
+        self.add_header_modifier(ContentTypeModifier('text/event-stream; charset=utf-8'))
+        self.add_header_modifier(NoBufferingModifier())
+
+    @property
+    def content(self) -> '_EventStream':
+        return _EventStream(self.subscription, self.heartbeat)
+
+    def _encode(self, headers: HttpHeader, settings: Settings,
+                accept_encoding: Optional[str]) -> Iterable[bytes]:
+        # compressors would hold back the events until enough data is there
+        return self.content
+
+    @property
+    def status_code(self) -> int:
+        return 200
+
+
+class _EventStream:
+    """The body of an event stream.
+
+    WSGI servers iterate it on a thread that waits for orders, ASGI servers
+    (see kellerclub_drinks.asgi) iterate it asynchronously on the event loop.
+    """
+
+    def __init__(self, subscription: Subscription, heartbeat: float) -> None:
+        self.subscription = subscription
+        self.heartbeat = heartbeat
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield b': connected\n\n'
+        while True:
+            yield _event_frames(*self.subscription.take(self.heartbeat))
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b': connected\n\n'
+        while True:
+            yield _event_frames(*await self.subscription.take_async(self.heartbeat))
+
+    def close(self) -> None:
+        self.subscription.close()
+
+
+def _event_frames(orders: list[Order], overflowed: bool) -> bytes:
+    frames = []
+    if overflowed:
+        frames.append('event: overflow\ndata: {}\n\n')
+    for order in orders:
+        data = json.dumps({'id': order.id,
+                           'time': order.time.isoformat(),
+                           'drink': order.drink_name})
+        frames.append(f'id: {order.id}\nevent: order\ndata: {data}\n\n')
+    return ''.join(frames).encode() or b': keep-alive\n\n'
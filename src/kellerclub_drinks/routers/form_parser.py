@@ -11,6 +11,7 @@ class FormParser:
 
     def __init__(self, *valid_params: Param[Any]):
         self.valid_params = valid_params
+        self._keys = frozenset(param.key for param in valid_params)
 
     def parse(self, query: str, /, content_type: Optional[str] = None) -> dict[str, Any]:
         """Parses the given form data, validating it against expected parameters.
@@ -23,8 +24,7 @@ class FormParser:
 
         payload = parse_qs(query, strict_parsing=True)
 
-        keys = {param.key for param in self.valid_params}
-        if extra_fields := payload.keys() - keys:
+        if extra_fields := payload.keys() - self._keys:
             raise ValueError(f'Found extraneous keys {extra_fields}!')
 
         for param in self.valid_params:
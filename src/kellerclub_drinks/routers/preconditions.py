@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+from wsgiref.types import WSGIEnvironment
+
+
+@dataclass(frozen=True)
+class Preconditions:
+    """Conditional request headers sent by the client."""
+
+    if_none_match: Optional[str] = None
+    if_modified_since: Optional[str] = None
+
+    @staticmethod
+    def from_environ(environ: WSGIEnvironment) -> 'Preconditions':
+        """Reads the conditional request headers from the WSGI environment."""
+
+        return Preconditions(environ.get('HTTP_IF_NONE_MATCH', None),
+                             environ.get('HTTP_IF_MODIFIED_SINCE', None))
@@ -1,45 +1,68 @@
-"""Methods to deliver an HTTP request to the appropriate handler."""
+"""Methods to deliver an HTTP request to the appropriate handler.
+
+Routes are declared in a table of method, path pattern and handler factory
+that is compiled into a tree of path segments when this module is imported.
+A path segment written as {id} matches any number, which is passed on to the
+handler factory. Form parsers are built once as well.
+"""
 import json
+import os
 import re
+import uuid
+from dataclasses import KW_ONLY, dataclass, field
 from datetime import datetime
+from functools import cached_property
 from http.cookies import SimpleCookie
-from typing import Optional
+from typing import Any, Callable, Optional
 from urllib.parse import urlparse
 from wsgiref.types import WSGIEnvironment
 
 from .form_parser import FormParser, SingleValueParam, BooleanParam, CheckboxParam, Param
+from .preconditions import Preconditions
 from .request_source import RequestSource
 from kellerclub_drinks.handlers.orders.add import AddOrder
 from kellerclub_drinks.handlers.orders.clear import Clear
+from ..datastores.datastore import OrderBatch
 from ..handlers.drink_selector.settings import DrinkSelectorSettings
 from ..handlers.errors.error import ErrorHandler
 from ..handlers.add_drink import AddDrink
 from ..handlers.drink_list.drink_list import DrinkList
-from kellerclub_drinks.handlers.orders.submit import Submit
+from ..handlers.event_report.event_report import EventReport
+from ..handlers.event_report.event_totals import EventTotals
+from ..handlers.event_report.order_export import OrderExport
+from ..handlers.event_report.order_stream import OrderStream
+from kellerclub_drinks.handlers.orders.submit import Submit, SubmitBatches
 from ..handlers.drink_selector.drink_selector import DrinkSelector
 from ..handlers.common_handlers import StaticHandler, RedirectHandler
 from ..handlers.handler import Handler
+from ..handlers.import_menu import ImportMenu
+from ..handlers.metrics import MetricsHandler
 from ..handlers.start_event import StartEvent
 from ..handlers.stop_event import StopEvent
 from ..handlers.welcome_screen.welcome_screen import WelcomeScreen
 from ..model.drinks import Drink, PriceHistory
+from ..model.menus import Menu
+from ..static_files import STATIC_CONTENT_TYPES
 
 
 def route(environ: WSGIEnvironment) -> Handler:
     """Delivers an HTTP request to the appropriate handler."""
 
-    method: str = environ['REQUEST_METHOD']
+    method: str = environ['REQUEST_METHOD'].upper()
     path: str = environ['PATH_INFO']
-    referer: Optional[str] = environ.get('HTTP_REFERER', None)
-    query: Optional[str] = environ.get('QUERY_STRING', None)
-    content_type: Optional[str] = environ.get('CONTENT_TYPE', None)
-    content: bytes = _get_content(environ)
-    cookie = SimpleCookie(environ.get('HTTP_COOKIE', ''))
-
-    if method.lower() == 'get':
-        return _route_get(path, query, cookie)
-    elif method.lower() == 'post':
-        return _route_post(path, referer, content_type, content, cookie)
+    cookie_header: str = environ.get('HTTP_COOKIE', '')
+
+    if method == 'GET':
+        return _dispatch(method, _Request(path,
+                                          query=environ.get('QUERY_STRING', None),
+                                          cookie_header=cookie_header,
+                                          preconditions=Preconditions.from_environ(environ)))
+    elif method == 'POST':
+        return _dispatch(method, _Request(path,
+                                          referer=environ.get('HTTP_REFERER', None),
+                                          content_type=environ.get('CONTENT_TYPE', None),
+                                          content=_get_content(environ),
+                                          cookie_header=cookie_header))
     else:
         return ErrorHandler(400, 'Unsupported HTTP method!')
 
@@ -56,155 +79,296 @@ def _get_content(environ: WSGIEnvironment) -> bytes:
     return environ['wsgi.input'].read(content_length)
 
 
-def _route_get(path: str, query: Optional[str], cookie: SimpleCookie) -> Handler:
+@dataclass(frozen=True)
+class _Request:
+    """The parts of an HTTP request that handler factories may use.
+
+    The cookie header is only parsed if a handler factory asks for it.
+    """
+
+    path: str
+    _: KW_ONLY
+    query: Optional[str] = None
+    referer: Optional[str] = None
+    content_type: Optional[str] = None
+    content: bytes = b''
+    # the Cookie header, or the cookies if they have been parsed already
+    cookie_header: str | SimpleCookie = ''
+    preconditions: Preconditions = Preconditions()
+
+    @cached_property
+    def cookie(self) -> SimpleCookie:
+        if isinstance(self.cookie_header, SimpleCookie):
+            return self.cookie_header
+        return SimpleCookie(self.cookie_header)
+
+    def form(self, parser: FormParser) -> dict[str, Any]:
+        return parser.parse(self.content.decode(), content_type=self.content_type)
+
+
+# creates the handler for a request, given the numbers matched by {id}
+HandlerFactory = Callable[[_Request, list[int]], Handler]
+
+
+@dataclass
+class _Node:
+    """A path segment in the tree of compiled routes."""
+
+    children: dict[str, '_Node'] = field(default_factory=dict)
+    number: Optional['_Node'] = None
+    factory: Optional[HandlerFactory] = None
+
+
+def _compile(routes: list[tuple[str, str, HandlerFactory]]) -> dict[str, _Node]:
+    roots: dict[str, _Node] = {}
+    for method, pattern, factory in routes:
+        node = roots.setdefault(method, _Node())
+        for segment in pattern.strip('/').split('/'):
+            if not segment:
+                continue
+            if segment == '{id}':
+                node.number = node.number or _Node()
+                node = node.number
+            else:
+                node = node.children.setdefault(segment, _Node())
+        if node.factory is not None:
+            raise ValueError(f'Duplicate route {method} {pattern}!')
+        node.factory = factory
+    return roots
+
+
+def _dispatch(method: str, request: _Request) -> Handler:
     # catch the funky stuff
-    if not _valid_path(path):
-        print(f'Invalid path {path}!')
+    if not _VALID_PATH.match(request.path):
+        print(f'Invalid path {request.path}!')
         return ErrorHandler(400, "Invalid path!")
 
-    # paths without variables
-    stripped_path = path.rstrip('/')
-    if stripped_path == '':
-        return WelcomeScreen()
-    elif stripped_path == '/drinks':
-        return DrinkList(RequestSource.NAV)
+    node: Optional[_Node] = _ROUTES[method]
+    numbers: list[int] = []
+    for segment in request.path.strip('/').split('/'):
+        if node is None or not segment:
+            continue
+        if (child := node.children.get(segment)) is None and segment.isdigit():
+            child = node.number
+            numbers.append(int(segment))
+        node = child
+
+    if node is not None and node.factory is not None:
+        try:
+            return node.factory(request, numbers)
+        except ValueError as e:
+            return ErrorHandler(400, str(e))
+
+    if method == 'GET':
+        # paths to static files
+        extension = os.path.splitext(request.path)[1]
+        if (content_type := STATIC_CONTENT_TYPES.get(extension)) is not None:
+            return StaticHandler(request.path, content_type, request.preconditions)
 
-    # event-related URLs
-    if (parts := path.split('/'))[1] == 'event':
-        if len(parts) == 4 and parts[2].isdigit() and parts[3] == 'selector':
-            event_id = int(parts[2])
-            return _get_drink_selector(event_id, query, cookie)
+        return ErrorHandler(404, f"Unknown GET route {request.path}!")
+    return ErrorHandler(400, f"Unknown POST route {request.path}!")
 
-    # API paths without variables
-    if stripped_path == '/api/drinks':
-        return DrinkList(RequestSource.AJAX)
 
-    # paths to static files
-    if path.endswith('.css'):
-        return StaticHandler(path, 'text/css')
-    elif path.endswith('.js'):
-        return StaticHandler(path, 'text/javascript')
-    elif path.endswith('.woff2'):
-        return StaticHandler(path, 'font/woff2')
+def _route_get(path: str, query: Optional[str], cookie: SimpleCookie,
+               preconditions: Preconditions = Preconditions()) -> Handler:
+    return _dispatch('GET', _Request(path, query=query, cookie_header=cookie,
+                                     preconditions=preconditions))
 
-    # give up
-    return ErrorHandler(404, f"Unknown GET route {path}!")
 
+def _route_post(path: str, referer: Optional[str], content_type: Optional[str],
+                content: bytes, cookie: SimpleCookie) -> Handler:
+    return _dispatch('POST', _Request(path, referer=referer, content_type=content_type,
+                                      content=content, cookie_header=cookie))
 
-def _get_drink_selector(event_id: int, query: Optional[str],
-                        cookie: SimpleCookie) -> Handler:
 
-    try:
-        parser = FormParser(SingleValueParam('layout', default=['default']),
-                            BooleanParam('autosubmit', default=['true']))
-        params = parser.parse(query or '')
-        return DrinkSelector(datetime.fromtimestamp(event_id),
-                             params['layout'][0],
-                             params['autosubmit'][0],
-                             _get_orders(cookie, event_id))
-    except ValueError as e:
-        return ErrorHandler(400, str(e))
+_VALID_PATH = re.compile(r'^[a-zA-Z0-9/_]*(\.[a-z0-9]+)?$')
 
+_SELECTOR_PARSER = FormParser(SingleValueParam('layout', default=['default']),
+                              BooleanParam('autosubmit', default=['true']))
+_ADD_ORDER_PARSER = FormParser(SingleValueParam('order'),
+                               SingleValueParam('event'))
+_ORDERS_PARSER = FormParser(Param('order'),
+                            SingleValueParam('event'))
+_ADD_DRINK_PARSER = FormParser(SingleValueParam('drink'),
+                               SingleValueParam('display_name'))
+_SELECTOR_SETTINGS_PARSER = FormParser(CheckboxParam('autosubmit'))
+
+
+def _get_drink_selector(request: _Request, numbers: list[int]) -> Handler:
+    event_id, = numbers
+    params = _SELECTOR_PARSER.parse(request.query or '')
+    return DrinkSelector(datetime.fromtimestamp(event_id),
+                         params['layout'][0],
+                         params['autosubmit'][0],
+                         _get_orders(request.cookie, event_id),
+                         _get_order_batch(request.cookie, event_id))
 
-def _valid_layout(path: str) -> bool:
-    return bool(re.match(r'^[a-zA-Z_]+$', path))
+
+def _get_order_export(export_format: str) -> HandlerFactory:
+    return lambda request, numbers: OrderExport(datetime.fromtimestamp(numbers[0]),
+                                                export_format)
 
 
 def _get_orders(cookie: SimpleCookie, event_id: int) -> list[str]:
     if (morsel := cookie.get(f'event-{event_id}-orders')) is not None:
         return [value
-                for value in morsel.value.split(',')
+                for value in morsel.value.split('|')[0].split(',')
                 if Drink.valid_name(value)]
     else:
         return []
 
 
-def _route_post(path: str, referer: Optional[str], content_type: Optional[str],
-                content: bytes, cookie: SimpleCookie) -> Handler:
-    # catch the funky stuff
-    if not _valid_path(path):
-        print(f'Invalid path {path}!')
-        return ErrorHandler(400, "Invalid path!")
-
-    # constant paths
-    stripped_path = path.rstrip('/')
-    if stripped_path == '/orders/add':
-        try:
-            parser = FormParser(SingleValueParam('order'),
-                                SingleValueParam('event'))
-            parsed_query = parser.parse(content.decode(), content_type=content_type)
-            event_id = int(parsed_query['event'][0])
-            return AddOrder(parsed_query['order'][0],
-                            event_id,
-                            _get_orders(cookie, event_id),
-                            referer or '/')
-        except ValueError as e:
-            return ErrorHandler(400, str(e))
-    elif stripped_path == '/orders/clear':
-        parser = FormParser(Param('order'),
-                            SingleValueParam('event'))
-        parsed_query = parser.parse(content.decode(), content_type=content_type)
-        event_id = int(parsed_query['event'][0])
-        return Clear(event_id, referer or '/')
-    elif stripped_path == '/orders/submit':
+def _get_order_batch(cookie: SimpleCookie, event_id: int) -> Optional[str]:
+    if (morsel := cookie.get(f'event-{event_id}-orders')) is not None \
+            and '|' in morsel.value:
         try:
-            parser = FormParser(Param('order'),
-                                SingleValueParam('event'))
-            parsed_query = parser.parse(content.decode(), content_type=content_type)
-            if not parsed_query['order']:
-                return RedirectHandler(referer or '/')
-            else:
-                return Submit(parsed_query['order'],
-                              datetime.fromtimestamp(int(parsed_query['event'][0])),
-                              RequestSource.FORM, referer or '/')
-        except ValueError as e:
-            return ErrorHandler(400, str(e))
-    elif stripped_path == '/add_drink':
-        try:
-            parser = FormParser(SingleValueParam('drink'),
-                                SingleValueParam('display_name'))
-            parsed_query = parser.parse(content.decode(), content_type=content_type)
-            name = parsed_query['drink'][0]
-            display_name = parsed_query['display_name'][0]
-            return AddDrink(Drink(name, display_name, {'default': PriceHistory(1, {})}))
-        except ValueError as e:
-            return ErrorHandler(400, str(e))
-    elif stripped_path == '/start_event':
-        return StartEvent()
-    elif stripped_path == '/stop_event':
-        return StopEvent()
-    elif stripped_path == '/settings/drink_selector':
-        parser = FormParser(CheckboxParam('autosubmit'))
-        parsed_query = parser.parse(content.decode(), content_type=content_type)
-        referer_url = urlparse(referer)
-        return DrinkSelectorSettings(parsed_query['autosubmit'][0], referer_url)
-
-    # constant API paths
-    if stripped_path == '/api/orders/submit':
-        try:
-            parsed_json = json.loads(content.decode())
-            if 'orders' not in parsed_json:
-                return ErrorHandler(400, "Key 'orders' not present!")
-            elif not isinstance(parsed_json['orders'], list):
-                return ErrorHandler(400, "'orders' is not a string!")
-            elif any(not isinstance(item, str) for item in parsed_json['orders']):
-                msg = f"{parsed_json['orders']} contains an item that is not a string!"
-                return ErrorHandler(400, msg)
-            else:
-                if 'event' not in parsed_json:
-                    return ErrorHandler(400, "Key 'event' not present!")
-                elif not isinstance(parsed_json['event'], int):
-                    return ErrorHandler(400, "'event' is not a number!")
-                else:
-                    return Submit(parsed_json['orders'],
-                                  datetime.fromtimestamp(parsed_json['event']),
-                                  RequestSource.AJAX, referer or '/')
+            return _batch_id(morsel.value.split('|')[1])
         except ValueError:
-            return ErrorHandler(400, f"Malformed JSON {content.decode()}!")
+            return None
+    else:
+        return None
+
+
+def _batch_id(value: Optional[str]) -> Optional[str]:
+    """Normalizes a client-generated batch id, which must be a UUID."""
+
+    return str(uuid.UUID(value)) if value is not None else None
+
+
+def _add_order(request: _Request, _: list[int]) -> Handler:
+    parsed_query = request.form(_ADD_ORDER_PARSER)
+    event_id = int(parsed_query['event'][0])
+    return AddOrder(parsed_query['order'][0],
+                    event_id,
+                    _get_orders(request.cookie, event_id),
+                    request.referer or '/')
+
+
+def _clear_orders(request: _Request, _: list[int]) -> Handler:
+    parsed_query = request.form(_ORDERS_PARSER)
+    event_id = int(parsed_query['event'][0])
+    return Clear(event_id, request.referer or '/')
+
+
+def _submit_orders(request: _Request, _: list[int]) -> Handler:
+    parsed_query = request.form(_ORDERS_PARSER)
+    if not parsed_query['order']:
+        return RedirectHandler(request.referer or '/')
+    else:
+        event_id = int(parsed_query['event'][0])
+        # the batch of the cookie only identifies exactly the orders in it
+        batch_id = _get_order_batch(request.cookie, event_id) \
+            if parsed_query['order'] == _get_orders(request.cookie, event_id) else None
+        return Submit(parsed_query['order'],
+                      datetime.fromtimestamp(event_id),
+                      RequestSource.FORM, request.referer or '/', batch_id)
+
+
+def _add_drink(request: _Request, _: list[int]) -> Handler:
+    parsed_query = request.form(_ADD_DRINK_PARSER)
+    name = parsed_query['drink'][0]
+    display_name = parsed_query['display_name'][0]
+    return AddDrink(Drink(name, display_name, {'default': PriceHistory(1, {})}))
+
+
+def _drink_selector_settings(request: _Request, _: list[int]) -> Handler:
+    parsed_query = request.form(_SELECTOR_SETTINGS_PARSER)
+    referer_url = urlparse(request.referer)
+    return DrinkSelectorSettings(parsed_query['autosubmit'][0], referer_url)
+
+
+def _submit_orders_api(request: _Request, _: list[int]) -> Handler:
+    try:
+        parsed_json = json.loads(request.content.decode())
+    except ValueError:
+        return ErrorHandler(400, f"Malformed JSON {request.content.decode()}!")
+
+    if 'batches' in parsed_json:
+        return _submit_batches_api(parsed_json['batches'])
+    elif 'orders' not in parsed_json:
+        return ErrorHandler(400, "Key 'orders' not present!")
+    elif not isinstance(parsed_json['orders'], list):
+        return ErrorHandler(400, "'orders' is not a string!")
+    elif any(not isinstance(item, str) for item in parsed_json['orders']):
+        msg = f"{parsed_json['orders']} contains an item that is not a string!"
+        return ErrorHandler(400, msg)
+    elif 'event' not in parsed_json:
+        return ErrorHandler(400, "Key 'event' not present!")
+    elif not isinstance(parsed_json['event'], int):
+        return ErrorHandler(400, "'event' is not a number!")
+    elif not isinstance(parsed_json.get('batch', ''), str):
+        return ErrorHandler(400, "'batch' is not a string!")
+    else:
+        return Submit(parsed_json['orders'],
+                      datetime.fromtimestamp(parsed_json['event']),
+                      RequestSource.AJAX, request.referer or '/',
+                      _batch_id(parsed_json.get('batch')))
+
+
+def _submit_batches_api(entries: Any) -> Handler:
+    if not isinstance(entries, list) or not entries:
+        return ErrorHandler(400, "'batches' is not a non-empty list!")
+    return SubmitBatches([_order_batch(entry) for entry in entries])
+
+
+def _order_batch(entry: Any) -> OrderBatch:
+    if not isinstance(entry, dict):
+        raise ValueError(f"Batch {entry} is not an object!")
+    orders, event, batch = entry.get('orders'), entry.get('event'), entry.get('batch')
+    if not isinstance(orders, list) or not orders \
+            or any(not isinstance(item, str) for item in orders):
+        raise ValueError(f"Batch {entry} needs a non-empty list of orders!")
+    if not isinstance(event, int):
+        raise ValueError(f"Batch {entry} has no event number!")
+    if batch is not None and not isinstance(batch, str):
+        raise ValueError(f"Batch {entry} has a batch id that is not a string!")
+    return datetime.fromtimestamp(event), orders, _batch_id(batch)
+
+
+def _import_menu(request: _Request, _: list[int]) -> Handler:
+    content = request.content.decode()
+    match (request.content_type or '').split(';')[0].strip():
+        case 'application/json':
+            return ImportMenu(Menu.from_json(content))
+        case 'text/csv':
+            return ImportMenu(Menu.from_csv(content))
+        case _:
+            raise ValueError('Menus can only be imported as JSON or CSV!')
+
+
+_ROUTES = _compile([
+    # pages
+    ('GET', '/', lambda request, _: WelcomeScreen()),
+    ('GET', '/drinks', lambda request, _: DrinkList(RequestSource.NAV)),
+    ('GET', '/event/{id}/selector', _get_drink_selector),
+    ('GET', '/event/{id}/report',
+     lambda request, numbers: EventReport(datetime.fromtimestamp(numbers[0]),
+                                          RequestSource.NAV)),
+    ('GET', '/event/{id}/orders.csv', _get_order_export('csv')),
+    ('GET', '/event/{id}/orders.jsonl', _get_order_export('jsonl')),
 
-    # give up
-    return ErrorHandler(400, f"Unknown POST route {path}!")
+    # API
+    ('GET', '/api/drinks',
+     lambda request, _: DrinkList(RequestSource.AJAX, request.preconditions)),
+    ('GET', '/api/event/{id}/report',
+     lambda request, numbers: EventReport(datetime.fromtimestamp(numbers[0]),
+                                          RequestSource.AJAX)),
+    ('GET', '/api/event/{id}/totals',
+     lambda request, numbers: EventTotals(datetime.fromtimestamp(numbers[0]))),
+    ('GET', '/api/event/{id}/stream',
+     lambda request, numbers: OrderStream(datetime.fromtimestamp(numbers[0]))),
+    ('GET', '/metrics', lambda request, _: MetricsHandler()),
 
+    # forms
+    ('POST', '/orders/add', _add_order),
+    ('POST', '/orders/clear', _clear_orders),
+    ('POST', '/orders/submit', _submit_orders),
+    ('POST', '/add_drink', _add_drink),
+    ('POST', '/start_event', lambda request, _: StartEvent()),
+    ('POST', '/stop_event', lambda request, _: StopEvent()),
+    ('POST', '/settings/drink_selector', _drink_selector_settings),
 
-def _valid_path(path: str) -> bool:
-    return bool(re.match(r'^[a-zA-Z0-9/_]*(\.[a-z0-9]+)?$', path))
+    # API
+    ('POST', '/api/orders/submit', _submit_orders_api),
+    ('POST', '/api/menu/import', _import_menu),
+])
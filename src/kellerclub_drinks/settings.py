@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
 
 @dataclass(frozen=True)
@@ -11,6 +11,11 @@ class Settings:
 
     data_store_settings: dict[str, Any]
     cache_age: int
+    development: bool = False
+    template_cache: Optional[str] = None
+    metrics: bool = False
+    asgi_workers: int = 8
+    order_poll_interval: Optional[float] = None
 
     @staticmethod
     def get_settings() -> Settings:
@@ -43,4 +48,14 @@ class Settings:
         else:
             cache_age = 60 * 60 * 24  # one day
 
-        return Settings(data_store_settings, cache_age)
+        development = bool(settings_json.get('development', False))
+        template_cache = settings_json.get('templateCache', None)
+        metrics = bool(settings_json.get('metrics', False))
+        asgi_workers = max(int(settings_json.get('asgiWorkers', 8)), 1)
+        # only needed if several processes serve the application
+        order_poll_interval = None
+        if (poll_ms := settings_json.get('orderPollInterval')) is not None:
+            order_poll_interval = max(poll_ms, 100) / 1000
+
+        return Settings(data_store_settings, cache_age, development, template_cache, metrics,
+                        asgi_workers, order_poll_interval)
@@ -0,0 +1,129 @@
+"""In-memory cache of the static files served by the application."""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from . import compression
+from .response_creators import content_etag, etag_matches
+
+# content types of the static files by file extension
+STATIC_CONTENT_TYPES = {
+    '.css': 'text/css',
+    '.js': 'text/javascript',
+    '.woff2': 'font/woff2'
+}
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    """Content of a static file along with its validators and compressed
+    variants by content coding.
+    """
+
+    content: bytes
+    etag: str
+    last_modified: datetime
+    mtime_ns: int
+    variants: dict[str, bytes]
+
+    @property
+    def http_last_modified(self) -> str:
+        """Modification time formatted for the Last-Modified header."""
+
+        return format_datetime(self.last_modified, usegmt=True)
+
+    def matches(self, if_none_match: Optional[str],
+                if_modified_since: Optional[str]) -> bool:
+        """Whether a client with the given validators already has this file.
+
+        As required by RFC 9110, If-Modified-Since is ignored if
+        If-None-Match is present.
+        """
+
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag, self.variants)
+
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                return False
+            return self.last_modified <= since
+
+        return False
+
+
+class StaticFileCache:
+    """Loads static files from disk once and keeps them in memory.
+
+    If reload is set, the modification time of a file is checked on every
+    access and the file is loaded again if it changed, so that edits show up
+    during development without restarting the server.
+    """
+
+    def __init__(self, root: Path, reload: bool = False):
+        self.root = root
+        self.reload = reload
+        self._files: dict[str, StaticFile] = {}
+        self._lock = Lock()
+
+    def get(self, path: str) -> StaticFile:
+        """Returns the static file at the given path relative to the root.
+
+        Raises OSError if the file cannot be read.
+        """
+
+        cached = self._files.get(path)
+        if cached is not None and not self.reload:
+            return cached
+
+        file_path = self.root / path.removeprefix('/')
+        if cached is not None and os.stat(file_path).st_mtime_ns == cached.mtime_ns:
+            return cached
+
+        with self._lock:
+            loaded = _load(file_path)
+            self._files[path] = loaded
+            return loaded
+
+    def preload(self) -> None:
+        """Loads all static files below the root, so that they are compressed
+        before the first request rather than by it.
+        """
+
+        for file_path in sorted(self.root.rglob('*')):
+            if file_path.suffix in STATIC_CONTENT_TYPES and file_path.is_file():
+                path = '/' + file_path.relative_to(self.root).as_posix()
+                with self._lock:
+                    self._files[path] = _load(file_path)
+
+
+def _load(file_path: Path) -> StaticFile:
+    with open(file_path, 'rb') as file:
+        mtime_ns = os.fstat(file.fileno()).st_mtime_ns
+        content = file.read()
+
+    etag = content_etag(content)
+    # HTTP dates only have a resolution of seconds
+    last_modified = datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc)
+    return StaticFile(content, etag, last_modified, mtime_ns, _compressed_variants(content))
+
+
+def _compressed_variants(content: bytes) -> dict[str, bytes]:
+    if len(content) < compression.MIN_SIZE:
+        return {}
+
+    variants = {}
+    for encoding in compression.ENCODINGS:
+        compressed = compression.compress(content, encoding, compression.STATIC_QUALITY)
+        # skip formats that are compressed already, e.g. woff2
+        if len(compressed) < 0.9 * len(content):
+            variants[encoding] = compressed
+    return variants
@@ -2,13 +2,25 @@ from typing import Any
 
 from jinja2 import TemplateError, Environment
 
+from .metrics import phase
+
 
 def render_template(env: Environment, path: str, url: str,
                     **values: Any) -> str:
     template = None
     try:
-        template = env.get_template(path)
-        return template.render(url=url, **values)
+        with phase('template'):
+            template = env.get_template(path)
+            return template.render(url=url, **values)
     except TemplateError as e:
         print(f'Template {template.filename if template else "<Pre-Template>"}')
         raise TemplateError(e.message) from e
+
+
+def precompile_templates(env: Environment) -> None:
+    """Loads all templates of the environment, so that the first request for
+    a page does not have to wait for its template to be compiled.
+    """
+
+    for path in env.list_templates(extensions=['jinja2']):
+        env.get_template(path)
@@ -0,0 +1,149 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sqlite3
+import unittest
+from datetime import datetime
+from typing import Optional
+
+from kellerclub_drinks.datastores.caching_store import CachingStore
+from kellerclub_drinks.datastores.datastore import Topic
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+from kellerclub_drinks.model.drinks import Drink, PriceHistory
+from kellerclub_drinks.model.events import Event
+
+
+class CountingStore(SqliteStore):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.drink_loads = 0
+        self.event_loads = 0
+        self.revision_reads = 0
+
+    def all_drinks(self) -> dict[str, Drink]:
+        self.drink_loads += 1
+        return super().all_drinks()
+
+    def current_event(self) -> Optional[Event]:
+        self.event_loads += 1
+        return super().current_event()
+
+    def revision(self, topic: Topic) -> int:
+        self.revision_reads += 1
+        return super().revision(topic)
+
+
+def _drink(name: str) -> Drink:
+    return Drink(name, name, {'default': PriceHistory(1, {})})
+
+
+class TestCachingStore(unittest.TestCase):
+    def setUp(self) -> None:
+        # the in-memory database lives as long as this connection
+        self.path = f'file:{self._testMethodName}?mode=memory&cache=shared'
+        self.db = sqlite3.connect(self.path, uri=True)
+        with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+            self.db.executescript(sql_file.read())
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_all_drinks__called_twice__loads_once(self) -> None:
+        inner = CountingStore(self.path)
+        store = CachingStore(inner)
+
+        store.all_drinks()
+        store.all_drinks()
+
+        self.assertEqual(1, inner.drink_loads)
+
+    def test_revision__drink_added__changes_without_reading_inner_revision(self) -> None:
+        inner = CountingStore(self.path)
+        store = CachingStore(inner)
+        store.all_drinks()
+        before = store.revision('drinks')
+
+        store.add_drink(_drink('tap_beer'))
+        store.all_drinks()
+
+        self.assertNotEqual(before, store.revision('drinks'))
+        self.assertEqual(0, inner.revision_reads)
+
+    def test_add_drink__invalidates_drinks(self) -> None:
+        store = CachingStore(CountingStore(self.path))
+        store.all_drinks()
+
+        store.add_drink(_drink('tap_beer'))
+
+        self.assertIn('tap_beer', store.all_drinks())
+
+    def test_all_drinks__changed_elsewhere_without_revalidate__returns_cached(self) -> None:
+        store = CachingStore(CountingStore(self.path))
+        store.all_drinks()
+
+        SqliteStore(self.path).add_drink(_drink('tap_beer'))
+
+        self.assertNotIn('tap_beer', store.all_drinks())
+
+    def test_all_drinks__changed_elsewhere_with_revalidate__reloads(self) -> None:
+        inner = CountingStore(self.path)
+        store = CachingStore(inner, revalidate=True)
+        store.all_drinks()
+
+        SqliteStore(self.path).add_drink(_drink('tap_beer'))
+
+        self.assertIn('tap_beer', store.all_drinks())
+        store.all_drinks()
+        self.assertEqual(2, inner.drink_loads)
+
+    def test_layout__layout_added_elsewhere_with_revalidate__reloads(self) -> None:
+        store = CachingStore(CountingStore(self.path), revalidate=True)
+        store.add_drink(_drink('tap_beer'))
+        self.assertIsNone(store.layout('default'))
+
+        self.db.execute("INSERT INTO SelectorLayout(name) VALUES ('default')")
+        button_id, = self.db.execute("INSERT INTO SelectorButton(layout_name, xpos, ypos) "
+                                     "VALUES ('default', 0, 0) RETURNING id").fetchone()
+        self.db.execute("INSERT INTO OrderButton(button_id, drink_name) VALUES (?, 'tap_beer')",
+                        (button_id,))
+        self.db.commit()
+
+        self.assertIsNotNone(store.layout('default'))
+
+    def test_current_event__no_event__loads_once(self) -> None:
+        inner = CountingStore(self.path)
+        store = CachingStore(inner)
+
+        self.assertIsNone(store.current_event())
+        self.assertIsNone(store.current_event())
+        self.assertEqual(1, inner.event_loads)
+
+    def test_start_event__invalidates_current_event(self) -> None:
+        store = CachingStore(CountingStore(self.path))
+        store.current_event()
+
+        store.start_event(datetime.fromtimestamp(1000), 'Party')
+
+        self.assertEqual(Event('Party', datetime.fromtimestamp(1000), None),
+                         store.current_event())
+
+    def test_stop_current_event__invalidates_current_event(self) -> None:
+        store = CachingStore(CountingStore(self.path))
+        store.start_event(datetime.fromtimestamp(1000))
+        store.current_event()
+
+        self.assertTrue(store.stop_current_event(datetime.fromtimestamp(2000)))
+
+        self.assertIsNone(store.current_event())
+        self.assertFalse(store.stop_current_event())
+
+    def test_current_event__started_elsewhere_with_revalidate__reloads(self) -> None:
+        inner = CountingStore(self.path)
+        store = CachingStore(inner, revalidate=True)
+        store.current_event()
+
+        SqliteStore(self.path).start_event(datetime.fromtimestamp(1000))
+
+        self.assertIsNotNone(store.current_event())
+        store.current_event()
+        self.assertEqual(2, inner.event_loads)
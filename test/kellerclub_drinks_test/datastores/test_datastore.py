@@ -2,7 +2,10 @@
 # pylint: disable=missing-function-docstring
 
 import unittest
+from datetime import datetime
 
+from kellerclub_drinks.datastores.caching_store import CachingStore
+from kellerclub_drinks.datastores.datastore import OrderBatch, fresh_batches, split_ids
 from kellerclub_drinks.datastores.datastore_factory import from_settings
 from kellerclub_drinks.datastores.sqlite_store import SqliteStore
 
@@ -15,3 +18,28 @@ class TestDatastore(unittest.TestCase):
         }
 
         self.assertIsInstance(from_settings(settings), SqliteStore)
+
+    def test_from_settings__cache_set__returns_caching_store(self) -> None:
+        settings = {
+            'type': 'sqlite',
+            'path': 'db.sqlite',
+            'cache': {'revalidate': True}
+        }
+
+        self.assertIsInstance(from_settings(settings), CachingStore)
+
+    def test_fresh_batches__repeated_batch_ids__only_first_claimed_fresh(self) -> None:
+        event = datetime.fromtimestamp(3600)
+        batches: list[OrderBatch] = [(event, ['beer'], None), (event, ['beer'], 'a'),
+                                     (event, ['beer'], 'a'), (event, ['beer'], 'b')]
+
+        self.assertEqual([True, True, False, False], fresh_batches(batches, {'a'}))
+
+    def test_split_ids__repeated_batch__uses_stored_ids(self) -> None:
+        event = datetime.fromtimestamp(3600)
+        batches: list[OrderBatch] = [(event, ['beer', 'cola'], 'a'), (event, ['beer'], 'b'),
+                                     (event, ['cola'], None)]
+
+        result = split_ids([5, 6, 7], batches, [True, False, True], {'b': [1]})
+
+        self.assertEqual([[5, 6], [1], [7]], result)
@@ -0,0 +1,139 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from kellerclub_drinks.datastores.migrations import (Migration, load_migrations,
+                                                     migrate_sqlite, split_statements)
+
+
+def _schema(conn: sqlite3.Connection) -> set[tuple[str, str]]:
+    return set(conn.execute("SELECT type, name FROM sqlite_master").fetchall())
+
+
+class TestLoadMigrations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, filename: str, sql: str = '') -> None:
+        with open(os.path.join(self.directory.name, filename), 'w', encoding='utf8') as file:
+            file.write(sql)
+
+    def test_load_migrations__unordered_files__ordered_by_version(self) -> None:
+        self._write('0002_second.sql', 'SELECT 2;')
+        self._write('0001_first.sql', 'SELECT 1;')
+        self._write('README.md')
+
+        migrations = load_migrations(self.directory.name)
+
+        self.assertEqual([Migration(1, 'first', 'SELECT 1;'),
+                          Migration(2, 'second', 'SELECT 2;')], migrations)
+
+    def test_load_migrations__gap__raises(self) -> None:
+        self._write('0001_first.sql')
+        self._write('0003_third.sql')
+
+        with self.assertRaises(ValueError):
+            load_migrations(self.directory.name)
+
+    def test_load_migrations__duplicate_version__raises(self) -> None:
+        self._write('0001_first.sql')
+        self._write('0001_other.sql')
+
+        with self.assertRaises(ValueError):
+            load_migrations(self.directory.name)
+
+
+class TestSplitStatements(unittest.TestCase):
+    def test_split_statements__trigger_and_comments__one_entry_per_statement(self) -> None:
+        sql = ("-- a comment\n"
+               "CREATE TABLE A (x INTEGER);\n\n"
+               "CREATE TRIGGER T AFTER INSERT ON A FOR EACH ROW\n"
+               "    UPDATE A SET x = 1 WHERE x = ';';\n"
+               "-- trailing comment\n")
+
+        statements = split_statements(sql)
+
+        self.assertEqual(["CREATE TABLE A (x INTEGER)",
+                          "CREATE TRIGGER T AFTER INSERT ON A FOR EACH ROW\n"
+                          "    UPDATE A SET x = 1 WHERE x = ';'"], statements)
+
+    def test_split_statements__mysql_migrations__no_empty_statements(self) -> None:
+        for migration in load_migrations('scripts/migrations/mysql'):
+            for statement in split_statements(migration.sql):
+                self.assertRegex(statement, r'^(CREATE|INSERT|ALTER) ')
+
+
+class TestMigrateSqlite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = sqlite3.connect(':memory:')
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_migrate_sqlite__pending__applies_in_order_and_records_version(self) -> None:
+        migrations = [Migration(1, 'create', 'CREATE TABLE A (x INTEGER);'),
+                      Migration(2, 'fill', 'INSERT INTO A VALUES (1);')]
+
+        applied = migrate_sqlite(self.conn, migrations, log=lambda _: None)
+
+        self.assertEqual([1, 2], applied)
+        self.assertEqual((2,), self.conn.execute('PRAGMA user_version').fetchone())
+        self.assertEqual([(1,)], self.conn.execute('SELECT x FROM A').fetchall())
+
+    def test_migrate_sqlite__already_applied__skipped(self) -> None:
+        migrations = [Migration(1, 'create', 'CREATE TABLE A (x INTEGER);')]
+        migrate_sqlite(self.conn, migrations, log=lambda _: None)
+
+        applied = migrate_sqlite(self.conn, migrations, log=lambda _: None)
+
+        self.assertEqual([], applied)
+
+    def test_migrate_sqlite__failing_migration__rolled_back(self) -> None:
+        migrations = [Migration(1, 'create', 'CREATE TABLE A (x INTEGER);'),
+                      Migration(2, 'broken', 'CREATE TABLE B (x INTEGER);\nINSERT INTO C VALUES (1);')]
+
+        with self.assertRaises(sqlite3.Error):
+            migrate_sqlite(self.conn, migrations, log=lambda _: None)
+
+        self.assertEqual((1,), self.conn.execute('PRAGMA user_version').fetchone())
+        self.assertNotIn(('table', 'B'), _schema(self.conn))
+
+    def test_migrate_sqlite__init_script__already_latest(self) -> None:
+        with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+            self.conn.executescript(sql_file.read())
+
+        applied = migrate_sqlite(self.conn, load_migrations('scripts/migrations/sqlite'),
+                                 log=lambda _: None)
+
+        self.assertEqual([], applied)
+
+    def test_migrate_sqlite__original_schema__matches_init_script(self) -> None:
+        with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+            init_script = sql_file.read()
+        # the schema before the first migration
+        self.conn.executescript(init_script[:init_script.index('-- running totals')])
+        self.conn.executescript("""
+INSERT INTO Drink(name, display_name, base_price) VALUES ('beer', 'Beer', 100);
+INSERT INTO Prices(drink, end_time, price) VALUES ('beer', 20, 150);
+INSERT INTO Event(start_time) VALUES (1);
+INSERT INTO PurchaseOrder(time, drink_name, event) VALUES (10, 'beer', 1), (30, 'beer', 1);
+""")
+
+        migrate_sqlite(self.conn, load_migrations('scripts/migrations/sqlite'),
+                       log=lambda _: None)
+
+        fresh = sqlite3.connect(':memory:')
+        fresh.executescript(init_script)
+        self.assertEqual(_schema(fresh), _schema(self.conn))
+        self.assertEqual(fresh.execute('PRAGMA user_version').fetchone(),
+                         self.conn.execute('PRAGMA user_version').fetchone())
+        fresh.close()
+        self.assertEqual([(1, 'beer', 2, 250)],
+                         self.conn.execute('SELECT * FROM EventTotal').fetchall())
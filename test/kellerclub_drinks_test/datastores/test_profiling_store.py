@@ -0,0 +1,72 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from kellerclub_drinks.datastores.profiling_store import ProfilingStore, record_statement
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+from kellerclub_drinks.model.drinks import Drink, PriceHistory
+
+
+class TestProfilingStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.url = f'file:{self._testMethodName}?mode=memory&cache=shared'
+        self.keep_alive = sqlite3.connect(self.url, uri=True)
+        with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+            self.keep_alive.executescript(sql_file.read())
+        self.logged: list[str] = []
+
+    def tearDown(self) -> None:
+        self.keep_alive.close()
+
+    def _store(self, slow_threshold: float) -> ProfilingStore:
+        return ProfilingStore(SqliteStore(self.url, trace=record_statement),
+                              slow_threshold, log=self.logged.append)
+
+    def test_stats__calls__counts_calls_and_rows(self) -> None:
+        store = self._store(60)
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        store.all_drinks()
+        store.all_drinks()
+
+        stats = store.stats()['methods']
+
+        self.assertEqual(2, stats['all_drinks']['calls'])
+        self.assertEqual(2, stats['all_drinks']['rows'])
+        self.assertEqual(1, stats['add_drink']['calls'])
+        self.assertEqual([], self.logged)
+
+    def test_call__slow__logs_statements_with_query_plan(self) -> None:
+        store = self._store(0)
+
+        store.layout('default')
+
+        slow_call = store.stats()['slowCalls'][0]
+        query = next(statement for statement in slow_call['statements']
+                     if "'default'" in statement['statement'])
+        self.assertEqual('layout', slow_call['method'])
+        self.assertTrue(query['plan'])
+        self.assertIn('Slow datastore call layout', self.logged[0])
+
+    def test_call__raises__counts_error(self) -> None:
+        store = self._store(60)
+        store.start_event()
+
+        self.assertRaises(ValueError, store.start_event)
+
+        self.assertEqual(1, store.stats()['methods']['start_event']['errors'])
+
+    def test_close__dump_path__writes_json(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            store = ProfilingStore(SqliteStore(self.url), dump_path=path)
+            store.current_event()
+
+            store.close()
+
+            with open(path, 'r', encoding='utf8') as file:
+                self.assertEqual(1, json.load(file)['methods']['current_event']['calls'])
@@ -0,0 +1,65 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+from datetime import datetime
+from typing import Generator, Optional
+
+from kellerclub_drinks.datastores.datastore import OrderBatch
+from kellerclub_drinks.datastores.delegating_store import DelegatingStore
+from kellerclub_drinks.datastores.publishing_store import PublishingStore
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+from kellerclub_drinks.live_orders import OrderBus
+from kellerclub_drinks.model.orders import Order
+
+EVENT = datetime.fromtimestamp(3600)
+
+
+class StoredOrders(DelegatingStore):
+    """Stores orders in memory, with times set by the store."""
+
+    def __init__(self) -> None:
+        super().__init__(SqliteStore(':memory:', 0))
+        self.stored: list[Order] = [Order(1, datetime.fromtimestamp(3700), 'cola')]
+        self.reads = 0
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        return self.submit_orders([(event_id, drinks, batch_id)])[0]
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        result = []
+        for _, drinks, _ in batches:
+            ids = []
+            for drink in drinks:
+                order_id = len(self.stored) + 1
+                self.stored.append(Order(order_id, datetime.fromtimestamp(4000 + order_id), drink))
+                ids.append(order_id)
+            result.append(ids)
+        return result
+
+    def orders(self, event_id: datetime, after: int = 0) -> Generator[Order, None, None]:
+        self.reads += 1
+        yield from (order for order in self.stored if order.id > after)
+
+
+class TestPublishingStore(unittest.TestCase):
+    def test_submit_orders__subscribed__publishes_stored_orders(self) -> None:
+        inner = StoredOrders()
+        bus = OrderBus()
+        subscription = bus.subscribe(3600)
+        store = PublishingStore(inner, bus)
+
+        store.submit_orders([(EVENT, ['beer'], None), (EVENT, ['wine', 'beer'], None)])
+
+        orders, _ = subscription.take(0)
+        self.assertEqual(inner.stored[1:], orders)
+        self.assertEqual(1, inner.reads)
+
+    def test_submit_order__not_subscribed__not_read_back(self) -> None:
+        inner = StoredOrders()
+        store = PublishingStore(inner, OrderBus())
+
+        store.submit_order(EVENT, ['beer'])
+
+        self.assertEqual(0, inner.reads)
@@ -0,0 +1,65 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sqlite3
+import unittest
+
+from kellerclub_drinks.datastores.sqlite_pool import SqlitePool
+
+
+class TestSqlitePool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.setup_calls = 0
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        self.setup_calls += 1
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+    def test_connection__returned_connection__is_reused(self) -> None:
+        pool = SqlitePool(':memory:', 1, self._setup)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(1, self.setup_calls)
+
+    def test_connection__new_connection__setup_applied(self) -> None:
+        pool = SqlitePool(':memory:', 1, self._setup)
+
+        with pool.connection() as conn:
+            self.assertEqual(1, conn.execute("PRAGMA foreign_keys").fetchone()[0])
+
+    def test_connection__pool_exhausted__opens_additional_connection(self) -> None:
+        pool = SqlitePool(':memory:', 1, self._setup)
+
+        with pool.connection() as first, pool.connection() as second:
+            self.assertIsNot(first, second)
+
+        self.assertEqual(2, self.setup_calls)
+
+    def test_connection__size_zero__does_not_reuse_connections(self) -> None:
+        pool = SqlitePool(':memory:', 0, self._setup)
+
+        with pool.connection():
+            pass
+        with pool.connection():
+            pass
+
+        self.assertEqual(2, self.setup_calls)
+
+    def test_connection__block_raises__rolls_back(self) -> None:
+        pool = SqlitePool('file:pool.db?mode=memory&cache=shared', 1, self._setup)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE Test (value INTEGER)")
+
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO Test VALUES (1)")
+                raise ValueError
+
+        with pool.connection() as conn:
+            self.assertEqual(0, conn.execute("SELECT count(*) FROM Test").fetchone()[0])
+        pool.close()
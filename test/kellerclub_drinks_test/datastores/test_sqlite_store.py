@@ -1,19 +1,27 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+import os
 import sqlite3
+import tempfile
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
+from kellerclub_drinks.datastores.sqlite_profile import SqliteProfile
 from kellerclub_drinks.datastores.sqlite_store import SqliteStore
 from kellerclub_drinks.model.drinks import Drink, PriceHistory
+from kellerclub_drinks.model.events import Event
 from kellerclub_drinks.model.layouts import OrderButton
+from kellerclub_drinks.model.menus import Menu, MenuButton
 
 
 class TestSqliteStore(unittest.TestCase):
     def setUp(self) -> None:
+        # the in-memory database only lives as long as a connection to it
+        self.keep_alive = sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True)
         with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
             with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
                 sql = sql_file.read()
@@ -27,11 +35,23 @@ class TestSqliteStore(unittest.TestCase):
             db.commit()
             db.execute("VACUUM")
             db.execute("PRAGMA integrity_check")
+        self.keep_alive.close()
 
     def test_get_all_drinks__no_drinks__returns_empty_map(self) -> None:
         store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
         self.assertEqual(0, len(store.all_drinks()))
 
+    def test_get_all_drinks__price_changes__loads_price_history(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            db.execute("INSERT INTO Prices(drink, end_time, price) VALUES ('tap_beer', 10000, 2)")
+
+        history = store.all_drinks()['tap_beer'].prices['default']
+
+        self.assertEqual(1, history.price_at(datetime.fromtimestamp(9999)))
+        self.assertEqual(2, history.current)
+
     def test_submit_order__no_timestamp__uses_current_timestamp(self) -> None:
         drink_name = 'tap_beer'
         display_name = 'Tap Beer .4l'
@@ -79,6 +99,143 @@ class TestSqliteStore(unittest.TestCase):
 
         self.assertEqual(display_name, layouts[layout_name].buttons[0][0].display_name)
 
+    def test_get_layout__two_layouts__returns_only_requested_layout(self) -> None:
+        drink_name = 'tap_beer'
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink(drink_name, 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            self._add_layout(db, 'first')
+            self._submit_order_button(db, 'first', 0, 0, drink_name)
+            self._add_layout(db, 'second')
+            self._submit_order_button(db, 'second', 1, 1, drink_name)
+
+        layout = store.layout('second')
+
+        self.assertIsNotNone(layout)
+        self.assertEqual('second', layout.id)
+        self.assertIsNone(layout.buttons[0][0])
+
+    def test_get_layout__unknown_layout__returns_none(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        self.assertIsNone(store.layout('unknown'))
+
+    def test_sales_report__price_change__charges_price_at_order_time(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        store.start_event(datetime.fromtimestamp(3600))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            db.execute("INSERT INTO Prices(drink, end_time, price) VALUES ('tap_beer', 7200, 5)")
+            for order_time in (3600, 5000, 7200, 7300):
+                db.execute("INSERT INTO PurchaseOrder(time, drink_name, event) "
+                           "VALUES (?, 'tap_beer', 3600)", (order_time,))
+
+        report = store.sales_report(datetime.fromtimestamp(3600))
+
+        self.assertEqual(4, report.drinks[0].count)
+        self.assertEqual(1 + 1 + 5 + 5, report.revenue)
+        self.assertEqual([2, 2], [hour.count for hour in report.hours])
+        self.assertEqual(datetime.fromtimestamp(7200), report.hours[1].hour)
+
+    def test_event_totals__orders_inserted__counts_per_drink(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        store.add_drink(Drink('cola', 'Cola', {'default': PriceHistory(1, {})}))
+        store.start_event(datetime.fromtimestamp(3600))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            db.execute("UPDATE Drink SET base_price = 3 WHERE name = 'cola'")
+            for drink_name in ('tap_beer', 'cola', 'cola'):
+                db.execute("INSERT INTO PurchaseOrder(time, drink_name, event) "
+                           "VALUES (4000, ?, 3600)", (drink_name,))
+
+        totals = store.event_totals(datetime.fromtimestamp(3600))
+
+        self.assertEqual([('cola', 2, 6), ('tap_beer', 1, 1)],
+                         [(drink.drink_name, drink.count, drink.revenue) for drink in totals])
+
+    def test_orders__orders_inserted__yields_in_submission_order(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        store.add_drink(Drink('cola', 'Cola', {'default': PriceHistory(1, {})}))
+        store.start_event(datetime.fromtimestamp(3600))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            for drink_name in ('tap_beer', 'cola', 'tap_beer'):
+                db.execute("INSERT INTO PurchaseOrder(time, drink_name, event) "
+                           "VALUES (4000, ?, 3600)", (drink_name,))
+
+        orders = list(store.orders(datetime.fromtimestamp(3600)))
+
+        self.assertEqual(['tap_beer', 'cola', 'tap_beer'],
+                         [order.drink_name for order in orders])
+        self.assertEqual(sorted(order.id for order in orders), [order.id for order in orders])
+        self.assertEqual(datetime.fromtimestamp(4000), orders[0].time)
+
+    def test_orders__after_id__yields_later_orders_only(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        store.start_event(datetime.fromtimestamp(3600))
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            for _ in range(3):
+                db.execute("INSERT INTO PurchaseOrder(time, drink_name, event) "
+                           "VALUES (4000, 'tap_beer', 3600)")
+        first, *later = list(store.orders(datetime.fromtimestamp(3600)))
+
+        orders = list(store.orders(datetime.fromtimestamp(3600), first.id))
+
+        self.assertEqual(later, orders)
+
+    def test_import_menu__drinks_and_layouts__all_stored(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        menu = Menu([Drink('tap_beer', 'Tap Beer .4l',
+                           {'default': PriceHistory(250, {datetime.fromtimestamp(10000): 280})})],
+                    ['default', 'more'],
+                    [MenuButton('default', 0, 0, None, 'tap_beer'),
+                     MenuButton('default', 4, 4, 'More', linked_layout='more'),
+                     MenuButton('more', 0, 0, 'Beer', 'tap_beer')])
+
+        store.import_menu(menu)
+
+        history = store.all_drinks()['tap_beer'].prices['default']
+        self.assertEqual(250, history.base_price)
+        self.assertEqual(280, history.current)
+        layouts = store.all_layouts()
+        self.assertEqual(OrderButton('Tap Beer .4l', 'tap_beer'), layouts['default'][0][0])
+        link = layouts['default'][4][4]
+        self.assertTrue(link is not None and link.is_link and link.display_name == 'More')
+        self.assertEqual(OrderButton('Beer', 'tap_beer'), layouts['more'][0][0])
+
+    def test_import_menu__insert_fails__nothing_stored(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        menu = Menu([Drink('cola', 'Cola', {'default': PriceHistory(200, {})}),
+                     Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(250, {})})],
+                    ['default'], [])
+
+        self.assertRaises(sqlite3.IntegrityError, lambda: store.import_menu(menu))
+
+        self.assertEqual(['tap_beer'], list(store.all_drinks()))
+        self.assertEqual({}, store.all_layouts())
+
+    def test_submit_order__same_batch_twice__stored_once(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        event = datetime.fromtimestamp(3600)
+        store.start_event(event)
+        batch_id = '6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10'
+
+        first = store.submit_order(event, ['tap_beer', 'tap_beer'], batch_id)
+        second = store.submit_order(event, ['tap_beer', 'tap_beer'], batch_id)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, [order.id for order in store.orders(event)])
+
+    def test_revision__drink_added__changes(self) -> None:
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+        before = store.revision('drinks')
+
+        store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+
+        self.assertNotEqual(before, store.revision('drinks'))
+
     def test_start_event__unfinished_event_exists__raises(self) -> None:
         with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
             db.execute("INSERT INTO Event DEFAULT VALUES")
@@ -86,6 +243,15 @@ class TestSqliteStore(unittest.TestCase):
 
         self.assertRaises(ValueError, store.start_event)
 
+    def test_event__finished_event__returns_event(self) -> None:
+        with sqlite3.connect('file:drinks.db?mode=memory&cache=shared', uri=True) as db:
+            db.execute("INSERT INTO Event(start_time, end_time, name) VALUES (3600, 7200, 'Party')")
+        store = SqliteStore('file:drinks.db?mode=memory&cache=shared')
+
+        self.assertEqual(Event('Party', datetime.fromtimestamp(3600), datetime.fromtimestamp(7200)),
+                         store.event(datetime.fromtimestamp(3600)))
+        self.assertIsNone(store.event(datetime.fromtimestamp(7200)))
+
     @staticmethod
     def _add_layout(conn: sqlite3.Connection, name: str) -> None:
         insert_layout_template = "INSERT INTO SelectorLayout(name) VALUES (?)"
@@ -110,3 +276,55 @@ class TestSqliteStore(unittest.TestCase):
     INSERT INTO OrderButton(button_id, drink_name)
     VALUES (?, ?)
     """
+
+
+class TestSqliteStoreConcurrency(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'drinks.sqlite')
+        with sqlite3.connect(self.path) as db:
+            with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+                db.executescript(sql_file.read())
+        db.close()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_profile__wal__sets_journal_mode(self) -> None:
+        store = SqliteStore(self.path, 1, SqliteProfile(journal_mode='wal'))
+
+        with store.pool.connection() as conn:
+            self.assertEqual('wal', conn.execute("PRAGMA journal_mode").fetchone()[0])
+        store.close()
+
+    def test_profile__invalid_journal_mode__raises(self) -> None:
+        self.assertRaises(ValueError, lambda: SqliteProfile(journal_mode='fast'))
+
+    def test_is_transient__locked_database__true(self) -> None:
+        store = SqliteStore(self.path, 1, SqliteProfile.from_settings({'busyTimeout': 0}))
+        with sqlite3.connect(self.path) as db:
+            db.execute("BEGIN EXCLUSIVE")
+            with self.assertRaises(sqlite3.OperationalError) as raised:
+                store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+            db.rollback()
+        db.close()
+        store.close()
+
+        self.assertTrue(store.is_transient(raised.exception))
+        self.assertFalse(store.is_transient(sqlite3.IntegrityError('UNIQUE constraint failed')))
+
+    def test_add_drink__concurrent_writers__no_lock_errors(self) -> None:
+        profile = SqliteProfile.from_settings({'journalMode': 'WAL',
+                                               'synchronous': 'normal',
+                                               'busyTimeout': 5000})
+        store = SqliteStore(self.path, 8, profile)
+
+        def write_and_read(i: int) -> None:
+            store.add_drink(Drink(f'drink_{i}', f'Drink {i}', {'default': PriceHistory(1, {})}))
+            store.all_drinks()
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(write_and_read, range(200)))
+
+        self.assertEqual(200, len(store.all_drinks()))
+        store.close()
@@ -0,0 +1,82 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from kellerclub_drinks.datastores.datastore import OrderBatch
+from kellerclub_drinks.datastores.delegating_store import DelegatingStore
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+from kellerclub_drinks.datastores.write_behind_store import WriteBehindStore
+
+EVENT = datetime.fromtimestamp(100_000)
+
+
+class RecordingStore(DelegatingStore):
+    """Hands out consecutive order ids and records each transaction."""
+
+    def __init__(self) -> None:
+        super().__init__(SqliteStore(':memory:', 0))
+        self.transactions: list[list[OrderBatch]] = []
+        self.next_id = 0
+        self.lock = Lock()
+
+    def submit_order(self, event_id: datetime, drinks: list[str],
+                     batch_id: Optional[str] = None) -> list[int]:
+        return self.submit_orders([(event_id, drinks, batch_id)])[0]
+
+    def submit_orders(self, batches: list[OrderBatch]) -> list[list[int]]:
+        with self.lock:
+            if any('invalid' in drinks for _, drinks, _ in batches):
+                raise ValueError('Unknown drink!')
+            self.transactions.append(batches)
+            result = []
+            for _, drinks, _ in batches:
+                result.append(list(range(self.next_id, self.next_id + len(drinks))))
+                self.next_id += len(drinks)
+            return result
+
+
+class TestWriteBehindStore(unittest.TestCase):
+    def test_submit_order__concurrent_submissions__coalesced(self) -> None:
+        inner = RecordingStore()
+        store = WriteBehindStore(inner, max_batch=1000, max_delay=0.2)
+
+        with ThreadPoolExecutor(20) as executor:
+            results = list(executor.map(lambda _: store.submit_order(EVENT, ['beer']),
+                                        range(20)))
+        store.close()
+
+        self.assertLess(len(inner.transactions), 20)
+        self.assertEqual(list(range(20)), sorted(ids[0] for ids in results))
+
+    def test_submit_order__batch_fails__only_offending_order_fails(self) -> None:
+        inner = RecordingStore()
+        store = WriteBehindStore(inner, max_batch=1000, max_delay=0.2)
+
+        with ThreadPoolExecutor(2) as executor:
+            valid = executor.submit(store.submit_order, EVENT, ['beer'])
+            invalid = executor.submit(store.submit_order, EVENT, ['invalid'])
+
+            self.assertEqual(1, len(valid.result()))
+            self.assertRaises(ValueError, invalid.result)
+        store.close()
+
+    def test_close__submit_afterwards__raises(self) -> None:
+        store = WriteBehindStore(RecordingStore())
+
+        store.close()
+
+        self.assertRaises(ValueError, lambda: store.submit_order(EVENT, ['beer']))
+
+    def test_submit_order__max_batch_reached__writes_without_delay(self) -> None:
+        inner = RecordingStore()
+        store = WriteBehindStore(inner, max_batch=1, max_delay=60)
+
+        store.submit_order(EVENT, ['beer'])
+
+        self.assertEqual(1, len(inner.transactions))
+        store.close()
@@ -21,3 +21,14 @@ class TestClientOrderStore(unittest.TestCase):
 
         self.assertEqual(1, len(header))
         self.assertTrue('event-100-orders=test_drink' in header['Set-Cookie'])
+
+    def test_add_order__new_batch_each_time(self) -> None:
+        store = ClientOrderStore(100)
+
+        first: dict[str, str] = {}
+        second: dict[str, str] = {}
+        store.add_order([], 'test_drink', first, None)
+        store.add_order([], 'test_drink', second, None)
+
+        self.assertRegex(first['Set-Cookie'], r'event-100-orders=test_drink\|[0-9a-f-]{36};')
+        self.assertNotEqual(first['Set-Cookie'], second['Set-Cookie'])
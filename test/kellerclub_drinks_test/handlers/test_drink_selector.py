@@ -0,0 +1,60 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from kellerclub_drinks.handlers.drink_selector.drink_selector import DrinkSelector
+from kellerclub_drinks.resources import Resources
+from kellerclub_drinks.settings import Settings
+
+EVENT = datetime.fromtimestamp(3600)
+
+
+class TestDrinkSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'drinks.sqlite')
+        with sqlite3.connect(path) as db:
+            with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+                db.executescript(sql_file.read())
+            db.execute("INSERT INTO Drink(name, display_name, base_price) "
+                       "VALUES ('beer', 'Beer', 250)")
+            db.execute("INSERT INTO SelectorLayout(name) VALUES ('default')")
+            db.execute("INSERT INTO SelectorButton(id, layout_name, xpos, ypos) "
+                       "VALUES (1, 'default', 0, 0)")
+            db.execute("INSERT INTO OrderButton(button_id, drink_name) VALUES (1, 'beer')")
+        db.close()
+
+        # the templates are looked up relative to the working directory
+        self.cwd = os.getcwd()
+        os.chdir('src')
+        self.settings = Settings({'type': 'sqlite', 'path': path, 'cache': {}}, 0,
+                                 development=True)
+        self.res = Resources(self.settings)
+
+    def tearDown(self) -> None:
+        self.res.close()
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def _status(self, selector: DrinkSelector) -> str:
+        status = []
+        list(selector.handle(self.res).serve(
+            self.settings, lambda status_line, _: status.append(status_line)))
+        return status[0]
+
+    def test_handle__same_layout_twice__grid_cached_once(self) -> None:
+        self.assertEqual('200 OK', self._status(DrinkSelector(EVENT, 'default', True, [])))
+        self.assertEqual('200 OK', self._status(DrinkSelector(EVENT, 'default', True, [])))
+
+        self.assertEqual(1, len(self.res.selector_grids))
+
+    def test_handle__unknown_layout__not_found_and_not_cached(self) -> None:
+        status = self._status(DrinkSelector(EVENT, 'unknown', True, []))
+
+        self.assertEqual('404 Not Found', status)
+        self.assertEqual(0, len(self.res.selector_grids))
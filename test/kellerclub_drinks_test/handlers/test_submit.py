@@ -0,0 +1,87 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from wsgiref.types import WSGIEnvironment
+
+from kellerclub_drinks.resources import Resources
+from kellerclub_drinks.routers.router import route
+from kellerclub_drinks.settings import Settings
+
+
+def _post(path: str, content_type: str, content: bytes) -> WSGIEnvironment:
+    return {'REQUEST_METHOD': 'POST', 'PATH_INFO': path, 'CONTENT_TYPE': content_type,
+            'CONTENT_LENGTH': str(len(content)), 'wsgi.input': io.BytesIO(content)}
+
+
+class TestSubmit(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'drinks.sqlite')
+        with sqlite3.connect(self.path) as db:
+            with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+                db.executescript(sql_file.read())
+            db.execute("INSERT INTO Drink(name, display_name, base_price) "
+                       "VALUES ('beer', 'Beer', 250)")
+            db.execute("INSERT INTO Event(start_time) VALUES (3600)")
+        db.close()
+
+        # the templates are looked up relative to the working directory
+        self.cwd = os.getcwd()
+        os.chdir('src')
+        self.settings = Settings({'type': 'sqlite', 'path': self.path,
+                                  'performance': {'busyTimeout': 0}}, 0, development=True)
+        self.res = Resources(self.settings)
+
+    def tearDown(self) -> None:
+        self.res.close()
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def _serve(self, environ: WSGIEnvironment) -> tuple[str, bytes]:
+        status = []
+        content = route(environ).handle(self.res).serve(
+            self.settings, lambda status_line, _: status.append(status_line))
+        return status[0], b''.join(content)
+
+    def _stored_orders(self) -> int:
+        with sqlite3.connect(self.path) as db:
+            count: int = db.execute("SELECT count(*) FROM PurchaseOrder").fetchone()[0]
+        db.close()
+        return count
+
+    def test_submit_batches__unknown_drink__rejected_with_indices(self) -> None:
+        content = (b'{"batches":[{"orders":["beer"],"event":3600},'
+                   b'{"orders":["wine"],"event":3600},{"orders":["beer"],"event":7200}]}')
+
+        status, body = self._serve(_post('/api/orders/submit', 'application/json', content))
+
+        self.assertEqual('422 Unprocessable Content', status)
+        self.assertEqual({'rejected': [1, 2]}, json.loads(body))
+        self.assertEqual(0, self._stored_orders())
+
+    def test_submit__unknown_drink__rejected(self) -> None:
+        content = b'order=wine&event=3600'
+
+        status, _ = self._serve(_post('/orders/submit', 'application/x-www-form-urlencoded',
+                                      content))
+
+        self.assertEqual('422 Unprocessable Content', status)
+        self.assertEqual(0, self._stored_orders())
+
+    def test_submit__database_locked__service_unavailable(self) -> None:
+        content = b'{"orders":["beer"],"event":3600}'
+        with sqlite3.connect(self.path) as db:
+            db.execute("BEGIN EXCLUSIVE")
+
+            status, _ = self._serve(_post('/api/orders/submit', 'application/json', content))
+
+            db.rollback()
+        db.close()
+
+        self.assertEqual('503 Service Unavailable', status)
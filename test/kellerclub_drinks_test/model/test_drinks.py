@@ -22,3 +22,16 @@ class TestDrinks(unittest.TestCase):
                                    datetime.fromtimestamp(20_000): 3})
 
         self.assertEqual(3, history.current)
+
+    def test_price_at__after_last_changepoint__returns_latest_price(self) -> None:
+        history = PriceHistory(1, {datetime.fromtimestamp(10_000): 2,
+                                   datetime.fromtimestamp(20_000): 3})
+
+        self.assertEqual(3, history.price_at(datetime.fromtimestamp(25_000)))
+
+    def test_price_at__changes_not_in_order__uses_time_order(self) -> None:
+        history = PriceHistory(1, {datetime.fromtimestamp(20_000): 3,
+                                   datetime.fromtimestamp(10_000): 2})
+
+        self.assertEqual(2, history.price_at(datetime.fromtimestamp(15_000)))
+        self.assertEqual(3, history.current)
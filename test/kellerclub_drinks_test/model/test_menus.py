@@ -0,0 +1,74 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+from datetime import datetime
+
+from kellerclub_drinks.model.menus import Menu, MenuButton
+
+MENU_JSON = """
+{"drinks": [{"name": "tap_beer", "displayName": "Tap Beer .4l", "basePrice": 250,
+             "prices": [{"time": "2024-06-01T00:00:00", "price": 280}]}],
+ "layouts": [{"name": "default",
+              "buttons": [{"xpos": 0, "ypos": 0, "drink": "tap_beer"},
+                          {"xpos": 4, "ypos": 4, "link": "default", "displayName": "Back"}]}]}
+"""
+
+MENU_CSV = """type,name,display_name,price,time,layout,xpos,ypos,drink,link
+drink,tap_beer,Tap Beer .4l,250,,,,,,
+price,tap_beer,,280,2024-06-01T00:00:00,,,,,
+layout,default,,,,,,,,
+button,,,,,default,0,0,tap_beer,
+button,,Back,,,default,4,4,,default
+"""
+
+
+class TestMenu(unittest.TestCase):
+    def test_from_json__complete_menu__parses_all_parts(self) -> None:
+        menu = Menu.from_json(MENU_JSON)
+
+        self.assertEqual(['tap_beer'], [drink.name for drink in menu.drinks])
+        history = menu.drinks[0].prices['default']
+        self.assertEqual(250, history.base_price)
+        self.assertEqual({datetime(2024, 6, 1): 280}, history.price_changes)
+        self.assertEqual(['default'], menu.layouts)
+        self.assertEqual([MenuButton('default', 0, 0, None, 'tap_beer'),
+                          MenuButton('default', 4, 4, 'Back', linked_layout='default')],
+                         menu.buttons)
+
+    def test_from_csv__same_menu_as_json__equal(self) -> None:
+        self.assertEqual(Menu.from_json(MENU_JSON), Menu.from_csv(MENU_CSV))
+
+    def test_from_json__missing_key__raises(self) -> None:
+        self.assertRaises(ValueError, lambda: Menu.from_json('{"drinks": [{"name": "x"}]}'))
+
+    def test_from_json__names_not_text__raises(self) -> None:
+        for menu in ['{"layouts": [{"name": 5}]}',
+                     '{"drinks": [{"name": "x", "displayName": null, "basePrice": 1}]}',
+                     '{"layouts": [{"name": "a", "buttons": [{"xpos": 0, "ypos": 0, '
+                     '"drink": ["beer"]}]}]}',
+                     '{"layouts": [{"name": "a", "buttons": [{"xpos": 0, "ypos": 0, '
+                     '"link": {}, "displayName": "B"}]}]}']:
+            with self.subTest(menu=menu):
+                self.assertRaises(ValueError, Menu.from_json, menu)
+
+    def test_from_csv__price_of_undefined_drink__raises(self) -> None:
+        csv = MENU_CSV + 'price,cola,,200,2024-06-01T00:00:00,,,,,\n'
+        self.assertRaises(ValueError, lambda: Menu.from_csv(csv))
+
+    def test_problems__valid_menu__none(self) -> None:
+        self.assertEqual([], Menu.from_json(MENU_JSON).problems([], []))
+
+    def test_problems__existing_names__reported(self) -> None:
+        problems = Menu.from_json(MENU_JSON).problems(['tap_beer'], ['default'])
+
+        self.assertEqual(['Drink tap_beer already exists!', 'Layout default already exists!'],
+                         problems)
+
+    def test_problems__invalid_buttons__all_reported(self) -> None:
+        menu = Menu([], ['default'],
+                    [MenuButton('default', 0, 0, None, 'cola'),
+                     MenuButton('default', 0, 0, None, linked_layout='other'),
+                     MenuButton('default', 5, 0, 'Both', 'cola', 'default')])
+
+        self.assertEqual(7, len(menu.problems([], [])))
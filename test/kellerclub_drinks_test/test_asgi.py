@@ -0,0 +1,215 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import threading
+import unittest
+from typing import Any, AsyncIterator, Iterable, Iterator
+from wsgiref.types import StartResponse, WSGIEnvironment
+
+from kellerclub_drinks.asgi import AsgiAdapter
+
+
+def _scope(path: str = '/', query: bytes = b'', method: str = 'GET',
+           headers: list[tuple[bytes, bytes]] | None = None) -> dict[str, Any]:
+    return {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+            'headers': headers or [], 'server': ('testserver', 8080)}
+
+
+def _call(app: AsgiAdapter, scope: dict[str, Any],
+          body: list[bytes] | None = None) -> list[dict[str, Any]]:
+    messages = [{'type': 'http.request', 'body': part, 'more_body': True}
+                for part in body or []]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        if not messages:
+            await asyncio.Future()  # the client stays connected
+        return messages.pop(0)
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+class TestAsgiAdapter(unittest.TestCase):
+    def test_call__get__passes_request_to_wsgi(self) -> None:
+        environs: list[WSGIEnvironment] = []
+
+        def wsgi(environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            environs.append(environ)
+            start_response('200 OK', [])
+            return []
+
+        _call(AsgiAdapter(wsgi), _scope('/event/1/selector', b'layout=default',
+                                        headers=[(b'cookie', b'a=1'),
+                                                 (b'accept-encoding', b'gzip')]))
+
+        environ, = environs
+        self.assertEqual('GET', environ['REQUEST_METHOD'])
+        self.assertEqual('/event/1/selector', environ['PATH_INFO'])
+        self.assertEqual('layout=default', environ['QUERY_STRING'])
+        self.assertEqual('a=1', environ['HTTP_COOKIE'])
+        self.assertEqual('gzip', environ['HTTP_ACCEPT_ENCODING'])
+
+    def test_call__post_in_parts__wsgi_reads_whole_body(self) -> None:
+        contents: list[bytes] = []
+
+        def wsgi(environ: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            contents.append(environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'])))
+            self.assertEqual('application/x-www-form-urlencoded', environ['CONTENT_TYPE'])
+            start_response('303 See Other', [('Location', '/')])
+            return []
+
+        sent = _call(AsgiAdapter(wsgi),
+                     _scope('/orders/add', method='POST',
+                            headers=[(b'content-type', b'application/x-www-form-urlencoded')]),
+                     [b'order=beer&', b'event=1'])
+
+        self.assertEqual([b'order=beer&event=1'], contents)
+        self.assertEqual({'type': 'http.response.start', 'status': 303,
+                          'headers': [(b'location', b'/')]}, sent[0])
+
+    def test_call__streamed_body__sends_chunks_and_closes(self) -> None:
+        closed = threading.Event()
+
+        class Body:
+            def __iter__(self) -> Iterator[bytes]:
+                yield b'first'
+                yield b'second'
+
+            def close(self) -> None:
+                closed.set()
+
+        def wsgi(_: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            start_response('200 OK', [('Content-type', 'text/plain')])
+            return Body()
+
+        sent = _call(AsgiAdapter(wsgi), _scope())
+
+        self.assertEqual([b'first', b'second', b''],
+                         [message['body'] for message in sent[1:]])
+        self.assertFalse(sent[-1].get('more_body', False))
+        self.assertTrue(closed.is_set())
+
+    def test_call__start_response_in_body__sends_headers_before_first_chunk(self) -> None:
+        def wsgi(_: WSGIEnvironment, start_response: StartResponse) -> Iterator[bytes]:
+            start_response('201 Created', [])
+            yield b'first'
+
+        sent = _call(AsgiAdapter(wsgi), _scope())
+
+        self.assertEqual(201, sent[0]['status'])
+        self.assertEqual(b'first', sent[1]['body'])
+
+    def test_call__start_response_not_called__raises(self) -> None:
+        def wsgi(_: WSGIEnvironment, __: StartResponse) -> Iterable[bytes]:
+            return [b'body']
+
+        with self.assertRaisesRegex(RuntimeError, 'start_response'):
+            _call(AsgiAdapter(wsgi), _scope())
+
+    def test_call__async_body__iterated_on_event_loop(self) -> None:
+        threads: list[threading.Thread] = []
+
+        class Body:
+            def __iter__(self) -> Iterator[bytes]:
+                raise AssertionError('must not be iterated synchronously')
+
+            async def __aiter__(self) -> AsyncIterator[bytes]:
+                threads.append(threading.current_thread())
+                yield b'event'
+
+        def wsgi(_: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            start_response('200 OK', [])
+            return Body()
+
+        sent = _call(AsgiAdapter(wsgi), _scope())
+
+        self.assertEqual(b'event', sent[1]['body'])
+        self.assertEqual([threading.main_thread()], threads)
+
+    def test_call__concurrent_requests__limited_to_workers(self) -> None:
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def wsgi(_: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            threading.Event().wait(0.01)
+            with lock:
+                running -= 1
+            start_response('200 OK', [])
+            return []
+
+        app = AsgiAdapter(wsgi, max_workers=2)
+
+        async def request() -> None:
+            async def receive() -> dict[str, Any]:
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(_: dict[str, Any]) -> None:
+                pass
+
+            await app(_scope(), receive, send)
+
+        async def requests() -> None:
+            await asyncio.gather(*(request() for _ in range(8)))
+
+        asyncio.run(requests())
+
+        self.assertEqual(2, peak)
+
+    def test_call__disconnect_before_body__wsgi_not_called(self) -> None:
+        def wsgi(_: WSGIEnvironment, __: StartResponse) -> Iterable[bytes]:
+            raise AssertionError('must not be called')
+
+        async def receive() -> dict[str, Any]:
+            return {'type': 'http.disconnect'}
+
+        async def send(_: dict[str, Any]) -> None:
+            raise AssertionError('must not send')
+
+        asyncio.run(AsgiAdapter(wsgi)(_scope(method='POST'), receive, send))
+
+    def test_call__disconnect_during_async_body__stops_and_closes(self) -> None:
+        closed = threading.Event()
+
+        class Body:
+            def __iter__(self) -> Iterator[bytes]:
+                raise AssertionError('must not be iterated synchronously')
+
+            async def __aiter__(self) -> AsyncIterator[bytes]:
+                while True:
+                    yield b'event'
+                    await asyncio.sleep(0.01)
+
+            def close(self) -> None:
+                closed.set()
+
+        def wsgi(_: WSGIEnvironment, start_response: StartResponse) -> Iterable[bytes]:
+            start_response('200 OK', [])
+            return Body()
+
+        messages = [{'type': 'http.request', 'body': b''}]
+        sent: list[dict[str, Any]] = []
+
+        async def receive() -> dict[str, Any]:
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.05)
+            return {'type': 'http.disconnect'}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        asyncio.run(AsgiAdapter(wsgi)(_scope(), receive, send))
+
+        self.assertTrue(closed.is_set())
+        self.assertTrue(all(message.get('more_body') for message in sent[1:]))
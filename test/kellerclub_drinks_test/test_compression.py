@@ -0,0 +1,35 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from kellerclub_drinks import compression
+from kellerclub_drinks.compression import negotiate
+
+
+class TestNegotiate(unittest.TestCase):
+    def test_negotiate__no_header__uncompressed(self) -> None:
+        self.assertIsNone(negotiate(None, ['br', 'gzip']))
+
+    def test_negotiate__both_accepted__prefers_first_available(self) -> None:
+        self.assertEqual('br', negotiate('gzip, deflate, br', ['br', 'gzip']))
+
+    def test_negotiate__quality_values__prefers_higher_quality(self) -> None:
+        self.assertEqual('gzip', negotiate('br;q=0.5, gzip', ['br', 'gzip']))
+
+    def test_negotiate__rejected__uncompressed(self) -> None:
+        self.assertIsNone(negotiate('gzip;q=0, identity', ['gzip']))
+
+    def test_negotiate__wildcard__accepts_any(self) -> None:
+        self.assertEqual('gzip', negotiate('*', ['gzip']))
+
+
+class TestCompress(unittest.TestCase):
+    @unittest.skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_compress__brotli_qualities__decompress_to_content(self) -> None:
+        content = b'<li>Tap Beer .4l</li>' * 100
+
+        for quality in [compression.DYNAMIC_QUALITY, compression.STATIC_QUALITY]:
+            with self.subTest(quality=quality):
+                compressed = compression.compress(content, 'br', quality)
+                self.assertEqual(content, compression.brotli.decompress(compressed))
@@ -0,0 +1,109 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import sqlite3
+import threading
+import unittest
+from datetime import datetime
+
+from kellerclub_drinks.datastores.sqlite_store import SqliteStore
+from kellerclub_drinks.live_orders import OrderBus, OrderPoller
+from kellerclub_drinks.model.drinks import Drink, PriceHistory
+from kellerclub_drinks.model.orders import Order
+
+
+def _order(order_id: int) -> Order:
+    return Order(order_id, datetime.fromtimestamp(4000), 'tap_beer')
+
+
+class TestOrderBus(unittest.TestCase):
+    def test_publish__subscribed__all_subscribers_receive(self) -> None:
+        bus = OrderBus()
+        first = bus.subscribe(3600)
+        second = bus.subscribe(3600)
+
+        bus.publish(3600, [_order(1)])
+
+        self.assertEqual(([_order(1)], False), first.take(0))
+        self.assertEqual(([_order(1)], False), second.take(0))
+
+    def test_publish__other_event__not_received(self) -> None:
+        bus = OrderBus()
+        subscription = bus.subscribe(3600)
+
+        bus.publish(7200, [_order(1)])
+
+        self.assertEqual(([], False), subscription.take(0))
+
+    def test_publish__already_published__skipped(self) -> None:
+        bus = OrderBus()
+        subscription = bus.subscribe(3600)
+
+        bus.publish(3600, [_order(1)])
+        bus.publish(3600, [_order(1), _order(2)])
+
+        self.assertEqual(([_order(1), _order(2)], False), subscription.take(0))
+
+    def test_publish__buffer_full__drops_oldest_and_reports_overflow(self) -> None:
+        bus = OrderBus(maxsize=2)
+        subscription = bus.subscribe(3600)
+
+        bus.publish(3600, [_order(1), _order(2), _order(3)])
+
+        self.assertEqual(([_order(2), _order(3)], True), subscription.take(0))
+        self.assertEqual(([], False), subscription.take(0))
+
+    def test_close__unsubscribes(self) -> None:
+        bus = OrderBus()
+        subscription = bus.subscribe(3600)
+
+        subscription.close()
+
+        self.assertEqual([], bus.events())
+
+    def test_take_async__published_from_other_thread__wakes_up(self) -> None:
+        bus = OrderBus()
+        subscription = bus.subscribe(3600)
+
+        async def take() -> tuple[list[Order], bool]:
+            waiting = asyncio.ensure_future(subscription.take_async(10))
+            await asyncio.sleep(0.01)
+            threading.Thread(target=bus.publish, args=(3600, [_order(1)])).start()
+            return await waiting
+
+        self.assertEqual(([_order(1)], False), asyncio.run(take()))
+
+
+class TestOrderPoller(unittest.TestCase):
+    def setUp(self) -> None:
+        self.url = f'file:{self._testMethodName}?mode=memory&cache=shared'
+        self.keep_alive = sqlite3.connect(self.url, uri=True)
+        with open('scripts/init-sqlite3.sql', 'r', encoding='utf8') as sql_file:
+            self.keep_alive.executescript(sql_file.read())
+        self.store = SqliteStore(self.url)
+        self.store.add_drink(Drink('tap_beer', 'Tap Beer .4l', {'default': PriceHistory(1, {})}))
+        self.store.start_event(datetime.fromtimestamp(3600))
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.keep_alive.close()
+
+    def _insert_order(self) -> None:
+        self.keep_alive.execute("INSERT INTO PurchaseOrder(time, drink_name, event) "
+                                "VALUES (4000, 'tap_beer', 3600)")
+        self.keep_alive.commit()
+
+    def test_poll__orders_submitted_elsewhere__published(self) -> None:
+        bus = OrderBus()
+        poller = OrderPoller(bus, self.store, 60)
+        subscription = bus.subscribe(3600)
+        self._insert_order()
+        poller.poll()
+
+        self._insert_order()
+        poller.poll()
+        poller.close()
+
+        orders, _ = subscription.take(0)
+        self.assertEqual(1, len(orders))
@@ -0,0 +1,26 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from kellerclub_drinks.lru_cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def test_get__cached__does_not_load_again(self) -> None:
+        cache: LruCache[str, int] = LruCache(2)
+        cache.get('a', lambda: 1)
+
+        self.assertEqual(1, cache.get('a', lambda: 2))
+
+    def test_get__full__evicts_least_recently_used(self) -> None:
+        cache: LruCache[str, int] = LruCache(2)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.get('a', lambda: 3)
+
+        cache.get('c', lambda: 4)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.get('a', lambda: 5))
+        self.assertEqual(6, cache.get('b', lambda: 6))
@@ -0,0 +1,38 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from kellerclub_drinks.metrics import Metrics, phase
+
+
+class TestMetrics(unittest.TestCase):
+    def test_phase__no_request_timed__does_nothing(self) -> None:
+        with phase('datastore'):
+            pass
+
+    def test_render__request_finished__exports_histogram_and_counter(self) -> None:
+        metrics = Metrics()
+        timer = metrics.start_request()
+        with phase('datastore'):
+            pass
+        with phase('datastore'):
+            pass
+        metrics.finish_request(timer, 'DrinkList', 200)
+
+        text = metrics.render()
+
+        self.assertIn('kellerclub_request_phase_seconds_bucket'
+                      '{handler="DrinkList",phase="datastore",le="+Inf"} 1', text)
+        self.assertIn('kellerclub_requests_total{handler="DrinkList",status="200"} 1', text)
+
+    def test_finish_request__phases_after_finish__not_recorded(self) -> None:
+        metrics = Metrics()
+        metrics.finish_request(metrics.start_request(), 'DrinkList', 200)
+
+        timer = metrics.start_request()
+        metrics.finish_request(timer, 'DrinkList', 404)
+        with phase('template'):
+            pass
+
+        self.assertEqual({}, timer.phases)
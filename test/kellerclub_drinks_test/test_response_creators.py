@@ -0,0 +1,159 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import gzip
+import unittest
+from datetime import datetime
+from typing import Iterator
+
+from kellerclub_drinks.live_orders import OrderBus
+from kellerclub_drinks.model.orders import Order
+from kellerclub_drinks.response_creators import AjaxCreator, ErrorCreator, EventStreamCreator, \
+    HtmlCreator, StreamingCreator
+from kellerclub_drinks.settings import Settings
+
+SETTINGS = Settings({}, 0)
+
+
+class TestStreamingCreator(unittest.TestCase):
+    def test_serve__small_chunks__coalesced(self) -> None:
+        creator = StreamingCreator(['a', b'b', 'c', b'd'], 'text/plain', chunk_size=2)
+        headers: list[tuple[str, str]] = []
+
+        content = list(creator.serve(SETTINGS, lambda _, h: headers.extend(h)))
+
+        self.assertEqual([b'ab', b'cd'], content)
+        self.assertNotIn('Content-Length', dict(headers))
+
+    def test_serve__closed_early__closes_source(self) -> None:
+        closed = []
+
+        def source() -> Iterator[str]:
+            try:
+                while True:
+                    yield 'row\n'
+            finally:
+                closed.append(True)
+
+        content = StreamingCreator(source(), 'text/plain', chunk_size=1).content
+        next(content)
+        content.close()  # type: ignore[attr-defined]
+
+        self.assertEqual([True], closed)
+
+    def test_serve__gzip_accepted__compresses_incrementally(self) -> None:
+        creator = StreamingCreator(['<p>row</p>'] * 1000, 'text/html', chunk_size=1000)
+        headers: list[tuple[str, str]] = []
+
+        content = list(creator.serve(SETTINGS, lambda _, h: headers.extend(h), 'gzip'))
+
+        self.assertEqual('gzip', dict(headers)['Content-Encoding'])
+        self.assertGreater(len(content), 2)
+        self.assertEqual(b'<p>row</p>' * 1000, gzip.decompress(b''.join(content)))
+
+
+class TestSuccessCreator(unittest.TestCase):
+    def test_serve__gzip_accepted__compresses(self) -> None:
+        page = b'<p>row</p>' * 1000
+        headers: list[tuple[str, str]] = []
+
+        content = HtmlCreator(page).serve(SETTINGS, lambda _, h: headers.extend(h), 'gzip')
+
+        body = b''.join(content)
+        self.assertEqual(page, gzip.decompress(body))
+        self.assertEqual(str(len(body)), dict(headers)['Content-Length'])
+        self.assertEqual('Accept-Encoding', dict(headers)['Vary'])
+
+    def test_serve__small_content__uncompressed(self) -> None:
+        headers: list[tuple[str, str]] = []
+
+        content = HtmlCreator(b'<p></p>').serve(SETTINGS, lambda _, h: headers.extend(h), 'gzip')
+
+        self.assertEqual([b'<p></p>'], list(content))
+        self.assertNotIn('Content-Encoding', dict(headers))
+
+
+class TestAjaxCreator(unittest.TestCase):
+    def test_serve__validate__sends_etag_and_requires_revalidation(self) -> None:
+        headers: list[tuple[str, str]] = []
+
+        content = AjaxCreator({'beer': ['Beer', 250]}, 200, validate=True) \
+            .serve(SETTINGS, lambda _, h: headers.extend(h))
+
+        self.assertEqual([b'{"beer":["Beer",250]}'], list(content))
+        self.assertRegex(dict(headers)['ETag'], r'^"[0-9a-f]{32}"$')
+        self.assertEqual('no-cache', dict(headers)['Cache-Control'])
+
+    def test_not_modified__matching_etag__responds_304(self) -> None:
+        etag = AjaxCreator({'beer': ['Beer', 250]}, 200, validate=True).etag
+        assert etag is not None
+        headers: list[tuple[str, str]] = []
+        statuses: list[str] = []
+
+        creator = AjaxCreator({'beer': ['Beer', 250]}, 200, validate=True).not_modified(etag)
+        assert creator is not None
+        content = creator.serve(SETTINGS, lambda s, h: (statuses.append(s), headers.extend(h)))
+
+        self.assertEqual([], list(content))
+        self.assertEqual(['304 Not Modified'], statuses)
+        self.assertEqual(etag, dict(headers)['ETag'])
+        self.assertEqual('no-cache', dict(headers)['Cache-Control'])
+
+    def test_not_modified__changed_content__none(self) -> None:
+        etag = AjaxCreator({'beer': ['Beer', 250]}, 200, validate=True).etag
+        assert etag is not None
+
+        creator = AjaxCreator({'beer': ['Beer', 280]}, 200, validate=True)
+
+        self.assertIsNone(creator.not_modified(etag))
+        self.assertIsNone(creator.not_modified(None))
+
+    def test_not_modified__compressed_variant__matches(self) -> None:
+        creator = AjaxCreator({f'drink_{i}': [f'Drink {i}', i] for i in range(100)}, 200,
+                              validate=True)
+        headers: list[tuple[str, str]] = []
+        list(creator.serve(SETTINGS, lambda _, h: headers.extend(h), 'gzip'))
+
+        self.assertIsNotNone(creator.not_modified(dict(headers)['ETag']))
+
+
+class TestErrorCreator(unittest.TestCase):
+    @staticmethod
+    def _status(creator: ErrorCreator) -> str:
+        statuses: list[str] = []
+        list(creator.serve(SETTINGS, lambda s, _: statuses.append(s)))
+        return statuses[0]
+
+    def test_serve__registered_status__sent(self) -> None:
+        self.assertEqual('422 Unprocessable Content', self._status(ErrorCreator(b'<p></p>', 422)))
+        self.assertEqual('503 Service Unavailable', self._status(ErrorCreator(b'<p></p>', 503)))
+
+    def test_serve__unknown_status__bad_request(self) -> None:
+        self.assertEqual('400 Bad Request', self._status(ErrorCreator(b'<p></p>', 418)))
+
+
+class TestEventStreamCreator(unittest.TestCase):
+    def test_serve__orders_published__sent_as_events(self) -> None:
+        bus = OrderBus()
+        creator = EventStreamCreator(bus.subscribe(3600), heartbeat=0)
+        headers: list[tuple[str, str]] = []
+
+        content = iter(creator.serve(SETTINGS, lambda _, h: headers.extend(h), 'gzip'))
+        bus.publish(3600, [Order(1, datetime(2024, 1, 1, 20), 'tap_beer')])
+
+        self.assertEqual(b': connected\n\n', next(content))
+        self.assertEqual(b'id: 1\nevent: order\n'
+                         b'data: {"id": 1, "time": "2024-01-01T20:00:00", "drink": "tap_beer"}\n\n',
+                         next(content))
+        self.assertEqual(b': keep-alive\n\n', next(content))
+        self.assertEqual('text/event-stream; charset=utf-8', dict(headers)['Content-type'])
+        self.assertNotIn('Content-Encoding', dict(headers))
+
+    def test_serve__closed__unsubscribes(self) -> None:
+        bus = OrderBus()
+        creator = EventStreamCreator(bus.subscribe(3600))
+
+        content = creator.serve(SETTINGS, lambda _, __: None)
+        content.close()  # type: ignore[attr-defined]
+
+        self.assertEqual([], bus.events())
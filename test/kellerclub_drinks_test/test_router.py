@@ -5,17 +5,24 @@ from __future__ import annotations
 
 import unittest
 from dataclasses import dataclass
+from datetime import datetime
 from http.cookies import SimpleCookie
 
 from kellerclub_drinks.handlers.add_drink import AddDrink
-from kellerclub_drinks.handlers.orders.submit import Submit
+from kellerclub_drinks.handlers.orders.submit import Submit, SubmitBatches
 from kellerclub_drinks.handlers.common_handlers import StaticHandler
 from kellerclub_drinks.handlers.drink_list.drink_list import DrinkList
 from kellerclub_drinks.handlers.drink_selector.drink_selector import DrinkSelector
 from kellerclub_drinks.handlers.errors.error import ErrorHandler
+from kellerclub_drinks.handlers.event_report.event_report import EventReport
+from kellerclub_drinks.handlers.event_report.event_totals import EventTotals
+from kellerclub_drinks.handlers.event_report.order_export import OrderExport
+from kellerclub_drinks.handlers.event_report.order_stream import OrderStream
 from kellerclub_drinks.handlers.handler import Handler
+from kellerclub_drinks.handlers.import_menu import ImportMenu
 from kellerclub_drinks.handlers.welcome_screen.welcome_screen import WelcomeScreen
-from kellerclub_drinks.routers.router import _route_get, _route_post
+from kellerclub_drinks.routers.preconditions import Preconditions
+from kellerclub_drinks.routers.router import _compile, _route_get, _route_post, route
 
 
 EMPTY_COOKIE = SimpleCookie()
@@ -69,6 +76,88 @@ class TestRouter(unittest.TestCase):
                 result = _route_post(req.path, '', req.content_type, req.content, EMPTY_COOKIE)
                 self.assertIsInstance(result, handler)
 
+    def test_submit_orders_api__batch__normalized_batch_id(self) -> None:
+        content = b'{"orders":["beer"],"event":100,"batch":"6F1C8F0E6A534C369B439D6F1B3C2A10"}'
+
+        result = _route_post('/api/orders/submit', '', 'application/json', content, EMPTY_COOKIE)
+
+        assert isinstance(result, Submit)
+        self.assertEqual('6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10', result.batch_id)
+
+    def test_submit_orders_api__invalid_batch__error(self) -> None:
+        for batch in [b'"not-a-uuid"', b'42']:
+            with self.subTest(batch=batch):
+                content = b'{"orders":["beer"],"event":100,"batch":' + batch + b'}'
+                result = _route_post('/api/orders/submit', '', 'application/json', content,
+                                     EMPTY_COOKIE)
+                self.assertIsInstance(result, ErrorHandler)
+
+    def test_submit_orders_api__batches__submits_all(self) -> None:
+        content = (b'{"batches":[{"orders":["beer"],"event":100,'
+                   b'"batch":"6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10"},'
+                   b'{"orders":["cola","cola"],"event":200}]}')
+
+        result = _route_post('/api/orders/submit', '', 'application/json', content, EMPTY_COOKIE)
+
+        assert isinstance(result, SubmitBatches)
+        self.assertEqual([(datetime.fromtimestamp(100), ['beer'],
+                           '6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10'),
+                          (datetime.fromtimestamp(200), ['cola', 'cola'], None)],
+                         result.batches)
+
+    def test_submit_orders_api__invalid_batches__error(self) -> None:
+        for batches in [b'[]', b'{}', b'[{"orders":[],"event":100}]',
+                        b'[{"orders":["beer"]}]', b'[{"orders":["beer"],"event":100,"batch":1}]']:
+            with self.subTest(batches=batches):
+                result = _route_post('/api/orders/submit', '', 'application/json',
+                                     b'{"batches":' + batches + b'}', EMPTY_COOKIE)
+                self.assertIsInstance(result, ErrorHandler)
+
+    def test_submit_orders__cookie_orders__uses_cookie_batch(self) -> None:
+        cookie = SimpleCookie()
+        cookie['event-100-orders'] = 'beer,cola|6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10'
+
+        same = _route_post('/orders/submit', '', 'application/x-www-form-urlencoded',
+                           b'order=beer&order=cola&event=100', cookie)
+        other = _route_post('/orders/submit', '', 'application/x-www-form-urlencoded',
+                            b'order=beer&event=100', cookie)
+
+        assert isinstance(same, Submit) and isinstance(other, Submit)
+        self.assertEqual('6f1c8f0e-6a53-4c36-9b43-9d6f1b3c2a10', same.batch_id)
+        self.assertIsNone(other.batch_id)
+
+    def test_import_menu_route(self) -> None:
+        for content_type, content in [('application/json', b'{"drinks": []}'),
+                                      ('text/csv; charset=utf-8',
+                                       b'type,name,display_name,price,time,'
+                                       b'layout,xpos,ypos,drink,link\n')]:
+            with self.subTest(content_type=content_type):
+                result = _route_post('/api/menu/import', '', content_type, content, EMPTY_COOKIE)
+                self.assertIsInstance(result, ImportMenu)
+
+        result = _route_post('/api/menu/import', '', 'text/plain', b'', EMPTY_COOKIE)
+        self.assertIsInstance(result, ErrorHandler)
+
+    def test_unknown_routes(self) -> None:
+        self.assertIsInstance(_route_get('/event/100000', None, EMPTY_COOKIE), ErrorHandler)
+        self.assertIsInstance(_route_get('/event/100000/unknown', None, EMPTY_COOKIE),
+                              ErrorHandler)
+        self.assertIsInstance(_route_post('/drinks', '', None, b'', EMPTY_COOKIE), ErrorHandler)
+
+    def test_unsupported_method(self) -> None:
+        environ = {'REQUEST_METHOD': 'DELETE', 'PATH_INFO': '/drinks'}
+        self.assertIsInstance(route(environ), ErrorHandler)
+
+    def test_malformed_form__error(self) -> None:
+        result = _route_post('/orders/clear', '', 'application/x-www-form-urlencoded',
+                             b'event=abc', EMPTY_COOKIE)
+        self.assertIsInstance(result, ErrorHandler)
+
+    def test_compile__duplicate_route__raises(self) -> None:
+        routes = [('GET', '/event/{id}/report', lambda request, _: WelcomeScreen()),
+                  ('GET', '/event/{id}/report/', lambda request, _: WelcomeScreen())]
+        self.assertRaises(ValueError, lambda: _compile(routes))
+
     def test_invalid_routes(self) -> None:
         invalid_urls = ['..', '-']
 
@@ -103,6 +192,34 @@ class TestRouter(unittest.TestCase):
         self.assertIsInstance(_route_get(valid_route, invalid_layout_query, EMPTY_COOKIE),
                               ErrorHandler)
 
+    def test_event_report_routes(self) -> None:
+        for url in ['/event/100000/report', '/api/event/100000/report']:
+            with self.subTest(url=url):
+                self.assertIsInstance(_route_get(url, None, EMPTY_COOKIE), EventReport)
+
+        non_digit_event_id = '/api/event/100a/report'
+        self.assertIsInstance(_route_get(non_digit_event_id, None, EMPTY_COOKIE),
+                              ErrorHandler)
+
+    def test_event_totals_route(self) -> None:
+        self.assertIsInstance(_route_get('/api/event/100000/totals', None, EMPTY_COOKIE),
+                              EventTotals)
+
+    def test_drinks_api_route__passes_preconditions(self) -> None:
+        result = _route_get('/api/drinks', None, EMPTY_COOKIE, Preconditions('"abc"'))
+
+        assert isinstance(result, DrinkList)
+        self.assertEqual('"abc"', result.preconditions.if_none_match)
+
+    def test_order_stream_route(self) -> None:
+        self.assertIsInstance(_route_get('/api/event/100000/stream', None, EMPTY_COOKIE),
+                              OrderStream)
+
+    def test_order_export_routes(self) -> None:
+        for url in ['/event/100000/orders.csv', '/event/100000/orders.jsonl']:
+            with self.subTest(url=url):
+                self.assertIsInstance(_route_get(url, None, EMPTY_COOKIE), OrderExport)
+
     def test_valid_add_drink_route(self) -> None:
         path = '/add_drink'
 
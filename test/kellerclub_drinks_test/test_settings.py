@@ -21,5 +21,26 @@ class TestSettings(unittest.TestCase):
 
         self.assertEqual(60 * 60 * 24, settings.cache_age)
 
+    def test_parse_settings__development_not_set__disabled(self) -> None:
+        settings_param: dict[str, Any] = {'datastore': {}}
+
+        settings = Settings._from_json_string(json.dumps(settings_param))
+
+        self.assertFalse(settings.development)
+
+    def test_parse_settings__asgi_workers_not_positive__at_least_one(self) -> None:
+        settings_param: dict[str, Any] = {'datastore': {}, 'asgiWorkers': 0}
+
+        settings = Settings._from_json_string(json.dumps(settings_param))
+
+        self.assertEqual(1, settings.asgi_workers)
+
+    def test_parse_settings__template_cache__read(self) -> None:
+        settings_param: dict[str, Any] = {'datastore': {}, 'templateCache': '/tmp/jinja'}
+
+        settings = Settings._from_json_string(json.dumps(settings_param))
+
+        self.assertEqual('/tmp/jinja', settings.template_cache)
+
     def test_parse__read_from_file__succeeds(self) -> None:
         Settings._from_file('src/settings.json')
@@ -0,0 +1,84 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from kellerclub_drinks.static_files import StaticFileCache
+
+
+class TestStaticFileCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        (self.root / 'base.css').write_bytes(b'body {}')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_get__file_changed__returns_cached_content(self) -> None:
+        cache = StaticFileCache(self.root)
+        cache.get('/base.css')
+
+        (self.root / 'base.css').write_bytes(b'p {}')
+
+        self.assertEqual(b'body {}', cache.get('/base.css').content)
+
+    def test_get__reload_and_file_changed__reloads(self) -> None:
+        cache = StaticFileCache(self.root, reload=True)
+        before = cache.get('/base.css')
+
+        (self.root / 'base.css').write_bytes(b'p {}')
+        os.utime(self.root / 'base.css', ns=(before.mtime_ns + 10**9,) * 2)
+
+        after = cache.get('/base.css')
+        self.assertEqual(b'p {}', after.content)
+        self.assertNotEqual(before.etag, after.etag)
+
+    def test_preload__loads_static_files_only(self) -> None:
+        (self.root / 'drink_list').mkdir()
+        (self.root / 'drink_list' / 'drink_list.css').write_bytes(b'ul {}')
+        (self.root / 'base.jinja2').write_bytes(b'<html></html>')
+        cache = StaticFileCache(self.root)
+
+        cache.preload()
+        (self.root / 'base.css').unlink()
+        (self.root / 'drink_list' / 'drink_list.css').unlink()
+        (self.root / 'base.jinja2').unlink()
+
+        self.assertEqual(b'body {}', cache.get('/base.css').content)
+        self.assertEqual(b'ul {}', cache.get('/drink_list/drink_list.css').content)
+        self.assertRaises(OSError, lambda: cache.get('/base.jinja2'))
+
+    def test_get__missing_file__raises(self) -> None:
+        self.assertRaises(OSError, lambda: StaticFileCache(self.root).get('/missing.css'))
+
+    def test_matches__etag(self) -> None:
+        file = StaticFileCache(self.root).get('/base.css')
+
+        self.assertTrue(file.matches(file.etag, None))
+        self.assertTrue(file.matches(f'"other", W/{file.etag}', None))
+        self.assertTrue(file.matches('*', None))
+        self.assertFalse(file.matches('"other"', None))
+
+    def test_matches__if_none_match_present__ignores_if_modified_since(self) -> None:
+        file = StaticFileCache(self.root).get('/base.css')
+
+        self.assertFalse(file.matches('"other"', file.http_last_modified))
+
+    def test_matches__modified_since(self) -> None:
+        file = StaticFileCache(self.root).get('/base.css')
+
+        self.assertTrue(file.matches(None, file.http_last_modified))
+        self.assertFalse(file.matches(None, 'Thu, 01 Jan 1970 00:00:00 GMT'))
+        self.assertFalse(file.matches(None, 'yesterday'))
+
+    def test_get__large_text_file__precompresses(self) -> None:
+        (self.root / 'large.js').write_bytes(b'console.log(1);\n' * 1000)
+        (self.root / 'random.woff2').write_bytes(os.urandom(4096))
+        cache = StaticFileCache(self.root)
+
+        self.assertIn('gzip', cache.get('/large.js').variants)
+        self.assertEqual({}, cache.get('/random.woff2').variants)
@@ -0,0 +1,45 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import os
+import tempfile
+import unittest
+
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from kellerclub_drinks.templates import precompile_templates, render_template
+
+
+class TestTemplates(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = FileSystemBytecodeCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_precompile_templates__bytecode_cache__filled_with_all_templates(self) -> None:
+        loader = FileSystemLoader('src/kellerclub_drinks/handlers')
+        env = Environment(loader=loader, bytecode_cache=self.cache)
+        # compiling only checks that the filters exist
+        env.filters['euro'] = str
+
+        precompile_templates(env)
+
+        self.assertEqual(len(env.list_templates(extensions=['jinja2'])),
+                         len(os.listdir(self.directory.name)))
+
+    def test_render_template__bytecode_cache__reused_by_new_environment(self) -> None:
+        loader = DictLoader({'page.jinja2': '<a href="{{ url }}">{{ name }}</a>'})
+        first = Environment(loader=loader, bytecode_cache=self.cache)
+        render_template(first, 'page.jinja2', '/drinks', name='Drinks')
+        cached, = os.listdir(self.directory.name)
+        cached_path = os.path.join(self.directory.name, cached)
+        # the cache is only written if the template had to be compiled
+        os.utime(cached_path, ns=(0, 0))
+
+        second = Environment(loader=loader, bytecode_cache=self.cache)
+        content = render_template(second, 'page.jinja2', '/drinks', name='Drinks')
+
+        self.assertEqual(0, os.stat(cached_path).st_mtime_ns)
+        self.assertEqual('<a href="/drinks">Drinks</a>', content)